@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for the buildability index of the islands.
+
+Loads a random map, plants trees on the islands and compares the tile by tile checks of
+whether a building fits at a position that were used before with the queries of the
+BuildabilityIndex. Then trees are planted one by one, with a check before every tree, to time
+adding buildings between queries. The initialisation of the building area cache of the islands
+is timed too.
+
+Usage: development/benchmark_buildability.py [map size] (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.headless import HeadlessSession
+from horizons.command.building import Build
+from horizons.constants import BUILDINGS
+from horizons.entities import Entities
+from horizons.util import Point, Rect, random_map
+from horizons.world.buildabilityindex import BuildabilityIndex
+
+CHECKS = 100000
+ADDS = 2000
+SIZES = ((1, 1), (2, 2), (3, 3), (4, 4), (6, 6))
+
+
+def check_island(island, position):
+	"""The check of Buildable._check_island before the index"""
+	for tup in position.tuple_iter():
+		tile = island.get_tile_tuple(tup)
+		if tile is None or 'constructible' not in tile.classes:
+			return False
+	return True
+
+def check_buildings(island, position):
+	"""The check for blocking buildings of Buildable._check_buildings before the index"""
+	for tile in island.get_tiles_tuple(position.tuple_iter()):
+		if tile.object is not None and not tile.object.buildable_upon:
+			return False
+	return True
+
+def check_island_index(island, position):
+	return island.buildability_index.all_set(BuildabilityIndex.CONSTRUCTIBLE, position)
+
+def check_buildings_index(island, position):
+	return not island.buildability_index.any_set(BuildabilityIndex.BLOCKED, position)
+
+
+def main(map_size):
+	horizons.main.db = horizons.main._create_db()
+	session = HeadlessSession(horizons.main.db)
+	session.load(random_map.generate_map(42, map_size, 50, 70, 70, 30))
+	world = session.world
+	rand = session.random
+
+	# plant trees on a tenth of the tiles, so there are some buildings on the islands
+	tree_class = Entities.buildings[BUILDINGS.TREE_CLASS]
+	for island in world.islands:
+		for (x, y) in island.ground_map.keys()[::10]:
+			if tree_class.check_build(session, Point(x, y), check_settlement=False).buildable:
+				Build(BUILDINGS.TREE_CLASS, x, y, island, ownerless=True)(issuer=None)
+
+	islands = world.islands
+	positions = []
+	for i in xrange(CHECKS):
+		island = islands[rand.randint(0, len(islands) - 1)]
+		width, height = SIZES[rand.randint(0, len(SIZES) - 1)]
+		x = rand.randint(island.position.left, island.position.right)
+		y = rand.randint(island.position.top, island.position.bottom)
+		positions.append((island, Rect.init_from_topleft_and_size(x, y, width, height)))
+
+	for name, function, index_function in (
+	    ('island', check_island, check_island_index),
+	    ('buildings', check_buildings, check_buildings_index)):
+		durations = []
+		for f in (function, index_function):
+			start = time.time()
+			results = [ f(island, position) for island, position in positions ]
+			durations.append(time.time() - start)
+		print 'check %-10s tiles %.2f us, index %.2f us per check' % \
+		      (name, durations[0] * 1000000 / CHECKS, durations[1] * 1000000 / CHECKS)
+		assert [ function(island, position) for island, position in positions ] == \
+		       [ index_function(island, position) for island, position in positions ]
+
+	# alternate adding a building and checking where the next one fits
+	island = max(islands, key=lambda island: len(island.ground_map))
+	coords = [ coords for coords in island.ground_map.keys()[5::10] if island.ground_map[coords].object is None ]
+	added = 0
+	check_duration = 0
+	for (x, y) in coords[:ADDS]:
+		start = time.time()
+		buildable = tree_class.check_build(session, Point(x, y), check_settlement=False).buildable
+		check_duration += time.time() - start
+		if buildable:
+			Build(BUILDINGS.TREE_CLASS, x, y, island, ownerless=True)(issuer=None)
+			added += 1
+	print 'add %d trees on an island of %d tiles: %.2f us per check after an add' % \
+	      (added, len(island.ground_map), check_duration * 1000000 / len(coords[:ADDS]))
+
+	start = time.time()
+	for island in islands:
+		island._init_cache()
+	print 'building area cache of %d islands: %.3f s' % (len(islands), time.time() - start)
+
+	session.end()
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 250)
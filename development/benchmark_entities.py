@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for reading the data of the entity classes.
+
+Compares reading the data with queries to the game data database, which is done when there
+is no valid EntitiesSnapshot, with reading the snapshot.
+
+Usage: development/benchmark_entities.py [repetitions] (run from the unknown-horizons root directory)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.entities import Entities
+from horizons.util.entitiessnapshot import EntitiesSnapshot
+
+
+def main(repetitions):
+	db = horizons.main._create_db()
+	horizons.main.db = db
+	directory = tempfile.mkdtemp()
+	try:
+		snapshot = EntitiesSnapshot(os.path.join(directory, 'entities.snapshot'))
+		data = Entities.get_snapshot_data(db)
+		snapshot.put(db.game_data_checksum, data)
+		assert snapshot.get(db.game_data_checksum) == data
+		print '%d grounds, %d buildings, %d units, %d production lines, snapshot %d bytes' % \
+		      (len(data['grounds']), len(data['buildings']), len(data['units']), len(data['production_lines']),
+		       os.path.getsize(snapshot.filename))
+
+		for name, function in (('queries', lambda: Entities.get_snapshot_data(db)),
+		                       ('snapshot', lambda: snapshot.get(db.game_data_checksum))):
+			start = time.time()
+			for i in xrange(repetitions):
+				function()
+			print '%-8s %.2f ms' % (name, (time.time() - start) * 1000 / repetitions)
+	finally:
+		shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for creating the game data database.
+
+Compares executing the sql files with copying the database from the GameDbCache, which is
+what happens on every start of the game and for every package of the game tests.
+
+Usage: development/benchmark_game_db.py [repetitions] (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.constants import PATHS
+from horizons.util.gamedbcache import GameDbCache
+from horizons.util.uhdbaccessor import UhDbAccessor
+
+
+def main(repetitions):
+	directory = tempfile.mkdtemp()
+	try:
+		cache = GameDbCache(os.path.join(directory, 'game.sqlite'), PATHS.DB_FILES)
+		start = time.time()
+		cache.build()
+		print 'building the cache: %.1f ms' % ((time.time() - start) * 1000)
+
+		def execute_sql_files():
+			cache.execute_sql_files(UhDbAccessor(':memory:'))
+
+		def load_cache():
+			assert cache.load(UhDbAccessor(':memory:'))
+
+		for name, function in (('executing sql files', execute_sql_files), ('loading cache', load_cache)):
+			start = time.time()
+			for i in xrange(repetitions):
+				function()
+			print '%-20s %.2f ms' % (name, (time.time() - start) * 1000 / repetitions)
+
+		start = time.time()
+		for i in xrange(repetitions):
+			cache.get_checksum()
+		print '%-20s %.2f ms (included in loading)' % ('checksum', (time.time() - start) * 1000 / repetitions)
+	finally:
+		shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for the updates of the minimap when settlements grow.
+
+Loads a random map, draws the whole minimap, founds a settlement on every island and lets it
+grow in a few steps. The updates of the minimap that were caused by this are then replayed the
+way they were drawn before (recalculating the area of every changed tile right away) and with
+the dirty pixels, that are checked together and only drawn again if their color changed.
+
+Usage: development/benchmark_minimap.py [map size] (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.headless import HeadlessSession
+from horizons.ext.dummy import Dummy
+from horizons.gui.widgets.minimap import Minimap
+from horizons.util import Color, Rect, random_map
+
+REPEATS = 10
+
+
+class CountingRenderTarget(object):
+	"""Render target that counts the points that are drawn"""
+	def __init__(self):
+		self.points = 0
+
+	def addPoint(self, group, point, r, g, b):
+		self.points += 1
+
+	def removeAll(self, group):
+		pass
+
+
+class RecordingMinimap(object):
+	"""Stands in for the minimap of the ingame gui and records the updated coords"""
+	def __init__(self):
+		self.coords = []
+
+	def update(self, tup):
+		self.coords.append(tup)
+
+
+class FakeIngameGui(object):
+	message_widget = Dummy
+
+	def __init__(self):
+		self.minimap = RecordingMinimap()
+
+
+class FakePlayer(object):
+	def __init__(self, worldid):
+		self.worldid = worldid
+		self.name = 'player %d' % worldid
+		self.color = Color[worldid % 8 + 1]
+
+
+def replay_recalculate(minimap, coords):
+	"""The updates of Minimap.update before the dirty pixels"""
+	world_to_minimap = minimap._get_world_to_minimap_ratio()
+	for tup in coords:
+		minimap_point = minimap._get_rotated_coords(minimap._world_coord_to_minimap_coord(tup))
+		rect = Rect.init_from_topleft_and_size(minimap_point[0], minimap_point[1], \
+		                                       int(round(1/world_to_minimap[0])) + 1, \
+		                                       int(round(1/world_to_minimap[1])) + 1)
+		minimap._recalculate(rect)
+
+def replay_dirty(minimap, coords):
+	for tup in coords:
+		minimap.update(tup)
+	minimap._update_dirty_pixels()
+
+
+def main(map_size):
+	horizons.main.db = horizons.main._create_db()
+	session = HeadlessSession(horizons.main.db)
+	session.load(random_map.generate_map(42, map_size, 50, 70, 70, 30))
+	world = session.world
+
+	minimap = Minimap(Rect.init_from_topleft_and_size(0, 0, 120, 120), session, Dummy, Dummy)
+	minimap.world = world
+	rendertarget = minimap.minimap_image.rendertarget = CountingRenderTarget()
+
+	start = time.time()
+	for i in xrange(REPEATS):
+		minimap._recalculate()
+	print 'full redraw: %.2f ms, %d points' % \
+	      ((time.time() - start) * 1000 / REPEATS, rendertarget.points / REPEATS)
+	start_colors = dict(minimap._pixel_colors)
+
+	# let a settlement grow on every island
+	session.ingame_gui = FakeIngameGui()
+	for i, island in enumerate(world.islands):
+		center = island.position.center()
+		settlement = island.add_settlement(Rect(center, center), 4, FakePlayer(i))
+		for radius in xrange(6, 16, 2):
+			island.assign_settlement(Rect(center, center), radius, settlement)
+	coords = session.ingame_gui.minimap.coords
+
+	for name, replay in (('recalculate', replay_recalculate), ('dirty pixels', replay_dirty)):
+		durations = []
+		for i in xrange(REPEATS):
+			minimap._pixel_colors = dict(start_colors)
+			rendertarget.points = 0
+			start = time.time()
+			replay(minimap, coords)
+			durations.append(time.time() - start)
+		print '%-12s %d tile updates: %.2f ms, %d points' % \
+		      (name, len(coords), sum(durations) * 1000 / REPEATS, rendertarget.points)
+	# the dirty pixels must result in the same colors as a full redraw
+	colors = minimap._pixel_colors
+	minimap._recalculate()
+	assert colors == minimap._pixel_colors
+
+	session.end()
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 250)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for encoding and decoding of network packets.
+
+Compares the pickled packets of the legacy protocol with the binary wire format
+(horizons/network/packets/wireformat.py) on typical multiplayer traffic: command
+packets as sent every tick, checkup hashes and lobby messages.
+
+Usage: development/benchmark_packets.py [iterations] (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+import horizons.world # needs to be imported before the commands
+
+from horizons.command.building import Build
+from horizons.command.unit import Act
+from horizons.command.uioptions import SetTaxSetting
+from horizons.manager import CommandPacket, CheckupHashPacket
+from horizons.network import packets
+from horizons.network.packets import wireformat
+
+
+class Dummy(object):
+	def __init__(self, worldid):
+		self.worldid = worldid
+
+
+def get_packets():
+	"""Returns list of (description, packet, receiving side is the client)"""
+	empty = packets.client.game_data(CommandPacket(1234, 3, []))
+	commands = packets.client.game_data(CommandPacket(1234, 3, [
+	  Act(Dummy(1001), 20, 30),
+	  Build(15, 40, 41, Dummy(7), 1, settlement=Dummy(8)),
+	  Build(3, 42, 41, Dummy(7), 1, settlement=Dummy(8), tearset=set([1200, 1201])),
+	  SetTaxSetting(Dummy(9), 1, 0.5),
+	]))
+	checkup = packets.client.game_data(CheckupHashPacket(1240, 3, '0123456789abcdef'))
+	chat = packets.client.cmd_chatmsg(u'hello world')
+	for packet in (empty, commands, checkup, chat):
+		packet.sid = 'ab12' * 8
+	return [('CommandPacket (empty)', empty, True),
+	        ('CommandPacket (4 commands)', commands, True),
+	        ('CheckupHashPacket', checkup, True),
+	        ('lobby chat message', chat, False)]
+
+
+def measure(function, iterations):
+	start = time.time()
+	for i in xrange(iterations):
+		function()
+	return (time.time() - start) * 1000000 / iterations
+
+
+def main(iterations):
+	print '%-28s %-8s %6s %12s %12s' % ('packet', 'format', 'bytes', 'encode (us)', 'decode (us)')
+	for name, packet, to_client in get_packets():
+		packets.SafeUnpickler.set_mode(client = to_client)
+		for protocol, protocol_name in ((packets.PROTOCOL_PICKLE, 'pickle'), (packets.PROTOCOL_BINARY, 'binary')):
+			data = packet.serialize(protocol)
+			encode = measure(lambda: packet.serialize(protocol), iterations)
+			decode = measure(lambda: packets.unserialize(data, protocol), iterations)
+			print '%-28s %-8s %6d %12.1f %12.1f' % (name, protocol_name, len(data), encode, decode)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for ship pathfinding across the whole world map.
+
+Compares FindPath on the water dict with GridFindPath on the water grid for random
+pairs of distant sea tiles and checks that both return the same paths. HierarchicalFindPath is
+measured twice, the first run includes the lazy setup of the clusters. Its paths are
+compared to the ones of GridFindPath by length.
+
+Usage: development/benchmark_pathfinding.py [map_file] (run from the unknown-horizons root directory)
+       A random 250x250 map is generated if no map is given.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.headless import HeadlessSession
+from horizons.util import Point
+from horizons.util import random_map
+from horizons.world.pathfinding.pathfinding import FindPath, GridFindPath, HierarchicalFindPath
+from horizons.world.pathfinding.pathnodes import ClusterGraph
+
+SEARCHES = 50
+
+
+def main(map_file):
+	horizons.main.db = horizons.main._create_db()
+	session = HeadlessSession(horizons.main.db)
+	session.load(map_file)
+	world = session.world
+
+	rng = random.Random(1)
+	sea = [coords for coords, body in world.water_body.iteritems() if body == world.sea_number]
+	min_distance = (world.max_x - world.min_x) // 2 # only long routes across the map
+	pairs = []
+	while len(pairs) < SEARCHES:
+		source, dest = Point(*rng.choice(sea)), Point(*rng.choice(sea))
+		if source.distance(dest) >= min_distance:
+			pairs.append((source, dest))
+
+	clusters = ClusterGraph(world.water_grid)
+	hierarchical = lambda : HierarchicalFindPath(clusters)
+
+	results = {}
+	for name, find_path, path_nodes in (('FindPath', FindPath, world.water), \
+	                                    ('GridFindPath', GridFindPath, world.water_grid), \
+	                                    ('HPA* (cold)', hierarchical, world.water_grid), \
+	                                    ('HPA* (warm)', hierarchical, world.water_grid)):
+		start = time.time()
+		results[name] = [find_path()(source, dest, path_nodes, world.ship_map, True, False) for \
+		                 (source, dest) in pairs]
+		duration = time.time() - start
+		print '%-14s %8.2f ms per path' % (name, duration * 1000 / SEARCHES)
+
+	mismatches = sum(1 for a, b in zip(results['FindPath'], results['GridFindPath']) if a != b)
+	print 'map: %dx%d, average path length: %.1f, mismatches: %d' % \
+	      (world.max_x - world.min_x, world.max_y - world.min_y,
+	       sum(len(path or []) for path in results['FindPath']) / float(SEARCHES), mismatches)
+	ratios = [ float(len(a)) / len(b) for a, b in zip(results['HPA* (warm)'], results['GridFindPath']) if b ]
+	print 'HPA* path length / GridFindPath path length: average %.3f, max %.3f' % \
+	      (sum(ratios) / len(ratios), max(ratios))
+	session.end()
+
+
+if __name__ == '__main__':
+	if len(sys.argv) > 1:
+		main(sys.argv[1])
+	else:
+		main(random_map.generate_map(42, 250, 50, 70, 70, 30))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for the generation of random islands.
+
+Generates the islands of random 250x250 maps with the pure Python and the NumPy
+implementation (bypassing the island cache) and checks that the results are identical.
+
+Usage: development/benchmark_random_map.py [maps] (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.util import DbReader, random_map
+
+MAP_SIZE = 250
+
+
+def get_island_strings(seed):
+	"""Returns the random island id strings of a random map"""
+	filename = random_map.generate_map(seed, MAP_SIZE, 50, 70, 70, 30)
+	db = DbReader(filename)
+	island_strings = [ row[0] for row in db("SELECT file FROM island") ]
+	db.close()
+	os.remove(filename)
+	return island_strings
+
+
+def main(map_count):
+	if random_map.numpy is None:
+		print 'NumPy is not available, only the pure Python implementation can be run'
+
+	for seed in xrange(map_count):
+		island_strings = get_island_strings(seed)
+		print 'map %d: %d islands' % (seed, len(island_strings))
+		results = {}
+		for name, use_numpy in (('Python', False), ('NumPy', True)):
+			if use_numpy and random_map.numpy is None:
+				continue
+			start = time.time()
+			results[name] = [ random_map._generate_random_island_ground(island_string, use_numpy) \
+			                  for island_string in island_strings ]
+			print '  %-7s %.3f s' % (name, time.time() - start)
+		if len(results) > 1:
+			print '  results identical:', results['Python'] == results['NumPy']
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for saving games.
+
+Plays a random map with AI players for a while (or loads the given savegame) and
+measures World.save with inserts executed one by one and with batched inserts
+(DbReader.start_batch), then checks that both savegames contain the same rows.
+
+Note: development/savegame_lvl3_populated.sqlite predates the current savegame format
+(e.g. production.creation_tick is missing), so it can't be used until it is updated.
+
+Usage: development/benchmark_save.py [savegame] (run from the unknown-horizons root directory)
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.headless import HeadlessSession
+from horizons.ai.aiplayer import AIPlayer
+from horizons.constants import PATHS
+from horizons.ext.dummy import Dummy
+from horizons.util import Color, DbReader, DifficultySettings, random_map
+
+AI_PLAYERS = 4
+TICKS = 6000
+REPETITIONS = 5
+
+# headless fife instances are Dummys, store 0 as their action runtime
+sqlite3.register_adapter(type(Dummy), lambda dummy: 0)
+
+
+class DefaultCacheDbReader(DbReader):
+	"""DbReader with sqlite's default statement cache size"""
+	STATEMENT_CACHE_SIZE = 100
+
+
+def create_session(savegame):
+	horizons.main.db = horizons.main._create_db()
+	session = HeadlessSession(horizons.main.db, rng_seed=42)
+	AIPlayer.load_abstract_buildings(horizons.main.db)
+	if savegame is not None:
+		session.load(savegame)
+	else:
+		players = [ {'id': i, 'name': 'AI%d' % i, 'color': Color[i], 'local': i == 1, 'ai': True,
+		             'difficulty': DifficultySettings.EASY_LEVEL} for i in xrange(1, AI_PLAYERS + 1) ]
+		session.load(random_map.generate_map(42, 150, 50, 70, 70, 30), players)
+		print 'playing %d ticks with %d AI players...' % (TICKS, AI_PLAYERS)
+		session.run(ticks=TICKS)
+	return session
+
+
+def save(session, db_class, batch):
+	"""Saves the world to a new savegame.
+	@return: tuple (path of the savegame, seconds World.save took)"""
+	fd, filename = tempfile.mkstemp(suffix='.sqlite')
+	os.close(fd)
+	shutil.copyfile(PATHS.SAVEGAME_TEMPLATE, filename)
+	db = db_class(filename)
+	start = time.time()
+	db("BEGIN")
+	if batch:
+		db.start_batch()
+	session.world.save(db)
+	if batch:
+		db.end_batch()
+	db("COMMIT")
+	duration = time.time() - start
+	db.close()
+	return filename, duration
+
+
+def get_contents(filename):
+	db = DbReader(filename)
+	tables = [ row[0] for row in db("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name") ]
+	contents = dict( (table, db("SELECT rowid, * FROM %s ORDER BY rowid" % table).rows) for table in tables )
+	db.close()
+	return contents
+
+
+def main(savegame):
+	session = create_session(savegame)
+	world = session.world
+	print '%d islands, %d buildings, %d ships, %d ground units' % (len(world.islands), \
+	      sum(len(island.buildings) for island in world.islands), len(world.ships), len(world.ground_units))
+
+	modes = (('one by one (default cache)', DefaultCacheDbReader, False),
+	         ('one by one', DbReader, False),
+	         ('batched', DbReader, True))
+	files = []
+	durations = dict( (name, []) for name, db_class, batch in modes )
+	for i in xrange(REPETITIONS):
+		for name, db_class, batch in modes:
+			filename, duration = save(session, db_class, batch)
+			files.append(filename)
+			durations[name].append(duration)
+	for name, db_class, batch in modes:
+		print '%-28s %8.1f ms' % (name, min(durations[name]) * 1000)
+
+	contents = get_contents(files[0])
+	print 'rows: %d' % sum(len(rows) for rows in contents.itervalues())
+	print 'identical savegames: %s' % all(get_contents(filename) == contents for filename in files[1:])
+	for filename in files:
+		os.remove(filename)
+	session.end()
+
+
+if __name__ == '__main__':
+	main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for listing savegames in the load dialog.
+
+Creates autosaves in a temporary directory and lists them without the metadata index,
+which opens every savegame, and with it after a restart, which only reads the index file.
+
+Usage: development/benchmark_savegame_list.py [number of savegames] (run from the unknown-horizons root directory)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.constants import PATHS
+from horizons.savegamemanager import SavegameManager
+from horizons.util import DbReader
+from horizons.util.savegamemetadataindex import SavegameMetadataIndex
+
+
+def main(count):
+	directory = tempfile.mkdtemp()
+	try:
+		SavegameManager.savegame_dir = directory
+		SavegameManager.autosave_dir = os.path.join(directory, 'autosave')
+		SavegameManager.quicksave_dir = os.path.join(directory, 'quicksave')
+		SavegameManager.init()
+		for i in xrange(count):
+			savegame = os.path.join(SavegameManager.autosave_dir, \
+			                        SavegameManager.autosave_filenamepattern % {'timestamp': i})
+			shutil.copyfile(PATHS.SAVEGAME_TEMPLATE, savegame)
+			db = DbReader(savegame)
+			SavegameManager.write_metadata(db, i, '')
+			db.close()
+
+		index_file = os.path.join(directory, 'savegames.index')
+		for name in ('without index', 'with index'):
+			# a new index object reads the file again like after a restart
+			SavegameManager.metadata_index = SavegameMetadataIndex(index_file)
+			start = time.time()
+			files, names = SavegameManager.get_saves()
+			print '%-13s listing %d savegames: %.1f ms' % (name, len(files), (time.time() - start) * 1000)
+		print 'index size: %d bytes' % os.path.getsize(index_file)
+	finally:
+		shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
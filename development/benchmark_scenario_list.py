@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for listing scenarios and campaigns in the singleplayer menu.
+
+Lists the available scenarios with their headers and the campaigns like the menu does:
+with an empty YAML cache, after a restart with the cache files and with the cache in memory.
+
+Usage: development/benchmark_scenario_list.py [repetitions] (run from the unknown-horizons root directory)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.savegamemanager import SavegameManager, YamlCache
+from horizons.scenario import ScenarioEventHandler
+
+
+def list_scenarios():
+	files, names = SavegameManager.get_available_scenarios()
+	for filename in files:
+		ScenarioEventHandler.get_difficulty_from_file(filename)
+		ScenarioEventHandler.get_description_from_file(filename)
+		ScenarioEventHandler.get_author_from_file(filename)
+	SavegameManager.get_campaigns()
+	return len(files)
+
+def main(repetitions):
+	directory = tempfile.mkdtemp()
+	try:
+		YamlCache.cache_dir = directory
+		for name, clear_memory in (('empty cache', True), ('cache files', True), ('in memory', False)):
+			if clear_memory:
+				YamlCache.cache.clear()
+			start = time.time()
+			count = list_scenarios()
+			print '%-11s listing %d scenarios: %.1f ms' % (name, count, (time.time() - start) * 1000)
+		start = time.time()
+		for i in xrange(repetitions):
+			list_scenarios()
+		print 'average of %d menu visits: %.2f ms' % (repetitions, (time.time() - start) * 1000 / repetitions)
+		print 'cache size: %d bytes' % sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+	finally:
+		shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
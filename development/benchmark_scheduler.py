@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Microbenchmark for the tick scheduler.
+
+Fills the schedule with a growing number of pending calls and measures how long it
+takes to query and cancel the calls of a single instance. The cost should not
+depend on the size of the schedule.
+
+Usage: development/benchmark_scheduler.py (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+from horizons.scheduler import Scheduler
+from horizons.timer import Timer
+
+SCHEDULE_SIZES = (1000, 10000, 100000)
+SPREAD_TICKS = 1000 # pending calls are spread over this many ticks
+REPETITIONS = 1000
+
+
+class Instance(object):
+	def callback(self):
+		pass
+
+
+def fill_schedule(size):
+	Scheduler.create_instance(Timer())
+	instances = [Instance() for i in xrange(size // 10)]
+	for i in xrange(size):
+		instance = instances[i % len(instances)]
+		Scheduler().add_new_object(instance.callback, instance, run_in=1 + i % SPREAD_TICKS)
+	return instances
+
+def bench(size):
+	instances = fill_schedule(size)
+	target = instances[len(instances) // 2]
+
+	def query():
+		Scheduler().get_classinst_calls(target, target.callback)
+
+	def cancel_and_readd():
+		Scheduler().rem_call(target, target.callback)
+		Scheduler().add_new_object(target.callback, target, run_in=SPREAD_TICKS // 2)
+
+	query_time = timeit.timeit(query, number=REPETITIONS) / REPETITIONS
+	cancel_time = timeit.timeit(cancel_and_readd, number=REPETITIONS) / REPETITIONS
+
+	start = timeit.default_timer()
+	for tick in xrange(1, SPREAD_TICKS + 1):
+		Scheduler().tick(tick)
+	tick_time = (timeit.default_timer() - start) / SPREAD_TICKS
+
+	Scheduler().end()
+	Scheduler.destroy_instance()
+	return query_time, cancel_time, tick_time
+
+
+if __name__ == '__main__':
+	print '%10s %14s %14s %14s' % ('calls', 'query (us)', 'cancel (us)', 'tick (us)')
+	for size in SCHEDULE_SIZES:
+		query_time, cancel_time, tick_time = bench(size)
+		print '%10d %14.2f %14.2f %14.2f' % (size, query_time * 1e6, cancel_time * 1e6, tick_time * 1e6)
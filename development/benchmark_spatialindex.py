@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for range queries on ships, as done by weapon targeting.
+
+Creates hundreds of frigates and pirate ships on a random map, lets them fight and
+compares World.get_health_instances, which uses the spatial index, with checking every
+unit like before.
+
+Usage: development/benchmark_spatialindex.py [ships] (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.headless import HeadlessSession
+from horizons.command.unit import CreateUnit
+from horizons.constants import UNITS
+from horizons.util import Circle, random_map
+
+TICKS = 200
+RADIUS = 12
+
+
+def get_health_instances_unindexed(world, position, radius):
+	"""World.get_health_instances without the spatial index"""
+	circle = Circle(position, radius)
+	return [ unit for unit in world.ships + world.ground_units if \
+	         circle.contains(unit.position) and unit.has_component('health') ]
+
+
+def main(ship_count):
+	horizons.main.db = horizons.main._create_db()
+	session = HeadlessSession(horizons.main.db)
+	session.load(random_map.generate_map(42, 250, 50, 70, 70, 30), pirate_enabled=True)
+	world = session.world
+
+	for i in xrange(ship_count):
+		position = world.get_random_possible_ship_position()
+		if i % 2:
+			CreateUnit(world.player.worldid, UNITS.FRIGATE, position.x, position.y)(issuer=world.player)
+		else:
+			CreateUnit(world.pirate.worldid, UNITS.PIRATE_SHIP_CLASS, position.x, position.y)(issuer=world.player)
+	print '%d ships on a %dx%d map' % (len(world.ships), world.max_x - world.min_x, world.max_y - world.min_y)
+
+	ticks, ticks_per_second = session.run_timed(ticks=TICKS)
+	print 'simulation: %.1f ticks per second' % ticks_per_second
+
+	positions = [ ship.position for ship in world.ships ]
+	for name, function in (('unindexed', lambda pos: get_health_instances_unindexed(world, pos, RADIUS)),
+	                       ('SpatialIndex', lambda pos: world.get_health_instances(pos, RADIUS))):
+		start = time.time()
+		results = [ function(position) for position in positions ]
+		duration = time.time() - start
+		print '%-12s %8.3f ms per query, %.1f units found on average' % \
+		      (name, duration * 1000 / len(positions), sum(len(r) for r in results) / float(len(results)))
+
+	mismatches = sum(1 for position in positions if \
+	                 get_health_instances_unindexed(world, position, RADIUS) != world.get_health_instances(position, RADIUS))
+	print 'mismatches: %d' % mismatches
+	session.end()
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
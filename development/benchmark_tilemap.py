@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Benchmark for the tile maps of the world.
+
+Loads a random map and compares the memory usage and the lookup speed of the TileMaps
+of the world with the dicts keyed by (x, y) tuples that were used before.
+The lookups are timed through the getters of the world, the best of several runs counts.
+The memory of the tile objects themselves is not counted, they are the same in both cases.
+
+Usage: development/benchmark_tilemap.py [map size] (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.headless import HeadlessSession
+from horizons.util import Point, random_map
+
+LOOKUPS = 200000
+REPETITIONS = 5
+
+
+def get_dict_size(d):
+	"""Returns the size of a dict with (x, y) keys including the keys"""
+	size = sys.getsizeof(d)
+	for key in d:
+		size += sys.getsizeof(key)
+		# small ints are shared
+		size += sum(sys.getsizeof(coord) for coord in key if not -5 <= coord <= 256)
+	return size
+
+def get_tilemap_size(tile_map):
+	return sys.getsizeof(tile_map) + sys.getsizeof(tile_map.__dict__) + sys.getsizeof(tile_map._tiles) + \
+	       sys.getsizeof(tile_map._island_ids) + sys.getsizeof(tile_map._islands) + \
+	       sys.getsizeof(tile_map._island_ids_by_island)
+
+
+class DictWorld(object):
+	"""The getters of the world as they were with the dicts"""
+	def __init__(self, full_map, island_map):
+		self.full_map = full_map
+		self.island_map = island_map
+
+	def get_tile(self, point):
+		return self.full_map[(point.x, point.y)]
+
+	def get_settlement(self, point):
+		try:
+			return self.get_tile(point).settlement
+		except KeyError:
+			return None
+
+	def get_island(self, point):
+		tup = point.to_tuple()
+		if tup not in self.island_map:
+			return None
+		return self.island_map[tup]
+
+
+def main(map_size):
+	horizons.main.db = horizons.main._create_db()
+	session = HeadlessSession(horizons.main.db)
+	session.load(random_map.generate_map(42, map_size, 50, 70, 70, 30))
+	world = session.world
+
+	# the dicts as they were built before
+	full_map = dict(world.full_map.iteritems())
+	ground_map = dict(world.ground_map.iteritems())
+	island_map = dict((coords, world.full_map.get_island(*coords)) for coords, tile in world.full_map.iteritems() \
+	                  if world.full_map.get_island(*coords) is not None)
+	print '%dx%d tiles, %d of them on %d islands' % \
+	      (world.full_map.width, world.full_map.height, len(island_map), len(world.islands))
+
+	dict_size = get_dict_size(full_map) + get_dict_size(ground_map) + get_dict_size(island_map)
+	tilemap_size = get_tilemap_size(world.full_map) + get_tilemap_size(world.ground_map)
+	print 'memory: dicts %.1f MB, TileMaps %.1f MB' % (dict_size / 1048576.0, tilemap_size / 1048576.0)
+
+	dict_world = DictWorld(full_map, island_map)
+
+	# the lookups are done for random points on the map and a few outside of it
+	rand = session.random
+	points = [ Point(rand.randint(world.min_x, world.max_x - 1), rand.randint(world.min_y, world.max_y - 1)) \
+	           for i in xrange(LOOKUPS) ]
+	outside = [ Point(world.max_x + i, world.max_y) for i in xrange(LOOKUPS / 10) ]
+
+	for name, dict_function, world_function, test_points in (
+	    ('get_tile', dict_world.get_tile, world.get_tile, points),
+	    ('get_island', dict_world.get_island, world.get_island, points + outside),
+	    ('get_settlement', dict_world.get_settlement, world.get_settlement, points + outside)):
+		durations = [None, None]
+		for i in xrange(REPETITIONS):
+			for j, function in enumerate((dict_function, world_function)):
+				start = time.time()
+				results = [ function(point) for point in test_points ]
+				duration = time.time() - start
+				if durations[j] is None or duration < durations[j]:
+					durations[j] = duration
+		print '%-14s dicts %.3f us, TileMaps %.3f us per lookup' % \
+		      (name, durations[0] * 1000000 / len(test_points), durations[1] * 1000000 / len(test_points))
+		assert [ dict_function(point) for point in test_points ] == [ world_function(point) for point in test_points ]
+
+	session.end()
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 250)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""Rebuilds the indices of the action sets and tile sets in the cache dir.
+
+The indices are rebuilt automatically when a directory in content/gfx changes. This
+tool rebuilds them now. It also prints how long searching the directories and loading
+the indices takes.
+
+Usage: development/build_gfx_index.py (run from the unknown-horizons root directory)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import gettext
+gettext.install('', unicode=True)
+
+import horizons.main
+horizons.main.setup_headless()
+
+from horizons.util import ActionSetLoader, TileSetLoader
+
+
+def main():
+	for name, loader, find_sets in (
+	    ('action sets', ActionSetLoader, ActionSetLoader._find_all_action_sets),
+	    ('tile sets', TileSetLoader, TileSetLoader._find_all_tile_sets)):
+		index = loader.get_index_cache()
+		start = time.time()
+		sets = index.rebuild(find_sets)
+		rebuild_time = time.time() - start
+
+		start = time.time()
+		assert index.get() == sets, "index wasn't written"
+		load_time = time.time() - start
+
+		start = time.time()
+		find_sets()
+		search_time = time.time() - start
+		print '%s: %d sets, index %s' % (name, len(sets), index.filename)
+		print '  rebuilding %.1f ms, searching the directory %.1f ms, loading the index %.1f ms' % \
+		      (rebuild_time * 1000, search_time * 1000, load_time * 1000)
+
+
+if __name__ == '__main__':
+	main()
@@ -234,6 +234,8 @@ class VIEW:
 	ROTATION = 45.0
 	TILT = -60
 	ZOOM = 1
+	# bytes of decoded atlas pages that are kept loaded, None for no limit
+	ATLAS_MEMORY_BUDGET = None
 
 ## The Production States available in the game sorted by importance from least
 ## to most important
@@ -256,6 +258,7 @@ class GAME:
 
 	WORLD_WORLDID = 0 # worldid of World object
 	MAX_TICKS = None # exit after on tick MAX_TICKS (disabled by setting to None)
+	PROFILE_TICKS = False # measure the execution time of scheduled calls, see TickProfiler
 
 # Messagewidget and Logbook
 class MESSAGES:
@@ -342,6 +345,15 @@ class PATHS:
 	LOG_DIR = os.path.join(_user_dir, "log")
 	USER_CONFIG_FILE = os.path.join(_user_dir, "settings.xml")
 	SCREENSHOT_DIR = os.path.join(_user_dir, "screenshots")
+	# data that can be recreated any time
+	CACHE_DIR = os.path.join(_user_dir, "cache")
+	RANDOM_ISLAND_CACHE_DIR = os.path.join(CACHE_DIR, "islands")
+	GAME_DB_CACHE_FILE = os.path.join(CACHE_DIR, "game.sqlite")
+	ENTITIES_SNAPSHOT_FILE = os.path.join(CACHE_DIR, "entities.snapshot")
+	ACTION_SETS_INDEX_FILE = os.path.join(CACHE_DIR, "actionsets.index")
+	TILE_SETS_INDEX_FILE = os.path.join(CACHE_DIR, "tilesets.index")
+	SAVEGAME_METADATA_INDEX_FILE = os.path.join(CACHE_DIR, "savegames.index")
+	YAML_CACHE_DIR = os.path.join(CACHE_DIR, "yaml")
 
 	# paths relative to uh dir
 	ACTION_SETS_DIRECTORY = os.path.join("content", "gfx")
@@ -21,10 +21,17 @@
 
 import logging
 
+from horizons.constants import PATHS
+from horizons.util.entitiessnapshot import EntitiesSnapshot
+
 class Entities(object):
 	"""Class that stores all the special classes for buildings, grounds etc.
 	Stores class objects, not instances.
-	Loads everything from the db."""
+	Loads everything from the db.
+
+	The data of the classes is read from an EntitiesSnapshot if the db is the game data db
+	(see horizons.main._create_db) and the snapshot belongs to its content. Otherwise, the
+	data is read from the db and the snapshot is written again."""
 	loaded = False
 
 	log = logging.getLogger('entities')
@@ -34,43 +41,84 @@ class Entities(object):
 		if cls.loaded:
 			return
 
-		cls.load_grounds(db)
-		cls.load_buildings(db)
-		cls.load_units(db)
+		data = None
+		checksum = getattr(db, 'game_data_checksum', None)
+		if checksum is not None:
+			snapshot = EntitiesSnapshot(PATHS.ENTITIES_SNAPSHOT_FILE)
+			data = snapshot.get(checksum)
+			if data is None:
+				data = cls.get_snapshot_data(db)
+				snapshot.put(checksum, data)
+
+		if data is None:
+			cls.load_grounds(db)
+			cls.load_buildings(db)
+			cls.load_units(db)
+		else:
+			cls.load_grounds(db, data['grounds'])
+			cls.load_buildings(db, data['buildings'])
+			cls.load_units(db, data['units'])
+			from world.production.productionline import ProductionLine
+			ProductionLine.load_data(dict(data['production_lines']))
 		cls.loaded = True
 
 	@classmethod
-	def load_grounds(cls, db):
+	def get_snapshot_data(cls, db):
+		"""Reads the data of all entity classes and production lines from the db.
+		@return: dict: { 'grounds' : [ (id, data) ], 'buildings' : ..., 'units' : ...,
+		                 'production_lines' : ... }, see the get_data functions of the classes"""
+		from world.ground import GroundClass
+		from world.building import BuildingClass
+		from world.units import UnitClass
+		from world.production.productionline import _ProductionLineData
+		return {
+		  'grounds' : [ (ground_id, GroundClass.get_data(db, ground_id)) for (ground_id,) in db("SELECT id FROM ground") ],
+		  'buildings' : [ (building_id, BuildingClass.get_data(db, building_id)) for (building_id,) in db("SELECT id FROM building") ],
+		  'units' : [ (unit_id, UnitClass.get_data(db, unit_id)) for (unit_id,) in db("SELECT id FROM unit") ],
+		  'production_lines' : [ (line_id, _ProductionLineData.get_data(db, line_id)) for (line_id,) in db("SELECT id FROM production_line") ],
+		}
+
+	@classmethod
+	def load_grounds(cls, db, data=None):
+		"""@param data: list of (id, data) tuples of the classes, read from db if None"""
 		cls.log.debug("Entities: loading grounds")
 		if hasattr(cls, "grounds"):
 			cls.log.debug("Entities: grounds already loaded")
 			return
 		from world.ground import GroundClass
+		if data is None:
+			data = [ (ground_id, None) for (ground_id,) in db("SELECT id FROM ground") ]
 		cls.grounds = {}
-		for (ground_id,) in db("SELECT id FROM ground"):
+		for ground_id, ground_data in data:
 			assert ground_id not in cls.grounds
-			cls.grounds[ground_id] = GroundClass(db, ground_id)
+			cls.grounds[ground_id] = GroundClass(db, ground_id, ground_data)
 
 	@classmethod
-	def load_buildings(cls, db):
+	def load_buildings(cls, db, data=None):
+		"""@param data: list of (id, data) tuples of the classes, read from db if None"""
 		cls.log.debug("Entities: loading buildings")
 		if hasattr(cls, 'buildings'):
 			cls.log.debug("Entities: buildings already loaded")
 			return
 		cls.buildings = {}
 		from world.building import BuildingClass
-		for (building_id,) in db("SELECT id FROM building"):
+		if data is None:
+			data = [ (building_id, None) for (building_id,) in db("SELECT id FROM building") ]
+		for building_id, building_data in data:
 			assert building_id not in cls.buildings
-			cls.buildings[building_id] = BuildingClass(db, building_id)
+			cls.buildings[building_id] = BuildingClass(db, building_id, building_data)
 
 	@classmethod
-	def load_units(cls, db):
+	def load_units(cls, db, data=None):
+		"""@param data: list of (id, data) tuples of the classes, read from db if None"""
 		cls.log.debug("Entities: loading units")
 		if hasattr(cls, 'units'):
 			cls.log.debug("Entities: units already loaded")
 			return
 		cls.units = {}
 		from world.units import UnitClass
-		for (unit_id,) in db("SELECT id FROM unit"):
+		if data is None:
+			data = [ (unit_id, None) for (unit_id,) in db("SELECT id FROM unit") ]
+		for unit_id, unit_data in data:
 			assert unit_id not in cls.units
-			cls.units[unit_id] = UnitClass(db, unit_id)
+			cls.units[unit_id] = UnitClass(db, unit_id, unit_data)
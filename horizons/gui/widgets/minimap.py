@@ -66,6 +66,14 @@ class Minimap(object):
 		self.minimap_image = _MinimapImage( targetrenderer, horizons.main.fife.imagemanager, \
 											self.MINIMAP_BASE_IMAGE )
 
+		# colors of the land pixels as they have been drawn, { (x, y): color } in coords
+		# relative to the top left corner of the minimap
+		self._pixel_colors = {}
+		# pixels that have to be checked for changes, same coords as _pixel_colors
+		self._dirty_pixels = set()
+		# ship dots as they have been drawn, { ship worldid: (coord, color) }
+		self._ship_dots = {}
+
 
 	def end(self):
 		self.world = None
@@ -92,7 +100,10 @@ class Minimap(object):
 		node = fife.RendererNode( fife.Point(self.location.center().x, self.location.center().y) )
 		self.renderer.addImage("minimap_a_image"+self._id, node, self.minimap_image.image, False)
 
+		self._dirty_pixels.clear()
 		self._recalculate()
+		for ship_id in self._ship_dots.keys():
+			self._remove_ship_dot(ship_id)
 		self._timed_update()
 
 		Scheduler().rem_all_classinst_calls(self)
@@ -128,16 +139,55 @@ class Minimap(object):
 			                 minimap_corners_as_renderer_node[ (i+1) % 4], *self.colors[self.cam_border])
 
 	def update(self, tup):
-		"""Recalculate and redraw minimap for real world coord tup
+		"""Recalculate and redraw minimap for real world coord tup.
+		The pixels are only marked as dirty here. All dirty pixels are checked together on the
+		next tick, and only the ones whose color changed are drawn again.
 		@param tup: (x, y)"""
 		if self.world is None or not self.world.inited:
 			return # don't draw while loading
-		minimap_point = self._get_rotated_coords(self._world_coord_to_minimap_coord(tup))
+		minimap_x, minimap_y = self._world_coord_to_minimap_coord(tup)
+		minimap_x -= self.location.left
+		minimap_y -= self.location.top
 		world_to_minimap = self._get_world_to_minimap_ratio()
-		rect = Rect.init_from_topleft_and_size(minimap_point[0], minimap_point[1], \
-		                                       int(round(1/world_to_minimap[0])) + 1, \
-		                                       int(round(1/world_to_minimap[1])) + 1)
-		self._recalculate(rect)
+		if not self._dirty_pixels:
+			Scheduler().add_new_object(self._update_dirty_pixels, self, 1)
+		for x in xrange(minimap_x, minimap_x + int(round(1/world_to_minimap[0])) + 1):
+			for y in xrange(minimap_y, minimap_y + int(round(1/world_to_minimap[1])) + 1):
+				self._dirty_pixels.add((x, y))
+
+	def _update_dirty_pixels(self):
+		"""Draws the dirty pixels whose color has changed"""
+		if self.world is None:
+			return
+		dirty_pixels = self._dirty_pixels
+		self._dirty_pixels = set()
+		location = self.location
+		pixel_colors = self._pixel_colors
+		rt = self.minimap_image.rendertarget
+		self.minimap_image.set_drawing_enabled()
+		for pixel in dirty_pixels:
+			if not (0 <= pixel[0] < location.width and 0 <= pixel[1] < location.height):
+				continue # the tile is at the border and its area exceeds the minimap
+			color = self._get_pixel_color(*pixel)
+			if color is None or pixel_colors.get(pixel) == color:
+				continue
+			pixel_colors[pixel] = color
+			rot_x, rot_y = self._get_rotated_coords( (location.left + pixel[0], location.top + pixel[1]) )
+			rt.addPoint("minimap", fife.Point(rot_x - location.left, rot_y - location.top), *color)
+
+	def _get_pixel_color(self, x, y):
+		"""Returns the color of a pixel in coords relative to the top left corner of the
+		minimap, or None for water. Same as in _recalculate."""
+		pixel_per_coord_x, pixel_per_coord_y = self._get_world_to_minimap_ratio()
+		real_map_point = Point(int(x*pixel_per_coord_x) + self.world.min_x + int(pixel_per_coord_x/2), \
+		                       int(y*pixel_per_coord_y) + self.world.min_y + int(pixel_per_coord_y/2))
+		island = self.world.get_island(real_map_point)
+		if island is None:
+			return None
+		settlement = island.get_settlement(real_map_point)
+		if settlement is None:
+			return self.colors[self.island_id]
+		return settlement.owner.color.to_tuple()
 
 	def use_overlay_icon(self, icon):
 		"""Configures icon so that clicks get mapped here.
@@ -167,6 +217,8 @@ class Minimap(object):
 		if where is None:
 			where = self.location
 			self.minimap_image.rendertarget.removeAll("minimap")
+			self._pixel_colors.clear()
+		pixel_colors = self._pixel_colors
 
 		# calculate which area of the real map is mapped to which pixel on the minimap
 		pixel_per_coord_x, pixel_per_coord_y = self._get_world_to_minimap_ratio()
@@ -228,6 +280,7 @@ class Minimap(object):
 				else:
 					continue
 
+				pixel_colors[(x, y)] = color
 				# _get_rotated_coords has been inlined here
 				rot_x, rot_y = self._rotate( (location_left + x, location_top + y), self._rotations)
 				rt.addPoint("minimap", fife.Point(rot_x - location_left, rot_y - location_top) , *color)
@@ -235,23 +288,44 @@ class Minimap(object):
 
 	def _timed_update(self):
 		"""Regular updates for domains we can't or don't want to keep track of."""
-		# update ship dots
-		self.renderer.removeAll("minimap_b_ship"+self._id)
+		# update the dots of ships that have moved since the last update
+		ship_ids = set()
 		for ship in self.world.ship_map.itervalues():
-			if not ship():
+			ship = ship()
+			if ship is None:
+				continue
+			# ships can be in the map twice while moving, both entries have the same position
+			if ship.worldid in ship_ids:
+				continue
+			ship_ids.add(ship.worldid)
+			coord = self._world_coord_to_minimap_coord( ship.position.to_tuple() )
+			color = ship.owner.color.to_tuple()
+			if self._ship_dots.get(ship.worldid) == (coord, color):
 				continue
-			coord = self._world_coord_to_minimap_coord( ship().position.to_tuple() )
-			color = ship().owner.color.to_tuple()
+			self._remove_ship_dot(ship.worldid)
+			self._ship_dots[ship.worldid] = (coord, color)
+			group = self._get_ship_dot_group(ship.worldid)
 			area_to_color = Rect.init_from_topleft_and_size(coord[0], coord[1], 3, 3)
 			for tup in area_to_color.tuple_iter():
 				try:
 					node = fife.RendererNode(fife.Point(*self._get_rotated_coords(tup)))
-					self.renderer.addPoint("minimap_b_ship"+self._id, node, *color)
+					self.renderer.addPoint(group, node, *color)
 				except KeyError:
 					# this happens in rare cases, when the ship is at the border of the map,
 					# and since we color an area, that's bigger than a point, it can exceed the
 					# minimap's dimensions.
 					pass
+		# remove dots of ships that don't exist anymore
+		for ship_id in self._ship_dots.keys():
+			if ship_id not in ship_ids:
+				self._remove_ship_dot(ship_id)
+
+	def _get_ship_dot_group(self, ship_id):
+		return "minimap_b_ship" + self._id + "_" + str(ship_id)
+
+	def _remove_ship_dot(self, ship_id):
+		if self._ship_dots.pop(ship_id, None) is not None:
+			self.renderer.removeAll(self._get_ship_dot_group(ship_id))
 
 	def rotate_right (self):
 		# keep track of rotation at any time, but only apply
@@ -0,0 +1,137 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import time
+
+import horizons.world	# needs to be imported before session
+from horizons.ai.aiplayer import AIPlayer
+from horizons.constants import GAME_SPEED
+from horizons.entities import Entities
+from horizons.ext.dummy import Dummy
+from horizons.extscheduler import ExtScheduler
+from horizons.savegamemanager import SavegameManager
+from horizons.scheduler import Scheduler
+from horizons.spsession import SPSession
+from horizons.util import (WorldObject, NamedObject, LivingObject, SavegameAccessor, Color,
+                           DifficultySettings)
+from horizons.world import World
+
+
+class HeadlessSession(SPSession):
+	"""Session without gui, view and sound, that doesn't pace its ticks by wall clock time.
+	Instead, run() advances the simulation as fast as possible. This is used for the
+	tests, as well as for balancing and AI regression runs (see run_uh.py --headless).
+
+	NOTE: fife has to be replaced by a Dummy before the game modules are imported,
+	      see horizons.main.start_headless.
+	"""
+
+	def __init__(self, db, rng_seed=None):
+		"""
+		Unfortunately, right now there is no other way to setup Dummy versions of the GUI,
+		View etc., unless we want to patch the references in the session module.
+		"""
+		super(LivingObject, self).__init__()
+		self.gui = Dummy()
+		self.db = db
+		self.savecounter = 0	# this is a new game.
+		self.is_alive = True
+
+		WorldObject.reset()
+		NamedObject.reset()
+		AIPlayer.clear_caches()
+
+		# Game
+		self.current_tick = 0
+		self.random = self.create_rng(rng_seed)
+		self.timer = self.create_timer()
+		Scheduler.create_instance(self.timer)
+		ExtScheduler.create_instance(Dummy)
+		self.manager = self.create_manager()
+		self.view = Dummy()
+		self.view.renderer = Dummy()
+		Entities.load(self.db)
+		self.scenario_eventhandler = Dummy()
+		self.campaign = {}
+		self.selected_instances = []
+
+		# GUI
+		self.gui.session = self
+		self.ingame_gui = Dummy()
+
+		GAME_SPEED.TICKS_PER_SECOND = 16
+
+	def load(self, savegame, players=None, trader_enabled=True, pirate_enabled=True, natural_resource_multiplier=1):
+		"""
+		Stripped version of Session.load. We don't need to load selections, a scenario,
+		the gui or the view.
+		@param players: see Session.load, defaults to a single human player
+		"""
+		if players is None:
+			players = [{'id': 1, 'name': 'Player', 'color': Color[1], 'local': True, 'ai': False,
+			            'difficulty': DifficultySettings.DEFAULT_LEVEL}]
+		self.savegame = savegame
+		self.savegame_db = SavegameAccessor(self.savegame)
+		savegame_data = SavegameManager.get_metadata(self.savegame)
+		self.savecounter = savegame_data.get('savecounter', 0)
+		self.load_rng_state(savegame_data)
+
+		self.world = World(self)
+		self.world._init(self.savegame_db)
+		if not self.is_game_loaded():
+			for i in sorted(players, lambda p1, p2: cmp(p1['id'], p2['id'])):
+				self.world.setup_player(i['id'], i['name'], i['color'], i['local'], i['ai'], i['difficulty'])
+			self.world.init_new_world(trader_enabled, pirate_enabled, natural_resource_multiplier)
+		self.manager.load(self.savegame_db)
+		self.world.init_fish_indexer()
+
+	def end(self):
+		super(HeadlessSession, self).end()
+		self.savegame_db.close()
+
+	def run(self, ticks=1, seconds=None, until=None):
+		"""
+		Run the scheduler the given count of ticks or (in-game) seconds. Default is 1 tick,
+		if seconds are passed, they will overwrite the tick count.
+		@param ticks: number of ticks to run, None to run until `until` holds
+		@param until: callable without arguments, the run stops as soon as it returns True
+		@return: number of ticks that have been run
+		"""
+		if seconds:
+			ticks = self.timer.get_ticks(seconds)
+		assert ticks is not None or until is not None, 'Refusing to run forever'
+
+		ticks_run = 0
+		while ticks is None or ticks_run < ticks:
+			if until is not None and until():
+				break
+			Scheduler().tick(self.current_tick)
+			self.current_tick += 1
+			ticks_run += 1
+		return ticks_run
+
+	def run_timed(self, ticks=1, seconds=None, until=None):
+		"""Same as run(), but also measures the wall clock time.
+		@return: tuple (number of ticks that have been run, ticks per second)"""
+		start = time.time()
+		ticks_run = self.run(ticks, seconds, until)
+		duration = time.time() - start
+		return ticks_run, (ticks_run / duration if duration > 0 else float('inf'))
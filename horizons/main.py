@@ -43,6 +43,7 @@ from fife import fife as fife_module
 
 from horizons.util import ActionSetLoader, DifficultySettings, TileSetLoader, Color, parse_port
 from horizons.util.uhdbaccessor import UhDbAccessor
+from horizons.util.gamedbcache import GameDbCache
 from horizons.savegamemanager import SavegameManager
 from horizons.gui import Gui
 from horizons.extscheduler import ExtScheduler
@@ -112,6 +113,8 @@ def start(command_line_arguments):
 	# set MAX_TICKS
 	if command_line_arguments.max_ticks:
 		GAME.MAX_TICKS = command_line_arguments.max_ticks
+	if command_line_arguments.profile_ticks:
+		GAME.PROFILE_TICKS = True
 
 	db = _create_db()
 
@@ -213,6 +216,29 @@ def start_singleplayer(map_file, playername = "Player", playercolor = None, is_s
 	from spsession import SPSession
 	_modules.session = SPSession(_modules.gui, db)
 
+	players = _create_player_list(playername, playercolor, ai_players, human_ai)
+
+	from horizons.scenario import InvalidScenarioFileFormat # would create import loop at top
+	try:
+		_modules.session.load(map_file, players, trader_enabled, pirate_enabled, natural_resource_multiplier, \
+			is_scenario = is_scenario, campaign = campaign)
+	except InvalidScenarioFileFormat, e:
+		raise
+	except Exception, e:
+		import traceback
+		print "Failed to load", map_file
+		traceback.print_exc()
+		if _modules.session is not None and _modules.session.is_alive:
+			_modules.session.end()
+		_modules.gui.show_main()
+		headline = _(u"Failed to start/load the game")
+		descr = _(u"The game you selected couldn't be started.") + u" " +\
+			      _("The savegame might be broken or has been saved with an earlier version.")
+		_modules.gui.show_error_popup(headline, descr)
+		load_game(ai_players, human_ai)
+
+def _create_player_list(playername, playercolor, ai_players, human_ai):
+	"""Returns the player dicts for a new singleplayer game, see Session.load."""
 	# for now just make it a bit easier for the AI
 	difficulty_level = {False: DifficultySettings.DEFAULT_LEVEL, True: DifficultySettings.EASY_LEVEL}
 	players = [{ 'id' : 1, 'name' : playername, 'color' : playercolor, 'local' : True, 'ai': human_ai, 'difficulty': difficulty_level[bool(human_ai)]}]
@@ -232,25 +258,63 @@ def start_singleplayer(map_file, playername = "Player", playercolor = None, is_s
 				color = possible_color
 				break
 		players.append({'id': num + 2, 'name' : 'AI' + str(num + 1), 'color' : color, 'local' : False, 'ai': True, 'difficulty': difficulty_level[True]})
+	return players
 
-	from horizons.scenario import InvalidScenarioFileFormat # would create import loop at top
-	try:
-		_modules.session.load(map_file, players, trader_enabled, pirate_enabled, natural_resource_multiplier, \
-			is_scenario = is_scenario, campaign = campaign)
-	except InvalidScenarioFileFormat, e:
-		raise
-	except Exception, e:
-		import traceback
-		print "Failed to load", map_file
-		traceback.print_exc()
-		if _modules.session is not None and _modules.session.is_alive:
-			_modules.session.end()
-		_modules.gui.show_main()
-		headline = _(u"Failed to start/load the game")
-		descr = _(u"The game you selected couldn't be started.") + u" " +\
-			      _("The savegame might be broken or has been saved with an earlier version.")
-		_modules.gui.show_error_popup(headline, descr)
-		load_game(ai_players, human_ai)
+def setup_headless():
+	"""Replaces the engine by a dummy, so that the game can run without display and sound.
+	This has to be called before the game modules (e.g. horizons.headless) are imported."""
+	global fife
+	import fife as fife_package
+	from horizons.ext.dummy import Dummy
+	fife_package.fife = Dummy
+	fife = Dummy
+
+def start_headless(command_line_arguments):
+	"""Runs a map or savegame without gui, view and sound as fast as possible (no tick pacing).
+	The game is given by --load-map or --start-map, it runs for --max-ticks ticks.
+	This is intended for balancing and AI regression runs.
+	@param command_line_arguments: options object from optparse.OptionParser. see run_uh.py.
+	@return: bool, whether the run worked
+	"""
+	global db
+	setup_headless()
+
+	if command_line_arguments.max_ticks is None:
+		print _("Error: --headless needs the number of ticks to run (--max-ticks).")
+		return False
+
+	SavegameManager.init()
+	if command_line_arguments.load_map is not None:
+		map_file = _find_map_file(command_line_arguments.load_map, SavegameManager.get_saves(), \
+			_("Error: Cannot find savegame \"%s\".") % command_line_arguments.load_map)
+	elif command_line_arguments.start_map is not None:
+		map_file = _find_map_file(command_line_arguments.start_map, SavegameManager.get_maps(), \
+			_("Error: Cannot find map \"%s\".") % command_line_arguments.start_map)
+	else:
+		print _("Error: --headless needs a game to run (--load-map or --start-map).")
+		return False
+	if map_file is None:
+		return False
+
+	if command_line_arguments.nature_seed:
+		SINGLEPLAYER.SEED = command_line_arguments.nature_seed
+	if command_line_arguments.human_ai:
+		AI.HUMAN_AI = True
+	if command_line_arguments.profile_ticks:
+		GAME.PROFILE_TICKS = True
+
+	db = _create_db()
+	from horizons.headless import HeadlessSession
+	session = HeadlessSession(db)
+	_modules.session = session
+	players = _create_player_list("Player", Color[1], command_line_arguments.ai_players, command_line_arguments.human_ai)
+	session.load(map_file, players)
+
+	ticks, ticks_per_second = session.run_timed(command_line_arguments.max_ticks)
+	print _("Ran %(ticks)d ticks at %(speed).1f ticks per second.") % {'ticks': ticks, 'speed': ticks_per_second}
+	session.end()
+	_modules.session = None
+	return True
 
 def prepare_multiplayer(game, trader_enabled = True, pirate_enabled = True, natural_resource_multiplier = 1):
 	"""Starts a multiplayer game server
@@ -319,30 +383,8 @@ def _start_map(map_name, ai_players, human_ai, is_scenario=False, campaign=None,
 	@return: bool, whether loading succeded"""
 	# check for exact/partial matches in map list first
 	maps = SavegameManager.get_available_scenarios() if is_scenario else SavegameManager.get_maps()
-	map_file = None
-	for i in xrange(0, len(maps[1])):
-		# exact match
-		if maps[1][i] == map_name:
-			map_file = maps[0][i]
-			break
-		# check for partial match
-		if maps[1][i].startswith(map_name):
-			if map_file is not None:
-				# multiple matches, collect all for output
-				map_file += u'\n' + maps[0][i]
-			else:
-				map_file = maps[0][i]
+	map_file = _find_map_file(map_name, maps, _("Error: Cannot find map \"%s\".") % map_name)
 	if map_file is None:
-		# not a map name, check for path to file or fail
-		if os.path.exists(map_name):
-			map_file = map_name
-		else:
-			print _("Error: Cannot find map \"%s\".") % map_name
-			return False
-	if len(map_file.splitlines()) > 1:
-		print _("Error: Found multiple matches: ")
-		for match in map_file.splitlines():
-			print os.path.basename(match)
 		return False
 	load_game(ai_players, human_ai, map_file, is_scenario, campaign=campaign,
 	          trader_enabled=trader_enabled, pirate_enabled=pirate_enabled)
@@ -392,33 +434,44 @@ def _load_map(savegame, ai_players, human_ai):
 	@return: bool, whether loading succeded"""
 	# first check for partial or exact matches in the normal savegame list
 	saves = SavegameManager.get_saves()
+	map_file = _find_map_file(savegame, saves, _("Error: Cannot find savegame \"%s\".") % savegame)
+	if map_file is None:
+		return False
+	load_game(savegame=map_file)
+	return True
+
+def _find_map_file(name, maps, not_found_msg):
+	"""Finds the file of a map or savegame specified by user.
+	@param name: either the (partial) displayname or a path to the file
+	@param maps: tuple (files, displaynames), as returned by the SavegameManager
+	@param not_found_msg: error message that is printed if there's no such file
+	@return: path to the file or None if there are no or multiple matches"""
 	map_file = None
-	for i in xrange(0, len(saves[1])):
+	for i in xrange(0, len(maps[1])):
 		# exact match
-		if saves[1][i] == savegame:
-			map_file = saves[0][i]
+		if maps[1][i] == name:
+			map_file = maps[0][i]
 			break
 		# check for partial match
-		if saves[1][i].startswith(savegame):
+		if maps[1][i].startswith(name):
 			if map_file is not None:
 				# multiple matches, collect all for output
-				map_file += u'\n' + saves[0][i]
+				map_file += u'\n' + maps[0][i]
 			else:
-				map_file = saves[0][i]
+				map_file = maps[0][i]
 	if map_file is None:
-		# not a savegame, check for path to file or fail
-		if os.path.exists(savegame):
-			map_file = savegame
+		# not a map name, check for path to file or fail
+		if os.path.exists(name):
+			map_file = name
 		else:
-			print _("Error: Cannot find savegame \"%s\".") % savegame
-			return False
+			print not_found_msg
+			return None
 	if len(map_file.splitlines()) > 1:
 		print _("Error: Found multiple matches: ")
 		for match in map_file.splitlines():
 			print os.path.basename(match)
-		return False
-	load_game(savegame=map_file)
-	return True
+		return None
+	return map_file
 
 def _load_last_quicksave():
 	"""Load last quicksave
@@ -437,10 +490,12 @@ def _create_db():
 	"""Returns a dbreader instance, that is connected to the main game data dbfiles.
 	NOTE: This data is read_only, so there are no concurrency issues"""
 	_db = UhDbAccessor(':memory:')
-	for i in PATHS.DB_FILES:
-		f = open(i, "r")
-		sql = "BEGIN TRANSACTION;" + f.read() + "COMMIT;"
-		_db.execute_script(sql)
+	# executing the sql files takes longer than copying a cached version of the result
+	game_db_cache = GameDbCache(PATHS.GAME_DB_CACHE_FILE, PATHS.DB_FILES)
+	if not game_db_cache.load(_db):
+		game_db_cache.execute_sql_files(_db)
+		game_db_cache.build()
+	_db.game_data_checksum = game_db_cache.get_checksum()
 	return _db
 
 def preload_game_data(lock):
@@ -95,6 +95,10 @@ class MPManager(LivingObject):
 
 		self._last_local_commands_send_tick = -1 # last tick, where local commands got sent
 
+		# values of the recent checkup hashes, to find the differences when they don't match
+		self._checkup_hash_details = {} # { tick : dict }
+		self._checkup_hash_details_sent = set() # ticks
+
 	def end(self):
 		pass
 
@@ -114,6 +118,9 @@ class MPManager(LivingObject):
 			elif isinstance(packet, CheckupHashPacket):
 				self.log.debug("Got checkuphash packet from " + str(packet.player_id) + " for tick " + str(packet.tick))
 				self.checkuphashmanager.add_packet(packet)
+			elif isinstance(packet, CheckupHashDetailsPacket):
+				self.log.debug("Got checkuphash details packet from " + str(packet.player_id) + " for tick " + str(packet.tick))
+				self.hash_details_diff(packet)
 			else:
 				self.log.warn("invalid packet: "+str(packet))
 
@@ -135,9 +142,15 @@ class MPManager(LivingObject):
 
 			# check if we have to evaluate a hash value
 			if self.calculate_hash_tick(tick) % self.HASH_EVAL_DISTANCE == 0:
+				hash_tick = self.calculate_hash_tick(tick)
 				hash_value = self.session.world.get_checkup_hash()
 				#self.log.debug("MPManager: Checkup hash for tick %s is %s", tick, hash_value)
-				checkuphashpacket = CheckupHashPacket(self.calculate_hash_tick(tick), \
+				# keep the values until the hash has been checked
+				self._checkup_hash_details[hash_tick] = self.session.world.get_checkup_hash_details()
+				for old_tick in self._checkup_hash_details.keys():
+					if old_tick < hash_tick - 2 * (self.HASHDELAY + self.HASH_EVAL_DISTANCE):
+						del self._checkup_hash_details[old_tick]
+				checkuphashpacket = CheckupHashPacket(hash_tick, \
 			                              self.session.world.player.worldid, hash_value)
 				self.checkuphashmanager.add_packet(checkuphashpacket)
 				self.log.debug("sending checkuphash for tick %d" % (checkuphashpacket.tick))
@@ -177,6 +190,11 @@ class MPManager(LivingObject):
 		if tick % self.HASH_EVAL_DISTANCE == 0:
 			if self.checkuphashmanager.are_checkup_hash_values_equal(tick, self.hash_value_diff) == False:
 				self.log.error("MPManager: Hash values generated in tick %s are not equal" % str(tick - self.HASHDELAY))
+				# only the digests are sent each time, exchange the values to find the difference
+				if tick not in self._checkup_hash_details_sent and tick in self._checkup_hash_details:
+					self._checkup_hash_details_sent.add(tick)
+					self.networkinterface.send_to_all_clients(CheckupHashDetailsPacket(tick, \
+					    self.session.world.player.worldid, self._checkup_hash_details[tick]))
 			else:
 				#self.log.debug("MPManager: Hash values are equal")
 				pass
@@ -185,6 +203,21 @@ class MPManager(LivingObject):
 		self.log.error("MPManager: Hash diff:\n%s hash1: %s\n%s hash2: %s" % (player1, hash1, player2, hash2))
 		self.log.error("------------------")
 
+	def hash_details_diff(self, packet):
+		"""Logs the values that differ between the local checkup hash and the one of another player
+		@param packet: CheckupHashDetailsPacket"""
+		local_details = self._checkup_hash_details.get(packet.tick)
+		if local_details is None:
+			self.log.error("MPManager: Hash values of pl#%02d for tick %s: %s" % (packet.player_id, packet.tick, packet.details))
+			return
+		for key in sorted(set(local_details).union(packet.details)):
+			local_value = local_details.get(key)
+			remote_value = packet.details.get(key)
+			if local_value != remote_value:
+				self.log.error("MPManager: Hash diff in tick %s for %s:\nlocal: %s\npl#%02d: %s" % \
+				               (packet.tick, key, local_value, packet.player_id, remote_value))
+		self.log.error("------------------")
+
 
 	def calculate_execution_tick(self, tick):
 		return tick + self.EXECUTIONDELAY
@@ -303,8 +336,18 @@ class CommandPacket(MPPacket):
 MPPacket.allow_network(CommandPacket)
 
 class CheckupHashPacket(MPPacket):
+	"""Digest of the game state (see World.get_checkup_hash), sent every HASH_EVAL_DISTANCE ticks"""
 	def __init__(self, tick, player_id, checkup_hash):
 		super(CheckupHashPacket, self).__init__(tick, player_id)
 		self.checkup_hash = checkup_hash
 
 MPPacket.allow_network(CheckupHashPacket)
+
+class CheckupHashDetailsPacket(MPPacket):
+	"""Values that a checkup hash has been calculated from.
+	Only sent after the hashes of the players didn't match."""
+	def __init__(self, tick, player_id, details):
+		super(CheckupHashDetailsPacket, self).__init__(tick, player_id)
+		self.details = details
+
+MPPacket.allow_network(CheckupHashDetailsPacket)
@@ -37,9 +37,10 @@ MAX_PEERS = 1
 # time in ms the client will wait for a packet
 # on error client may wait twice that time
 SERVER_TIMEOUT = 5000
-# current server/client protocol the client understands
+# newest server/client protocol the client understands
 # increment that after incompatible protocol changes
-SERVER_PROTOCOL = 0
+# the protocol actually used is negotiated during connect
+SERVER_PROTOCOL = packets.PROTOCOL_BINARY
 
 class ClientMode(object):
 	Server = 0
@@ -60,6 +61,7 @@ class Client(object):
 		self.serverpeer    = None
 		self.mode          = None
 		self.sid           = None
+		self.protocol      = None
 		self.game          = None
 		self.packetqueue   = []
 		self.callbacks     = {
@@ -99,9 +101,22 @@ class Client(object):
 	def connect(self):
 		if self.serverpeer is not None:
 			raise network.AlreadyConnected("We are already connected to a server")
+		try:
+			self._connect(SERVER_PROTOCOL)
+		except network.FatalError:
+			if SERVER_PROTOCOL == packets.PROTOCOL_PICKLE:
+				raise
+			# servers that don't know about protocol negotiation refuse newer protocols
+			self.log.debug("[CONNECT] server refused protocol %d, trying legacy protocol" % (SERVER_PROTOCOL))
+			self.reset()
+			self._connect(packets.PROTOCOL_PICKLE)
+
+	def _connect(self, protocol):
+		"""Connects to the server offering protocols up to protocol.
+		The server replies with the protocol it chose (cmd_session.protocol)."""
 		self.log.debug("[CONNECT] to server %s" % (self.serveraddress))
 		try:
-			self.serverpeer = self.host.connect(enet.Address(self.serveraddress.host, self.serveraddress.port), 1, SERVER_PROTOCOL)
+			self.serverpeer = self.host.connect(enet.Address(self.serveraddress.host, self.serveraddress.port), 1, protocol)
 		except (IOError, MemoryError):
 			raise network.NetworkException("Unable to connect to server. Maybe invalid or irresolvable server address.")
 		self.mode = ClientMode.Server
@@ -118,7 +133,8 @@ class Client(object):
 		elif not isinstance(packet[1], packets.server.cmd_session):
 			raise network.CommandError("Unexpected packet")
 		self.sid = packet[1].sid
-		self.log.debug("[CONNECT] done (session=%s)" % (self.sid))
+		self.protocol = min(protocol, getattr(packet[1], 'protocol', packets.PROTOCOL_PICKLE))
+		self.log.debug("[CONNECT] done (session=%s, protocol=%d)" % (self.sid, self.protocol))
 
 	#-----------------------------------------------------------------------------
 
@@ -175,6 +191,7 @@ class Client(object):
 			self.serverpeer = None
 		self.mode = None
 		self.game = None
+		self.protocol = None
 		self.flush()
 
 	#-----------------------------------------------------------------------------
@@ -203,7 +220,7 @@ class Client(object):
 			raise network.NotConnected()
 		if self.mode is ClientMode.Game:
 			packet = packets.client.game_data(packet)
-		packet.send(self.serverpeer, self.sid, channelid)
+		packet.send(self.serverpeer, self.sid, channelid, self.protocol)
 
 	#-----------------------------------------------------------------------------
 
@@ -232,7 +249,7 @@ class Client(object):
 		elif event.type == enet.EVENT_TYPE_RECEIVE:
 			packet = None
 			try:
-				packet = packets.unserialize(event.packet.data)
+				packet = packets.unserialize(event.packet.data, self.protocol)
 			except Exception, e:
 				self.log.error("Unknown packet from %s!" % (event.peer.address))
 				errstr = "Pickle/Security: %s" % (e)
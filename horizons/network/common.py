@@ -124,6 +124,8 @@ class Game(object):
 		self.players       = []
 		self.playercnt     = 0
 		self.state         = Game.State.Open
+		# all players have to use the same protocol, game data is relayed as is
+		self.protocol      = creator.protocol
 		self.add_player(creator)
 
 	def add_player(self, player):
@@ -33,9 +33,17 @@ __version__ = '0.1'
 __all__ = [
 	'SafeUnpickler',
 	'packet',
+	'PROTOCOL_PICKLE',
+	'PROTOCOL_BINARY',
 ]
 
 PICKLE_PROTOCOL = 2
+
+# multiplayer protocols, negotiated during the handshake (see Server.onconnect)
+# 0: pickled packets (legacy, only accepted from peers that don't support anything else)
+# 1: binary packets (see wireformat.py)
+PROTOCOL_PICKLE = 0
+PROTOCOL_BINARY = 1
 PICKLE_RECIEVE_FROM = 'server'
 PICKLE_SAFE = {
 	'client' : {},
@@ -109,13 +117,15 @@ class packet(object):
 	def __init__(self):
 		self.sid = None
 
-	def serialize(self):
+	def serialize(self, protocol = PROTOCOL_PICKLE):
+		if protocol >= PROTOCOL_BINARY:
+			return wireformat.encode(self)
 		return cPickle.dumps(self, PICKLE_PROTOCOL)
 
-	def send(self, peer, sid = None, channelid = 0):
+	def send(self, peer, sid = None, channelid = 0, protocol = PROTOCOL_PICKLE):
 		if sid is not None:
 			self.sid = sid
-		self._send(peer, self.serialize(), channelid)
+		self._send(peer, self.serialize(protocol), channelid)
 
 	@staticmethod
 	def _send(peer, data, channelid = 0):
@@ -147,12 +157,25 @@ SafeUnpickler.add('common', cmd_fatalerror)
 
 #-------------------------------------------------------------------------------
 
-def unserialize(data):
+def unserialize(data, protocol = None):
+	"""
+	@param data: received data
+	@param protocol: protocol negotiated with the peer or None if it isn't known yet,
+	                 in which case both formats are accepted
+	"""
+	if wireformat.is_binary(data):
+		if protocol is not None and protocol < PROTOCOL_BINARY:
+			raise wireformat.WireFormatError("Binary packet from legacy peer")
+		return wireformat.decode(data)
+	if protocol is not None and protocol >= PROTOCOL_BINARY:
+		raise wireformat.WireFormatError("Pickled packet from binary protocol peer")
 	packet = SafeUnpickler.loads(data)
 	return packet
 
 #-------------------------------------------------------------------------------
 
+from horizons.network.packets import wireformat
+
 import horizons.network.packets.server
 import horizons.network.packets.client
 
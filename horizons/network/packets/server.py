@@ -24,8 +24,10 @@ from horizons.network.packets import *
 import copy
 
 class cmd_session(packet):
-	def __init__(self, sid):
+	def __init__(self, sid, protocol = PROTOCOL_PICKLE):
 		self.sid = sid
+		# protocol used from now on, older servers don't send it
+		self.protocol = protocol
 
 SafeUnpickler.add('server', cmd_session)
 
@@ -0,0 +1,364 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+Compact binary encoding of network packets.
+
+Unlike pickle, decoding this format never imports modules or calls
+arbitrary constructors: objects can only be created from classes that are
+whitelisted with SafeUnpickler.add(). Their state is read as plain values
+(None, bool, int, float, str, unicode, tuple, list, dict, set).
+
+Layout of an encoded packet:
+  header: struct '!BB' (MAGIC, WIRE_VERSION)
+  body:   one value (usually the packet object)
+
+Every value starts with a tag byte. Integers and lengths are stored as
+varints (7 bits per byte, LSB first), signed integers are zigzag encoded.
+Small non-negative integers (most ids and coordinates) are stored in the tag.
+
+Classes listed in TYPES are referenced by their index (interned type id)
+and their state is stored in the order of the schema fields, so no
+attribute names are transmitted. Other whitelisted classes are sent with
+their full name and a dict of their state.
+
+TYPES may only be appended to. Removing or reordering entries, or changing
+a schema, requires incrementing WIRE_VERSION.
+"""
+
+import struct
+
+from horizons.network.packets import SafeUnpickler
+
+MAGIC = 0x55 # never equals the first byte of a pickle (protocol 2 starts with 0x80)
+WIRE_VERSION = 1
+HEADER = struct.Struct('!BB')
+DOUBLE = struct.Struct('!d')
+
+# maximal nesting of containers and objects accepted by the decoder
+MAX_DEPTH = 32
+
+_PACKET = ('sid', )
+_GENERIC_COMMAND = ('obj_id', 'method', 'args', 'kwargs')
+
+# (full class name, schema fields or None for a generic state dict)
+TYPES = (
+	('horizons.network.packets.cmd_ok', _PACKET),
+	('horizons.network.packets.cmd_error', _PACKET + ('errorstr', )),
+	('horizons.network.packets.cmd_fatalerror', _PACKET + ('errorstr', )),
+	('horizons.network.packets.server.cmd_session', _PACKET + ('protocol', )),
+	('horizons.network.packets.server.data_gameslist', _PACKET + ('games', )),
+	('horizons.network.packets.server.data_gamestate', _PACKET + ('game', )),
+	('horizons.network.packets.server.cmd_chatmsg', _PACKET + ('playername', 'chatmsg')),
+	('horizons.network.packets.server.cmd_preparegame', _PACKET),
+	('horizons.network.packets.server.cmd_startgame', _PACKET),
+	('horizons.network.packets.client.cmd_creategame', _PACKET + ('clientversion', 'mapname', 'maxplayers', 'playername')),
+	('horizons.network.packets.client.cmd_listgames', _PACKET + ('clientversion', 'mapname', 'maxplayers')),
+	('horizons.network.packets.client.cmd_joingame', _PACKET + ('uuid', 'clientversion', 'playername')),
+	('horizons.network.packets.client.cmd_leavegame', _PACKET),
+	('horizons.network.packets.client.cmd_chatmsg', _PACKET + ('chatmsg', )),
+	('horizons.network.packets.client.cmd_changename', _PACKET + ('playername', )),
+	('horizons.network.packets.client.cmd_preparedgame', _PACKET),
+	('horizons.network.packets.client.game_data', _PACKET + ('data', )),
+	('horizons.network.common.Player', ('sid', 'address', 'name')),
+	('horizons.network.common.Game', ('uuid', 'clientversion', 'mapname', 'maxplayers', 'creator', \
+	                                  'creator_sid', 'players', 'playercnt', 'state', 'protocol')),
+	('horizons.manager.CommandPacket', ('tick', 'player_id', 'commandlist')),
+	('horizons.manager.CheckupHashPacket', ('tick', 'player_id', 'checkup_hash')),
+	('horizons.manager.CheckupHashDetailsPacket', ('tick', 'player_id', 'details')),
+	('horizons.command.building.Build', ('building_class', 'ship', 'x', 'y', 'rotation', 'ownerless', \
+	                                     'island', 'settlement', 'tearset', 'data', 'action_set_id')),
+	('horizons.command.building.Tear', ('building', )),
+	('horizons.command.unit.Act', _GENERIC_COMMAND),
+	('horizons.command.unit.Attack', _GENERIC_COMMAND),
+	('horizons.command.unit.CreateUnit', ('owner_id', 'unit_id', 'x', 'y', 'kwargs')),
+	('horizons.command.sounds.PlaySound', ('sound', 'position')),
+	('horizons.command.misc.Chat', ('message', )),
+	('horizons.command.objectupgrades.ObjectUpgrade', ()),
+	('horizons.command.diplomacy.AddAllyPair', ('player1_id', 'player2_id')),
+	('horizons.command.diplomacy.AddEnemyPair', ('player1_id', 'player2_id')),
+	('horizons.command.diplomacy.AddNeutralPair', ('player1_id', 'player2_id')),
+	('horizons.command.production.ToggleActive', _GENERIC_COMMAND),
+	('horizons.command.production.AddProduction', _GENERIC_COMMAND),
+	('horizons.command.uioptions.SetTaxSetting', _GENERIC_COMMAND),
+	('horizons.command.uioptions.SetSettlementUpgradePermissions', _GENERIC_COMMAND),
+	('horizons.command.uioptions.AddToBuyList', _GENERIC_COMMAND),
+	('horizons.command.uioptions.RemoveFromBuyList', _GENERIC_COMMAND),
+	('horizons.command.uioptions.AddToSellList', _GENERIC_COMMAND),
+	('horizons.command.uioptions.RemoveFromSellList', _GENERIC_COMMAND),
+	('horizons.command.uioptions.TransferResource', _GENERIC_COMMAND),
+	('horizons.command.uioptions.SellResource', _GENERIC_COMMAND),
+	('horizons.command.uioptions.BuyResource', _GENERIC_COMMAND),
+	('horizons.command.uioptions.RenameObject', _GENERIC_COMMAND),
+	('horizons.command.uioptions.EquipWeaponFromInventory', _GENERIC_COMMAND),
+	('horizons.command.uioptions.UnequipWeaponToInventory', _GENERIC_COMMAND),
+)
+
+_TYPE_IDS = dict((name, type_id) for type_id, (name, fields) in enumerate(TYPES))
+_TYPE_FIELDS = [ frozenset(fields) for name, fields in TYPES ]
+
+# value tags
+T_NONE, T_TRUE, T_FALSE, T_INT, T_FLOAT, T_STR, T_UNICODE, T_TUPLE, T_LIST, \
+T_DICT, T_SET, T_FROZENSET, T_OBJECT, T_NAMED_OBJECT = xrange(14)
+# tags from T_SMALL_INT on are non-negative integers smaller than SMALL_INT_LIMIT
+T_SMALL_INT = 0x20
+SMALL_INT_LIMIT = 0x100 - T_SMALL_INT
+
+
+class WireFormatError(Exception):
+	"""Raised on data that can't be encoded or decoded"""
+	pass
+
+
+def _write_varint(out, value):
+	"""Appends unsigned integer value to the list of byte strings out"""
+	while value > 0x7f:
+		out.append(chr((value & 0x7f) | 0x80))
+		value >>= 7
+	out.append(chr(value))
+
+def _get_state(obj):
+	state = obj.__getstate__() if hasattr(obj, '__getstate__') else obj.__dict__
+	if not isinstance(state, dict):
+		raise WireFormatError("Unsupported state of %s" % obj.__class__)
+	return state
+
+
+class Encoder(object):
+	"""Encodes packets. Instances don't carry any state, Encoder.encode can be used directly."""
+
+	@classmethod
+	def encode(cls, obj):
+		"""Returns the binary representation of obj including header"""
+		out = [HEADER.pack(MAGIC, WIRE_VERSION)]
+		cls._write(out, obj)
+		return ''.join(out)
+
+	@classmethod
+	def _write(cls, out, value):
+		value_type = type(value)
+		if value is None:
+			out.append(chr(T_NONE))
+		elif value_type is bool:
+			out.append(chr(T_TRUE if value else T_FALSE))
+		elif value_type is int or value_type is long:
+			if 0 <= value < SMALL_INT_LIMIT:
+				out.append(chr(T_SMALL_INT + value))
+				return
+			out.append(chr(T_INT))
+			_write_varint(out, value << 1 if value >= 0 else ((-value) << 1) - 1)
+		elif value_type is float:
+			out.append(chr(T_FLOAT))
+			out.append(DOUBLE.pack(value))
+		elif value_type is str:
+			out.append(chr(T_STR))
+			_write_varint(out, len(value))
+			out.append(value)
+		elif value_type is unicode:
+			value = value.encode('utf-8')
+			out.append(chr(T_UNICODE))
+			_write_varint(out, len(value))
+			out.append(value)
+		elif value_type is tuple or value_type is list or value_type is set or value_type is frozenset:
+			out.append(chr(cls._SEQUENCE_TAGS[value_type]))
+			_write_varint(out, len(value))
+			for item in value:
+				cls._write(out, item)
+		elif value_type is dict:
+			out.append(chr(T_DICT))
+			_write_varint(out, len(value))
+			for key, item in value.iteritems():
+				cls._write(out, key)
+				cls._write(out, item)
+		else:
+			cls._write_object(out, value)
+
+	_SEQUENCE_TAGS = { tuple: T_TUPLE, list: T_LIST, set: T_SET, frozenset: T_FROZENSET }
+
+	@classmethod
+	def _write_object(cls, out, obj):
+		klass = obj.__class__
+		name = klass.__module__ + '.' + klass.__name__
+		state = _get_state(obj)
+		type_id = _TYPE_IDS.get(name)
+		if type_id is None:
+			# not interned, send name and state as dict
+			out.append(chr(T_NAMED_OBJECT))
+			cls._write(out, name)
+			cls._write(out, state)
+			return
+		fields = TYPES[type_id][1]
+		if len(state) > len(fields) or not _TYPE_FIELDS[type_id].issuperset(state):
+			raise WireFormatError("State of %s doesn't match the schema: %s" % \
+			                      (name, sorted(set(state).difference(fields))))
+		out.append(chr(T_OBJECT))
+		_write_varint(out, type_id)
+		for field in fields:
+			cls._write(out, state.get(field))
+
+
+class Decoder(object):
+	"""Decodes a single packet.
+	Objects are created only from classes whitelisted for the origin that SafeUnpickler
+	is set up for (see SafeUnpickler.set_mode)."""
+
+	def __init__(self, data):
+		self.data = data
+		self.pos = 0
+
+	@classmethod
+	def decode(cls, data):
+		"""Returns the object encoded in data
+		@param data: str, as returned by Encoder.encode
+		@raises WireFormatError on invalid or unsafe data"""
+		if len(data) < HEADER.size:
+			raise WireFormatError("Packet too short")
+		magic, version = HEADER.unpack_from(data)
+		if magic != MAGIC:
+			raise WireFormatError("Not a binary packet")
+		if version != WIRE_VERSION:
+			raise WireFormatError("Unsupported wire format version %s" % version)
+		decoder = cls(data)
+		decoder.pos = HEADER.size
+		try:
+			value = decoder._read(0)
+		except (IndexError, struct.error, UnicodeDecodeError), e:
+			raise WireFormatError("Malformed packet: %s" % e)
+		if decoder.pos != len(data):
+			raise WireFormatError("Trailing data after packet")
+		return value
+
+	def _read_varint(self):
+		data = self.data
+		result = ord(data[self.pos])
+		self.pos += 1
+		if result < 0x80:
+			return result
+		result &= 0x7f
+		shift = 7
+		while True:
+			byte = ord(data[self.pos])
+			self.pos += 1
+			result |= (byte & 0x7f) << shift
+			if byte < 0x80:
+				return result
+			shift += 7
+			if shift > 70:
+				raise WireFormatError("Varint too long")
+
+	def _read_length(self):
+		# every item needs at least one byte, so longer lengths can only be malicious
+		length = self._read_varint()
+		if length > len(self.data) - self.pos:
+			raise WireFormatError("Invalid length %s" % length)
+		return length
+
+	def _read_bytes(self):
+		length = self._read_length()
+		start = self.pos
+		self.pos += length
+		return self.data[start:self.pos]
+
+	def _read(self, depth):
+		tag = ord(self.data[self.pos])
+		self.pos += 1
+		if tag >= T_SMALL_INT:
+			return tag - T_SMALL_INT
+		elif tag == T_INT:
+			value = self._read_varint()
+			return -((value + 1) >> 1) if value & 1 else value >> 1
+		elif tag == T_NONE:
+			return None
+		elif tag == T_TRUE:
+			return True
+		elif tag == T_FALSE:
+			return False
+		elif tag == T_STR:
+			return self._read_bytes()
+		elif tag == T_UNICODE:
+			return self._read_bytes().decode('utf-8')
+		elif tag == T_FLOAT:
+			value = DOUBLE.unpack_from(self.data, self.pos)[0]
+			self.pos += DOUBLE.size
+			return value
+
+		depth += 1
+		if depth > MAX_DEPTH:
+			raise WireFormatError("Packet nested too deeply")
+		if tag == T_TUPLE or tag == T_LIST or tag == T_SET or tag == T_FROZENSET:
+			items = [ self._read(depth) for i in xrange(self._read_length()) ]
+			if tag == T_LIST:
+				return items
+			return self._SEQUENCE_TYPES[tag](items)
+		elif tag == T_DICT:
+			value = {}
+			for i in xrange(self._read_length()):
+				key = self._read(depth)
+				value[key] = self._read(depth)
+			return value
+		elif tag == T_OBJECT:
+			type_id = self._read_varint()
+			if type_id >= len(TYPES):
+				raise WireFormatError("Unknown type id %s" % type_id)
+			name, fields = TYPES[type_id]
+			state = {}
+			for field in fields:
+				state[field] = self._read(depth)
+			return self._create(name, state)
+		elif tag == T_NAMED_OBJECT:
+			name = self._read(depth)
+			state = self._read(depth)
+			if not isinstance(name, str) or not isinstance(state, dict):
+				raise WireFormatError("Invalid object")
+			return self._create(name, state)
+		raise WireFormatError("Unknown tag %s" % tag)
+
+	_SEQUENCE_TYPES = { T_TUPLE: tuple, T_SET: set, T_FROZENSET: frozenset }
+
+	@classmethod
+	def _create(cls, name, state):
+		module, dot, klass_name = name.rpartition('.')
+		try:
+			klass = SafeUnpickler.find_class(module, klass_name)
+		except Exception, e:
+			raise WireFormatError(str(e))
+		if not isinstance(klass, type):
+			raise WireFormatError("Attempting to create instance of %s" % name)
+		for key in state:
+			if not isinstance(key, str):
+				raise WireFormatError("Invalid attribute name in %s" % name)
+		obj = klass.__new__(klass)
+		try:
+			obj.__dict__.update(state)
+		except AttributeError:
+			raise WireFormatError("Attempting to set state of %s" % name)
+		return obj
+
+
+def encode(obj):
+	return Encoder.encode(obj)
+
+def decode(data):
+	return Decoder.decode(data)
+
+def is_binary(data):
+	"""Returns whether data looks like a packet in this format (as opposed to a pickle)"""
+	return len(data) > 0 and ord(data[0]) == MAGIC
@@ -30,6 +30,10 @@ enet = find_enet_module(client = False)
 
 MAX_PEERS = 4095
 CONNECTION_TIMEOUT = 500
+# range of protocols the server accepts, clients send the newest one they support
+# raise MIN_PROTOCOL to refuse clients that can only send pickled packets
+MIN_PROTOCOL = packets.PROTOCOL_PICKLE
+MAX_PROTOCOL = packets.PROTOCOL_BINARY
 
 logging.basicConfig(format = '[%(asctime)-15s] [%(levelname)s] %(message)s',
 		level = logging.DEBUG)
@@ -134,7 +138,9 @@ class Server(object):
 	def send(self, peer, packet, channelid = 0):
 		if self.host is None:
 			raise network.NotConnected("Server is not running")
-		packet.send(peer, None, channelid)
+		player = self.players.get(peer.data)
+		protocol = player.protocol if player is not None else packets.PROTOCOL_PICKLE
+		packet.send(peer, None, channelid, protocol)
 		self.host.flush()
 
 	def _send(self, peer, data, channelid = 0):
@@ -171,21 +177,22 @@ class Server(object):
 		#	logging.warning("[CONNECT] Already known player %s!" % (peer.address))
 		#	self.fatalerror(event.peer, "You can't connect more than once")
 		#	return
-		player = Player(event.peer, self.generate_session_id(), event.data)
+		# negotiate protocol: event.data is the newest protocol the client supports
+		player = Player(event.peer, self.generate_session_id(), min(event.data, MAX_PROTOCOL))
 		logging.debug("[CONNECT] New Client: %s" % (player))
 
 		# store session id inside enet.peer.data
 		# NOTE: ALWAYS initialize peer.data
 		event.peer.data = player.sid
 
-		if (player.protocol > 0):
+		if (player.protocol < MIN_PROTOCOL):
 			logging.warning("[CONNECT] %s runs old or unsupported protocol" % (player))
 			self.fatalerror(event.peer, "Old or unsupported multiplayer protocol. Please check your game version")
 			return
 
 		# note: copying bytes or int doesn't work here
 		self.players[player.sid] = player
-		self.send(event.peer, packets.server.cmd_session(player.sid))
+		self.send(event.peer, packets.server.cmd_session(player.sid, player.protocol))
 
 
 	def ondisconnect(self, event):
@@ -218,7 +225,7 @@ class Server(object):
 
 		packet = None
 		try:
-			packet = packets.unserialize(event.packet.data)
+			packet = packets.unserialize(event.packet.data, player.protocol)
 		except Exception:
 			logging.warning("[RECEIVE] Unknown packet from %s!" % (peer.address))
 			self.fatalerror(event.peer, "Unknown packet. Please check your game version")
@@ -272,6 +279,7 @@ class Server(object):
 
 	def onlistgames(self, peer, packet):
 		logging.debug("[LIST]")
+		player = self.players[peer.data]
 		gameslist = packets.server.data_gameslist()
 		for _game in self.games:
 			if _game.state is not Game.State.Open:
@@ -280,6 +288,8 @@ class Server(object):
 				continue
 			if packet.clientversion != -1 and packet.clientversion != _game.clientversion:
 				continue
+			if player.protocol != _game.protocol:
+				continue
 			if packet.mapname and packet.mapname != _game.mapname:
 				continue
 			if packet.maxplayers and packet.maxplayers != _game.maxplayers:
@@ -314,6 +324,9 @@ class Server(object):
 		elif game.maxplayers == len(game.players):
 			self.error(peer, "Game is full")
 			return
+		elif game.protocol != player.protocol:
+			self.error(peer, "Game uses a different multiplayer protocol. Please check your game version")
+			return
 
 		# make sure player names are unique
 		unique = True
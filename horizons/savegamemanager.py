@@ -20,12 +20,13 @@
 # ###################################################
 import sqlite3
 import tempfile
+import hashlib
+import marshal
 import logging
 import os
 import os.path
 import glob
 import time
-import shelve
 import yaml
 try:
 	from yaml import CLoader as Loader
@@ -34,76 +35,107 @@ except ImportError:
 
 from horizons.constants import PATHS, VERSION
 from horizons.util import DbReader
+from horizons.util.atomicwrite import atomic_write
+from horizons.util.savegamemetadataindex import SavegameMetadataIndex
 
 import horizons.main
 
 class YamlCache(object):
-	"""Loads and caches YAML files
+	"""Loads and caches YAML files.
+
+	Parsed files are kept in memory and in one cache file per YAML file and kind of data in
+	PATHS.YAML_CACHE_DIR, so that each file is only parsed again when it has changed.
+	Cache files contain the marshalled tuple (FORMAT_VERSION, path, size, mtime, data) and are
+	only used while size and mtime of the YAML file are unchanged.
+
+	Besides the whole file, its header is cached separately: all top level fields except
+	those in HEADER_EXCLUDED_FIELDS. Menus only need the header, which is a lot smaller.
 	"""
-	cache = {}
-	virgin = True
-	dirty = False
-	yaml_cache = os.path.join(PATHS.USER_DIR, 'yamldata.cache')
+	log = logging.getLogger("yamlcache")
+
+	FORMAT_VERSION = 1
+	HEADER_EXCLUDED_FIELDS = ('events', )
+	cache_dir = PATHS.YAML_CACHE_DIR
+
+	cache = {} # { (kind, path) : ((size, mtime), data) }
 
 	@classmethod
 	def get_file(cls, filename):
-		if cls.virgin:
-			cls._read_bin_file()
-			cls.virgin = False
-		data = cls.get_yaml_file(filename)
-		if cls.dirty:
-			cls._write_bin_file()
-			cls.dirty = False
-		return data
+		"""Returns the parsed content of a YAML file"""
+		return cls._get(filename, 'data')
 
 	@classmethod
-	def get_yaml_file(cls, filename):
-		# calc the hash
-		f = open(filename, 'r')
-		h = hash(f.read())
-		f.seek(0)
-		# check for updates or new files
-		if (filename in cls.cache and \
-				cls.cache[filename][0] != h) or \
-			 (not filename in cls.cache):
-			cls.dirty = True
-			cls.cache[filename] = (h, yaml.load( f, Loader = Loader ) )
+	def get_header(cls, filename):
+		"""Returns the top level fields of a YAML file, except for the ones that only are
+		needed when playing, like the events of a scenario.
+		@return: dict"""
+		return cls._get(filename, 'header')
 
-		return cls.cache[filename][1]
+	@classmethod
+	def _get(cls, filename, kind):
+		path = os.path.abspath(filename)
+		stat = SavegameMetadataIndex.get_stat(path)
+		entry = cls.cache.get((kind, path))
+		if entry is not None and entry[0] == stat:
+			return entry[1]
+		found, value = cls._read_entry(path, kind, stat)
+		if found:
+			cls.cache[(kind, path)] = (stat, value)
+			return value
+		# parse the file and cache everything that is derived from it
+		with open(filename, 'r') as f:
+			data = yaml.load(f, Loader=Loader)
+		values = {'data': data, 'header': cls._get_header(data)}
+		for k, v in values.iteritems():
+			cls.cache[(k, path)] = (stat, v)
+			cls._write_entry(path, k, stat, v)
+		return values[kind]
+
+	@classmethod
+	def _get_header(cls, data):
+		if not isinstance(data, dict):
+			return data
+		return dict( (key, value) for key, value in data.iteritems() \
+		             if key not in cls.HEADER_EXCLUDED_FIELDS )
+
+	@classmethod
+	def _get_entry_filename(cls, path, kind):
+		if isinstance(path, unicode):
+			path = path.encode('utf-8')
+		return os.path.join(cls.cache_dir, '%s.%s' % (hashlib.sha1(path).hexdigest(), kind))
 
 	@classmethod
-	def _write_bin_file(cls):
+	def _read_entry(cls, path, kind, stat):
+		"""Returns (True, data) if there is a valid cache file, else (False, None)"""
+		if stat is None:
+			return (False, None)
+		filename = cls._get_entry_filename(path, kind)
 		try:
-			s = shelve.open(cls.yaml_cache)
-		except UnicodeError:
-			# this can happen with unicode characters in the name, because the bdb module on win
-			# converts it internally to ascii and fails to open the file. Since this is just a cache,
-			# we don't require it for the game to function, there is just a slight speed penality
-			# on every startup
-			return
-		for key, value in cls.cache.iteritems():
-			# TODO : manage unicode problems (paths with accents ?)
-			s[str(key)] = value # We have to decode it because _user_dir is encoded in constants
-		s.close()
+			with open(filename, 'rb') as f:
+				format_version, entry_path, size, mtime, data = marshal.load(f)
+		except IOError:
+			return (False, None)
+		except (ValueError, EOFError, TypeError), e:
+			cls.log.warning("Invalid YAML cache file %s: %s", filename, e)
+			return (False, None)
+		if format_version != cls.FORMAT_VERSION or entry_path != path or (size, mtime) != stat:
+			return (False, None)
+		return (True, data)
 
 	@classmethod
-	def _read_bin_file(cls):
+	def _write_entry(cls, path, kind, stat, data):
+		"""Writes a cache file. Errors are only logged, the cache is optional."""
+		if stat is None:
+			return
 		try:
-			s = shelve.open(cls.yaml_cache)
-		except ImportError:
-			# Some python distributions used to use the bsddb module as underlying shelve.
-			# The bsddb module is now deprecated since 2.6 and is not present in some 2.7 distributions.
-			# Therefore, the line above will yield an ImportError if it has been executed with
-			# a python supporting bsddb and now is executed again with python with no support for it.
-			# Since this may also be caused by a different error, we just try again once.
-			os.remove(cls.yaml_cache)
-			s = shelve.open(cls.yaml_cache)
-		except UnicodeError:
-			return # see _write_bin_file
-
-		for key, value in s.iteritems():
-			cls.cache[key] = value
-		s.close()
+			content = marshal.dumps((cls.FORMAT_VERSION, path) + stat + (data, ))
+		except ValueError, e:
+			cls.log.debug("Can't cache %s: %s", path, e) # e.g. dates in the file
+			return
+		try:
+			atomic_write(cls._get_entry_filename(path, kind), content)
+		except (IOError, OSError), e:
+			cls.log.warning("Failed to write YAML cache file for %s: %s", path, e)
 
 class SavegameManager(object):
 	"""Controls savegamefiles.
@@ -147,6 +179,10 @@ class SavegameManager(object):
 	savegame_metadata = { 'timestamp' : -1,	'savecounter' : 0, 'savegamerev' : 0, 'rng_state' : ""  }
 	savegame_metadata_types = { 'timestamp' : float, 'savecounter' : int, 'savegamerev': int, \
 	                            'rng_state' : str }
+	# metadata that is stored in the metadata index, the rng state is too big for it
+	indexed_metadata = ('timestamp', 'savecounter', 'savegamerev')
+
+	metadata_index = SavegameMetadataIndex(PATHS.SAVEGAME_METADATA_INDEX_FILE)
 
 	campaign_status_file = os.path.join(savegame_dir, 'campaign_status.yaml')
 
@@ -171,15 +207,16 @@ class SavegameManager(object):
 
 		for f in files:
 			if f.startswith(cls.autosave_dir):
-				name = "Autosave %s" % get_timestamp_string(cls.get_metadata(f))
+				name = "Autosave %s" % get_timestamp_string(cls.get_indexed_metadata(f))
 			elif f.startswith(cls.quicksave_dir):
-				name = "Quicksave %s" % get_timestamp_string(cls.get_metadata(f))
+				name = "Quicksave %s" % get_timestamp_string(cls.get_indexed_metadata(f))
 			else:
 				name = os.path.splitext(os.path.basename(f))[0]
 
 			if not isinstance(name, unicode):
 				name = unicode(name, errors='replace') # only use unicode strings, guichan needs them
 			displaynames.append( name )
+		cls.metadata_index.save()
 		return displaynames
 
 	@classmethod
@@ -270,10 +307,27 @@ class SavegameManager(object):
 		return metadata
 
 	@classmethod
-	def write_metadata(cls, db, savecounter, rng_state):
+	def get_indexed_metadata(cls, savegamefile):
+		"""Returns the metainfo of a savegame that is stored in the metadata index as dict.
+		The savegame is only opened if it isn't indexed or has changed since.
+		See indexed_metadata for the keys, use get_metadata for the complete metainfo.
+		"""
+		metadata = cls.metadata_index.get(savegamefile)
+		if metadata is None:
+			stat = SavegameMetadataIndex.get_stat(savegamefile)
+			complete_metadata = cls.get_metadata(savegamefile)
+			metadata = dict( (key, complete_metadata[key]) for key in cls.indexed_metadata )
+			if stat is not None:
+				cls.metadata_index.put(savegamefile, metadata, stat)
+		return metadata
+
+	@classmethod
+	def write_metadata(cls, db, savecounter, rng_state, savegamefile = None):
 		"""Writes metadata to db.
 		@param db: DbReader
-		@param savecounter: int"""
+		@param savecounter: int
+		@param savegamefile: path of the savegame file of db. If given, the metadata is added
+		                     to the metadata index."""
 		metadata = cls.savegame_metadata.copy()
 		metadata['timestamp'] = time.time()
 		metadata['savecounter'] = savecounter
@@ -283,6 +337,11 @@ class SavegameManager(object):
 		for key, value in metadata.iteritems():
 			db("INSERT INTO metadata(name, value) VALUES(?, ?)", key, value)
 
+		if savegamefile is not None:
+			# the savegame is still being written, the index takes its size and mtime later
+			cls.metadata_index.put(savegamefile, \
+			                       dict( (key, metadata[key]) for key in cls.indexed_metadata ))
+
 		# special handling for screenshot (as blob)
 		"""
 		import horizons.main
@@ -338,7 +397,7 @@ class SavegameManager(object):
 		sfiles, snames = cls.get_scenarios(include_displaynames = True)
 		for i, sname in enumerate(snames):
 			if cls.check_scenario_availability(sname):
-				if locales is None or cls.get_scenario_info(name = sname).get('locale', 'en') in locales:
+				if locales is None or YamlCache.get_header(sfiles[i]).get('locale', 'en') in locales:
 					anames.append(sname)
 					afiles.append(sfiles[i])
 		if not include_displaynames:
@@ -384,7 +443,7 @@ class SavegameManager(object):
 	def get_campaign_status(cls):
 		"""Read the campaign status from the saved YAML file"""
 		if os.path.exists(cls.campaign_status_file):
-			return YamlCache.get_yaml_file(cls.campaign_status_file)
+			return YamlCache.get_file(cls.campaign_status_file)
 		return {}
 
 	@classmethod
@@ -20,5 +20,5 @@
 # ###################################################
 
 
-from conditions import CONDITIONS
+from conditions import CONDITIONS, CHANGES
 from scenarioeventhandler import ScenarioEventHandler, InvalidScenarioFileFormat
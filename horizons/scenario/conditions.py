@@ -23,7 +23,6 @@ from horizons.ext.enum import Enum
 from horizons.constants import RES
 from horizons.constants import BUILDINGS
 from horizons.scheduler import Scheduler
-from horizons.world.pathfinding.pather import StaticPather
 from horizons.util.worldobject import WorldObject
 
 
@@ -40,9 +39,13 @@ CONDITIONS = Enum('settlements_num_greater', 'settler_level_greater', \
                   'settlement_produced_res_greater', 'player_produced_res_greater', \
                   'player_number_of_ships_gt', 'player_number_of_ships_lt')
 
-# Condition checking is split up in 2 types:
+# changes in the game that are notified to ScenarioEventHandler.notify_change
+CHANGES = Enum('buildings', 'roads', 'ships')
+
+# Condition checking is split up in 3 types:
 # 1. possible condition change is notified somewhere in the game code
 # 2. condition is checked periodically
+# 3. condition is checked periodically, but only if a change it depends on was notified
 
 # conditions that can only be checked periodically
 _scheduled_checked_conditions = (CONDITIONS.player_gold_greater, \
@@ -56,14 +59,20 @@ _scheduled_checked_conditions = (CONDITIONS.player_gold_greater, \
                                 CONDITIONS.settlement_res_stored_greater,
                                 CONDITIONS.time_passed,
                                 CONDITIONS.player_total_earnings_greater,
-                                CONDITIONS.buildings_connected_to_branch_gt,
-                                CONDITIONS.buildings_connected_to_branch_lt,
-                                CONDITIONS.buildings_connected_to_building_gt,
-                                CONDITIONS.buildings_connected_to_building_lt,
                                 CONDITIONS.settlement_produced_res_greater,
-                                CONDITIONS.player_produced_res_greater,
-                                CONDITIONS.player_number_of_ships_gt,
-								CONDITIONS.player_number_of_ships_lt)
+                                CONDITIONS.player_produced_res_greater)
+
+# conditions that are checked periodically if a change they depend on was notified,
+# in the order they are checked
+_change_checked_conditions = (
+  (CONDITIONS.building_num_of_type_greater, (CHANGES.buildings, )),
+  (CONDITIONS.buildings_connected_to_branch_gt, (CHANGES.buildings, CHANGES.roads)),
+  (CONDITIONS.buildings_connected_to_branch_lt, (CHANGES.buildings, CHANGES.roads)),
+  (CONDITIONS.buildings_connected_to_building_gt, (CHANGES.buildings, CHANGES.roads)),
+  (CONDITIONS.buildings_connected_to_building_lt, (CHANGES.buildings, CHANGES.roads)),
+  (CONDITIONS.player_number_of_ships_gt, (CHANGES.ships, )),
+  (CONDITIONS.player_number_of_ships_lt, (CHANGES.ships, )),
+)
 
 ###
 # Scenario Conditions
@@ -105,8 +114,7 @@ def player_inhabitants_greater(session, limit):
 def building_num_of_type_greater(session, building_class, limit):
 	"""Check if player has more than limit buildings on a settlement"""
 	for settlement in _get_player_settlements(session):
-		if len([building for building in settlement.buildings if \
-		       building.id == building_class]) > limit:
+		if len(settlement.get_buildings_by_id(building_class)) > limit:
 			return True
 	return False
 
@@ -194,22 +202,31 @@ def _building_connected_to_any_of(session, building_class, *classes):
 	"""Returns the exact amount of buildings of type building_class that are
 	connected to any building of a class in classes. Counts all settlements."""
 	building_to_check = []
-	check_connection = []
+	# per island: road components next to the buildings to connect to and their coords
+	check_components = {}
+	check_coords = {}
 	for settlement in _get_player_settlements(session):
-		for building in settlement.buildings:
-			if building.id == building_class:
-				building_to_check.append(building)
-			else:
-				for b_class in classes:
-					if building.id == b_class:
-						check_connection.append(building)
-						break
+		building_to_check.extend(settlement.get_buildings_by_id(building_class))
+		for b_class in classes:
+			if b_class == building_class:
+				continue
+			for building in settlement.get_buildings_by_id(b_class):
+				road_components = building.island.path_nodes.road_components
+				check_components.setdefault(building.island, set()).update( \
+				  road_components.get_adjacent_components(building.position))
+				check_coords.setdefault(building.island, set()).update( \
+				  building.position.tuple_iter())
 	found_connected = 0
 	for building in building_to_check:
-		for check in check_connection:
-			if StaticPather.get_path_on_roads(building.island, building, check):
-				found_connected += 1
-				break
+		if building.island not in check_coords:
+			continue
+		road_components = building.island.path_nodes.road_components
+		# connected via roads or directly adjacent
+		if not check_components[building.island].isdisjoint( \
+		       road_components.get_adjacent_components(building.position)) or \
+		   not check_coords[building.island].isdisjoint( \
+		       road_components.get_coords_and_border(building.position)):
+			found_connected += 1
 	return found_connected
 
 def player_number_of_ships_gt(session, player_id, number):
@@ -30,7 +30,8 @@ from horizons.constants import RES
 from horizons.scheduler import Scheduler
 from horizons.util import Callback, LivingObject, decorators
 
-from horizons.scenario.conditions import CONDITIONS, _scheduled_checked_conditions
+from horizons.scenario.conditions import CONDITIONS, _scheduled_checked_conditions, \
+     _change_checked_conditions
 
 from horizons.savegamemanager import YamlCache
 
@@ -68,6 +69,9 @@ class ScenarioEventHandler(LivingObject):
 		self._scenario_variables = {} # variables for set_var, var_eq ...
 		for cond in CONDITIONS:
 			self._event_conditions[cond] = set()
+		# conditions of _change_checked_conditions whose changes have been notified since
+		# their last check. they all have to be checked once in the beginning.
+		self._changed_conditions = set( cond for cond, changes in _change_checked_conditions )
 		if scenariofile:
 			self._apply_data( self._parse_yaml_file( scenariofile ) )
 
@@ -128,6 +132,14 @@ class ScenarioEventHandler(LivingObject):
 		else:
 			action(self.session)
 
+	def notify_change(self, change):
+		"""Notifies that something in the game changed, that conditions depend on. These
+		conditions are checked again with the next periodic check.
+		@param change: item of the enum CHANGES"""
+		for cond, changes in _change_checked_conditions:
+			if change in changes:
+				self._changed_conditions.add(cond)
+
 	def check_events(self, condition):
 		"""Checks whether an event happened.
 		@param condition: condition from enum conditions that changed"""
@@ -148,7 +160,7 @@ class ScenarioEventHandler(LivingObject):
 	def get_description_from_file(cls, filename):
 		"""Returns the description from a yaml file.
 		@throws InvalidScenarioFile"""
-		return cls._parse_yaml_file(filename)['description']
+		return cls._parse_yaml_file_header(filename)['description']
 
 	@classmethod
 	def get_difficulty_from_file(cls, filename):
@@ -156,7 +168,7 @@ class ScenarioEventHandler(LivingObject):
 		Returns _("unknown") if difficulty isn't specified.
 		@throws InvalidScenarioFile"""
 		try:
-			return cls._parse_yaml_file(filename)['difficulty']
+			return cls._parse_yaml_file_header(filename)['difficulty']
 		except KeyError:
 			return _("unknown")
 
@@ -166,7 +178,7 @@ class ScenarioEventHandler(LivingObject):
 		Returns _("unknown") if difficulty isn't specified.
 		@throws InvalidScenarioFile"""
 		try:
-			return cls._parse_yaml_file(filename)['author']
+			return cls._parse_yaml_file_header(filename)['author']
 		except KeyError:
 			return _("unknown")
 
@@ -192,6 +204,11 @@ class ScenarioEventHandler(LivingObject):
 	def _parse_yaml_file(cls, filename):
 		return YamlCache.get_file(filename)
 
+	@classmethod
+	def _parse_yaml_file_header(cls, filename):
+		"""Like _parse_yaml_file, but without the events"""
+		return YamlCache.get_header(filename)
+
 	def _apply_data(self, data):
 		"""Apply data to self loaded via yaml.load
 		@param data: return value of yaml.load or _parse_yaml resp.
@@ -208,6 +225,11 @@ class ScenarioEventHandler(LivingObject):
 		"""Check conditions that can only be checked periodically"""
 		for cond_type in _scheduled_checked_conditions:
 			self.check_events(cond_type)
+		changed_conditions = self._changed_conditions
+		self._changed_conditions = set()
+		for cond_type, changes in _change_checked_conditions:
+			if cond_type in changed_conditions:
+				self.check_events(cond_type)
 
 	def _remove_event(self, event):
 		assert isinstance(event, _Event)
@@ -19,16 +19,27 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import heapq
 import logging
 
+from collections import deque
+
 import horizons.main
 
 from horizons.util import LivingObject, ManualConstructionSingleton
+from horizons.util.tickprofiler import TickProfiler
 from horizons.constants import GAME
 
 class Scheduler(LivingObject):
 	""""Class providing timed callbacks.
 	To start a timed callback, call add_new_object() to make the TimingThread Class create a CallbackObject for you.
+
+	Pending calls are kept in per-tick FIFO buckets, the ticks that have a bucket are
+	additionally kept in a min-heap. Every scheduled call is wrapped in a _ScheduleEntry,
+	which is also registered in a per-instance index. Removing a call only marks its entry
+	as cancelled (tombstone) and drops it from the index, the bucket skips it later on.
+	This way, removal and queries only depend on the number of calls of one instance,
+	not on the size of the whole schedule.
 	@param timer: Timer instance the schedular registers itself with.
 	"""
 	__metaclass__ = ManualConstructionSingleton
@@ -40,15 +51,22 @@ class Scheduler(LivingObject):
 		@param timer: Timer obj
 		"""
 		super(Scheduler, self).__init__()
-		self.schedule = {}
+		self.schedule = {} # { tick : deque of _ScheduleEntry }
+		self._tick_heap = [] # ticks of self.schedule
+		self._instance_calls = {} # { id(class_instance) : set of _ScheduleEntry }
 		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
 		self.cur_tick = 0
+		self.profiler = None # TickProfiler, if profiling is enabled
 		self.timer = timer
 		self.timer.add_call(self.tick)
+		if GAME.PROFILE_TICKS:
+			self.enable_profiling()
 
 	def end(self):
 		self.log.debug("Scheduler end; len: %s", len(self.schedule))
 		self.schedule = None
+		self._tick_heap = None
+		self._instance_calls = None
 		self.timer.remove_call(self.tick)
 		self.timer = None
 		super(Scheduler, self).end()
@@ -62,32 +80,49 @@ class Scheduler(LivingObject):
 			return
 
 		self.cur_tick = tick_id
+		profiler = self.profiler
+		if profiler is not None:
+			profiler.start_tick(tick_id)
 		if self.cur_tick in self.schedule:
-			self.log.debug("Scheduler: tick is %s, callbacks: %s", self.cur_tick, [unicode(i) for i in  self.schedule[self.cur_tick]])
+			if self.log.isEnabledFor(logging.DEBUG):
+				self.log.debug("Scheduler: tick is %s, callbacks: %s", self.cur_tick, \
+				               [unicode(i.callback_obj) for i in self.schedule[self.cur_tick] if i.callback_obj is not None])
 
-			# use iteration method that works in case the list is altered during iteration
-			# this can happen for e.g. rem_all_classinst_calls
+			# the bucket stays in self.schedule during the iteration, calls that are removed
+			# meanwhile (e.g. by rem_all_classinst_calls) are marked as cancelled and skipped.
+			# NOTE: the calls of a tick have to be executed in the order they were added
+			#       (FIFO), some system-level unit tests and the multiplayer sync depend on it.
 			cur_schedule = self.schedule[self.cur_tick]
 			while cur_schedule:
-				callback = cur_schedule.pop(0)
-				# TODO: some system-level unit tests fail if this list is not processed in the correct order
-				#       (i.e. if e.g. pop() was used here). This is an indication of invalid assumptions
-				#       in the program and should be fixed.
+				entry = cur_schedule.popleft()
+				callback = entry.callback_obj
+				if callback is None: # cancelled
+					continue
+				self._unregister_entry(entry)
 
 				self.log.debug("Scheduler(t:%s) calling %s", tick_id, callback)
-				callback.callback()
+				if profiler is None:
+					callback.callback()
+				else:
+					profiler.call(callback)
 				assert callback.loops >= -1
 				if callback.loops != 0:
 					self.add_object(callback, readd=True)
 			del self.schedule[self.cur_tick]
+			heapq.heappop(self._tick_heap) # this is self.cur_tick, no older ticks are left
 
 			# run jobs added in the loop above
 			for callback in self.additional_cur_tick_schedule:
 				assert callback.loops == 0 # can't loop with no delay
-				callback.callback()
+				if profiler is None:
+					callback.callback()
+				else:
+					profiler.call(callback)
 			self.additional_cur_tick_schedule = []
 
-		assert (len(self.schedule) == 0) or self.schedule.keys()[0] > self.cur_tick
+		if profiler is not None:
+			profiler.end_tick(tick_id)
+		assert (len(self._tick_heap) == 0) or self._tick_heap[0] > self.cur_tick
 
 	def add_object(self, callback_obj, readd=False):
 		"""Adds a new CallbackObject instance to the callbacks list for the first time
@@ -102,8 +137,14 @@ class Scheduler(LivingObject):
 			interval = callback_obj.loop_interval if readd else callback_obj.run_in
 			tick_key = self.cur_tick + interval
 			if not tick_key in self.schedule:
-				self.schedule[tick_key] = []
-			self.schedule[tick_key].append(callback_obj)
+				self.schedule[tick_key] = deque()
+				heapq.heappush(self._tick_heap, tick_key)
+			entry = _ScheduleEntry(callback_obj, tick_key)
+			self.schedule[tick_key].append(entry)
+			key = id(callback_obj.class_instance)
+			if key not in self._instance_calls:
+				self._instance_calls[key] = set()
+			self._instance_calls[key].add(entry)
 
 	def add_new_object(self, callback, class_instance, run_in=1, loops=1, loop_interval=None):
 		"""Creates a new CallbackObject instance and calls the self.add_object() function.
@@ -122,19 +163,16 @@ class Scheduler(LivingObject):
 		"""
 		removed_objs = 0
 		if self.schedule is not None:
-			for key in self.schedule:
-				for i in xrange(0, self.schedule[key].count(callback_obj)):
-					self.schedule[key].remove(callback_obj)
+			for entry in self._get_instance_entries(callback_obj.class_instance):
+				if entry.callback_obj is callback_obj:
+					self._cancel_entry(entry)
 					removed_objs += 1
 		return removed_objs
 
 	def rem_all_classinst_calls(self, class_instance):
 		"""Removes all callbacks from the scheduler that belong to the class instance class_inst."""
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if callback_objects[i].class_instance is class_instance:
-					del callback_objects[i]
+		for entry in self._get_instance_entries(class_instance):
+			self._cancel_entry(entry)
 
 		# filter additional callbacks as well
 		self.additional_cur_tick_schedule = \
@@ -148,16 +186,14 @@ class Scheduler(LivingObject):
 		"""
 		assert callable(callback)
 		removed_calls = 0
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if callback_objects[i].class_instance is instance and callback_objects[i].callback == callback:
-					del callback_objects[i]
-					removed_calls += 1
+		for entry in self._get_instance_entries(instance):
+			if entry.callback_obj.callback == callback:
+				self._cancel_entry(entry)
+				removed_calls += 1
 		for i in xrange(len(self.additional_cur_tick_schedule) - 1, -1, -1):
 			if self.additional_cur_tick_schedule[i].class_instance is instance and \
 				self.additional_cur_tick_schedule[i].callback == callback:
-					del callback_objects[i]
+					del self.additional_cur_tick_schedule[i]
 					removed_calls += 1
 		return removed_calls
 
@@ -170,13 +206,9 @@ class Scheduler(LivingObject):
 		@return: dict, entries: { CallbackObject: remaining_ticks_to_executing }
 		"""
 		calls = {}
-		for key in self.schedule:
-			for callback_obj in self.schedule[key]:
-				if callback_obj.class_instance is instance:
-					if callback is None:
-						calls[callback_obj] = key - self.cur_tick
-					elif callback_obj.callback == callback:
-						calls[callback_obj] = key - self.cur_tick
+		for entry in self._get_instance_entries(instance):
+			if callback is None or entry.callback_obj.callback == callback:
+				calls[entry.callback_obj] = entry.tick - self.cur_tick
 		return calls
 
 	def get_remaining_ticks(self, instance, callback, assert_present=True):
@@ -191,6 +223,25 @@ class Scheduler(LivingObject):
 		else:
 			return calls.itervalues().next() if calls else None
 
+	def get_next_tick(self):
+		"""Returns the next tick that has calls scheduled, or None if there aren't any.
+		Ticks that only contain cancelled calls might be reported as well."""
+		return self._tick_heap[0] if self._tick_heap else None
+
+	def enable_profiling(self):
+		"""Starts measuring the execution time of the calls (debug api).
+		@return: TickProfiler instance, also available as self.profiler"""
+		if self.profiler is None:
+			self.profiler = TickProfiler()
+		return self.profiler
+
+	def disable_profiling(self):
+		"""Stops measuring the execution time of the calls.
+		@return: TickProfiler instance with the data collected so far, or None"""
+		profiler = self.profiler
+		self.profiler = None
+		return profiler
+
 	def get_ticks(self, seconds):
 		"""Call propagated to time instance"""
 		return self.timer.get_ticks(seconds)
@@ -198,6 +249,36 @@ class Scheduler(LivingObject):
 	def get_ticks_of_month(self):
 		return self.timer.get_ticks(GAME.INGAME_TICK_INTERVAL)
 
+	def _get_instance_entries(self, instance):
+		"""Returns a list of the pending entries of instance (a copy, so it's safe to
+		cancel entries while iterating)."""
+		if self._instance_calls is None:
+			return []
+		return list(self._instance_calls.get(id(instance), ()))
+
+	def _unregister_entry(self, entry):
+		"""Removes entry from the per-instance index."""
+		key = id(entry.callback_obj.class_instance)
+		entries = self._instance_calls[key]
+		entries.discard(entry)
+		if not entries:
+			del self._instance_calls[key]
+
+	def _cancel_entry(self, entry):
+		"""Marks entry as cancelled. It stays in its tick bucket until that tick is reached."""
+		self._unregister_entry(entry)
+		entry.callback_obj = None
+
+
+class _ScheduleEntry(object):
+	"""A single scheduled execution of a CallbackObject.
+	callback_obj is set to None when the call is cancelled."""
+	__slots__ = ('callback_obj', 'tick')
+
+	def __init__(self, callback_obj, tick):
+		self.callback_obj = callback_obj
+		self.tick = tick
+
 
 class CallbackObject(object):
 	"""Class used by the TimerManager Class to organize callbacks."""
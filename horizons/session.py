@@ -23,6 +23,7 @@ import os
 import os.path
 import logging
 import json
+import time
 
 import horizons.main
 
@@ -40,7 +41,7 @@ from horizons.entities import Entities
 from horizons.util import WorldObject, NamedObject, LivingObject, livingProperty, SavegameAccessor
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import ScenarioEventHandler
-from horizons.constants import GAME_SPEED
+from horizons.constants import GAME_SPEED, PATHS
 
 class Session(LivingObject):
 	"""Session class represents the games main ingame view and controls cameras and map loading.
@@ -133,6 +134,11 @@ class Session(LivingObject):
 		Scheduler().rem_all_classinst_calls(self)
 		ExtScheduler().rem_all_classinst_calls(self)
 
+		if Scheduler().profiler is not None:
+			profile_file = os.path.join(PATHS.LOG_DIR, "tick-profile-%s" % time.strftime("%y-%m-%d_%H-%M-%S"))
+			self.log.info("Writing tick profile to %s.csv/.json", profile_file)
+			Scheduler().profiler.dump(profile_file)
+
 		if horizons.main.fife.get_fife_setting("PlaySounds"):
 			for emitter in horizons.main.fife.emitter['ambient'][:]:
 				emitter.stop()
@@ -192,17 +198,7 @@ class Session(LivingObject):
 		# a loaded and a new game)
 		self.savecounter = 0 if not 'savecounter' in savegame_data else savegame_data['savecounter']
 
-		if savegame_data.get('rng_state', None):
-			rng_state_list = json.loads( savegame_data['rng_state'] )
-			# json treats tuples as lists, but we need tuples here, so convert back
-			def rec_list_to_tuple(x):
-				if isinstance(x, list):
-					return tuple( rec_list_to_tuple(i) for i in x )
-				else:
-					return x
-			rng_state_tuple = rec_list_to_tuple(rng_state_list)
-			# changing the rng is safe for mp, as all players have to have the same map
-			self.random.setstate( rng_state_tuple )
+		self.load_rng_state(savegame_data)
 
 		self.world = World(self) # Load horizons.world module (check horizons/world/__init__.py)
 		self.world._init(savegame_db)
@@ -242,6 +238,21 @@ class Session(LivingObject):
 		(horizons/world/__init__.py). It's where the magic happens and all buildings and units are loaded.
 		"""
 
+	def load_rng_state(self, savegame_data):
+		"""Restores the state of the RNG, if it is stored in the savegame metadata.
+		@param savegame_data: metadata dict, as returned by SavegameManager.get_metadata"""
+		if savegame_data.get('rng_state', None):
+			rng_state_list = json.loads( savegame_data['rng_state'] )
+			# json treats tuples as lists, but we need tuples here, so convert back
+			def rec_list_to_tuple(x):
+				if isinstance(x, list):
+					return tuple( rec_list_to_tuple(i) for i in x )
+				else:
+					return x
+			rng_state_tuple = rec_list_to_tuple(rng_state_list)
+			# changing the rng is safe for mp, as all players have to have the same map
+			self.random.setstate( rng_state_tuple )
+
 	def speed_set(self, ticks, suggestion=False):
 		"""Set game speed to ticks ticks per second"""
 		raise NotImplementedError
@@ -171,6 +171,8 @@ class SPSession(Session):
 
 		try:
 			db("BEGIN")
+			# collect the rows and write them per table, saving big maps issues a lot of inserts
+			db.start_batch()
 			self.world.save(db)
 			#self.manager.save(db)
 			self.view.save(db)
@@ -184,10 +186,12 @@ class SPSession(Session):
 					db("INSERT INTO selected(`group`, id) VALUES(?, ?)", group, instance.worldid)
 
 			rng_state = json.dumps( self.random.getstate() )
-			SavegameManager.write_metadata(db, self.savecounter, rng_state)
+			SavegameManager.write_metadata(db, self.savecounter, rng_state, savegame)
 			# make sure everything get's written now
+			db.end_batch()
 			db("COMMIT")
 			db.close()
+			SavegameManager.metadata_index.save()
 			return True
 		except:
 			print "Save Exception"
@@ -23,6 +23,8 @@ __all__ = []
 
 from living import livingProperty, LivingObject
 from buildingindexer import BuildingIndexer
+from spatialindex import SpatialIndex
+from incrementalhash import IncrementalHash
 from changelistener import ChangeListener
 from color import Color
 from worldobject import WorldObject
@@ -0,0 +1,57 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import tempfile
+
+
+def atomic_create(filename, create):
+	"""Creates a file, so that it is never read while it is only partly written.
+	The file is created as temporary file in the same directory first and then renamed to
+	filename. The directory is created if necessary. If anything fails, the temporary file
+	is removed and the exception is raised again.
+	@param filename: path of the file to create or replace
+	@param create: callable that gets the path of the temporary file and writes it"""
+	directory = os.path.dirname(filename)
+	if directory and not os.path.isdir(directory):
+		os.makedirs(directory)
+	fd, tmp_filename = tempfile.mkstemp(suffix='.tmp', dir=directory or None)
+	os.close(fd)
+	try:
+		create(tmp_filename)
+		if os.path.exists(filename):
+			os.remove(filename) # os.rename doesn't replace files on windows
+		os.rename(tmp_filename, filename)
+	except:
+		try:
+			os.remove(tmp_filename)
+		except OSError:
+			pass
+		raise
+
+def atomic_write(filename, data):
+	"""Writes data to a file like atomic_create.
+	@param data: str, the content of the file"""
+	def write(tmp_filename):
+		with open(tmp_filename, 'wb') as f:
+			f.write(data)
+	atomic_create(filename, write)
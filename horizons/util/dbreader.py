@@ -27,8 +27,16 @@ from horizons.util.python import decorators
 class DbReader(object):
 	"""Class that handles connections to sqlite databases
 	@param file: str containing the database file."""
+
+	# number of compiled statements sqlite keeps per connection. Saving a game uses
+	# more distinct statements than the default of 100, which made them recompile.
+	STATEMENT_CACHE_SIZE = 400
+
+	# commands that only write to a single table, their table is group 1 or 2
+	_WRITE_RE = re.compile(r'^\s*(?:(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|DELETE\s+FROM)\s+[`"\[]?(\w+)|UPDATE\s+[`"\[]?(\w+)[`"\]]?\s+SET\b)', re.IGNORECASE)
+
 	def __init__(self, dbfile):
-		self.connection = sqlite3.connect(dbfile)
+		self.connection = sqlite3.connect(dbfile, cached_statements=self.STATEMENT_CACHE_SIZE)
 		self.connection.isolation_level = None
 		self.connection.text_factory = str
 		def regexp(expr, item):
@@ -36,6 +44,9 @@ class DbReader(object):
 			return r.match(item) is not None
 		self.connection.create_function("regexp", 2, regexp)
 		self.cur = self.connection.cursor()
+		# command => (sql, table the command writes to or None)
+		self._statements = {}
+		self._batch = None
 
 	@decorators.make_constants()
 	def __call__(self, command, *args):
@@ -43,11 +54,70 @@ class DbReader(object):
 		@param command: str containing the raw sql command, with ? as placeholders for values (eg. SELECT ? FROM ?). command must not end with ';', it's added automatically here.
 		@param args: tuple containing the values to add into the command.
 		"""
-		assert not command.endswith(";")
-		command = '%s;' % command
-		self.cur.execute(command, args)
+		try:
+			sql, table = self._statements[command]
+		except KeyError:
+			sql, table = self._prepare(command)
+		batch = self._batch
+		if batch is not None:
+			if table is not None:
+				runs = batch.get(table)
+				if runs is not None and runs[-1][0] is sql:
+					runs[-1][1].append(args) # most common case: same command as last time
+				else:
+					self._add_to_batch(table, sql, args)
+				return BATCHED_RESULT
+			self.flush_batch()
+		self.cur.execute(sql, args)
 		return SqlResult(self.cur.fetchall(), None if self.cur.rowcount == -1 else self.cur.rowcount, self.cur.lastrowid)
 
+	def _prepare(self, command):
+		assert not command.endswith(";")
+		table = None
+		match = self._WRITE_RE.match(command)
+		# commands reading other tables depend on the order of writes to them
+		if match and 'SELECT' not in command.upper():
+			table = (match.group(1) or match.group(2)).lower()
+		statement = ('%s;' % command, table)
+		if len(self._statements) >= self.STATEMENT_CACHE_SIZE:
+			self._statements.clear() # commands built at runtime mustn't fill the memory
+		self._statements[command] = statement
+		return statement
+
+	def start_batch(self):
+		"""Starts collecting INSERT, UPDATE and DELETE commands that only affect a single
+		table instead of executing them one by one.
+		They are written per table with executemany as soon as any other command is
+		executed (e.g. a SELECT or COMMIT), or on flush_batch() or end_batch().
+		Commands on a table are executed in the order they were issued, so rowids and
+		results don't change. Results of collected commands are empty and errors are raised
+		on flush. Use this inside a transaction when writing many rows, e.g. when saving."""
+		if self._batch is None:
+			self._batch = {} # table => list of [sql, list of args]
+			self._batch_tables = [] # tables in order of the first write
+
+	def _add_to_batch(self, table, sql, args):
+		runs = self._batch.get(table)
+		if runs is None:
+			runs = self._batch[table] = []
+			self._batch_tables.append(table)
+		runs.append([sql, [args]])
+
+	def flush_batch(self):
+		"""Executes all collected commands"""
+		if not self._batch:
+			return
+		batch, tables = self._batch, self._batch_tables
+		self._batch, self._batch_tables = {}, []
+		for table in tables:
+			for sql, rows in batch[table]:
+				self.cur.executemany(sql, rows)
+
+	def end_batch(self):
+		"""Writes the collected commands and executes commands immediately again"""
+		self.flush_batch()
+		self._batch = None
+
 	@decorators.cachedmethod
 	def cached_query(self, command, *args):
 		"""Executes a sql command and saves its result in a dict.
@@ -59,15 +129,18 @@ class DbReader(object):
 		found in parameters.
 		@param command: same as in __call__
 		@param parameters: sequence or iterator"""
+		self.flush_batch()
 		return self.cur.executemany(command, parameters)
 
 	def execute_script(self, script):
 		"""Executes a multiline script.
 		@param script: multiline str containing an sql script."""
+		self.flush_batch()
 		return self.cur.executescript(script)
 
 	def close(self):
-		"""Closes the db"""
+		"""Closes the db, collected commands that haven't been flushed are discarded"""
+		self._batch = None
 		self.connection.close()
 
 class SqlError(object):
@@ -137,3 +210,6 @@ class SqlResult(object):
 		return self.rows.__setitem__(*args, **kwargs)
 	def __setslice__(self, *args, **kwargs):
 		return self.rows.__setslice__(*args, **kwargs)
+
+# result of commands collected by DbReader.start_batch
+BATCHED_RESULT = SqlResult((), None, None)
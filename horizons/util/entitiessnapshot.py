@@ -0,0 +1,79 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import marshal
+import os
+import struct
+
+from horizons.util.atomicwrite import atomic_write
+
+
+class EntitiesSnapshot(object):
+	"""Stores the data the entity classes are created from in the user's cache dir, so that
+	it can be read at once instead of with many queries to the game data database.
+
+	The file contains:
+	  header: struct '!4sH40s' (MAGIC, FORMAT_VERSION, checksum of the game data)
+	  data: marshalled dict, see Entities.get_snapshot_data
+	The data only consists of builtin types, so marshal can be used. It is only used if
+	the checksum is the one of the current game data (see GameDbCache.get_checksum).
+	"""
+	log = logging.getLogger("util.entitiessnapshot")
+
+	MAGIC = 'UHES'
+	FORMAT_VERSION = 1
+	HEADER = struct.Struct('!4sH40s')
+
+	def __init__(self, filename):
+		"""
+		@param filename: path of the snapshot file, its directory is created when needed
+		"""
+		self.filename = filename
+
+	def get(self, checksum):
+		"""Returns the data of the snapshot or None if there is no valid one
+		@param checksum: checksum of the current game data"""
+		try:
+			with open(self.filename, 'rb') as f:
+				data = f.read()
+		except IOError:
+			return None
+		try:
+			magic, format_version, snapshot_checksum = self.HEADER.unpack_from(data)
+			if magic != self.MAGIC or format_version != self.FORMAT_VERSION:
+				raise ValueError("unknown format")
+			if snapshot_checksum != checksum:
+				self.log.debug("Entities snapshot %s is outdated", self.filename)
+				return None
+			return marshal.loads(data[self.HEADER.size:])
+		except (ValueError, EOFError, TypeError, struct.error), e:
+			self.log.warning("Invalid entities snapshot %s: %s", self.filename, e)
+			return None
+
+	def put(self, checksum, snapshot_data):
+		"""Stores the data. Errors are only logged, the snapshot is optional.
+		@param checksum: checksum of the game data the data has been read from"""
+		data = self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, checksum) + marshal.dumps(snapshot_data)
+		try:
+			atomic_write(self.filename, data)
+		except (IOError, OSError), e:
+			self.log.warning("Failed to write entities snapshot: %s", e)
@@ -0,0 +1,137 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import hashlib
+import logging
+import os
+import sqlite3
+
+from horizons.util.atomicwrite import atomic_create
+from horizons.util.dbreader import DbReader
+
+
+class GameDbCache(object):
+	"""Stores the game data database in the user's cache dir, so that the sql files don't
+	have to be executed on every start.
+
+	The cache file is a sqlite database built from the sql files. It contains the table
+	CHECKSUM_TABLE with a checksum of the format version and the contents of the sql files.
+	Loading copies the tables of the cache file into a database, if the checksum still
+	matches the sql files. Otherwise, the sql files have to be executed and the cache file
+	is built again.
+	"""
+	log = logging.getLogger("util.gamedbcache")
+
+	FORMAT_VERSION = 1
+	CHECKSUM_TABLE = 'game_db_cache'
+
+	def __init__(self, filename, sql_files):
+		"""
+		@param filename: path of the cache file, its directory is created when needed
+		@param sql_files: paths of the sql files that make up the database
+		"""
+		self.filename = filename
+		self.sql_files = sql_files
+		self._checksum = None
+
+	def get_checksum(self):
+		"""Returns the checksum of the sql files. It is computed once per instance.
+		@return: str of 40 hex digits"""
+		if self._checksum is None:
+			checksum = hashlib.sha1(str(self.FORMAT_VERSION))
+			for filename in self.sql_files:
+				with open(filename, 'rb') as f:
+					checksum.update(f.read())
+				checksum.update('\0')
+			self._checksum = checksum.hexdigest()
+		return self._checksum
+
+	def execute_sql_files(self, db):
+		"""Creates the database by executing the sql files.
+		@param db: DbReader of an empty database"""
+		for filename in self.sql_files:
+			with open(filename, 'r') as f:
+				db.execute_script("BEGIN TRANSACTION;" + f.read() + "COMMIT;")
+
+	def load(self, db):
+		"""Copies the cached database into db.
+		@param db: DbReader of an empty database
+		@return: bool, whether the cache was valid. Nothing is copied if it wasn't."""
+		if not os.path.exists(self.filename):
+			return False
+		try:
+			db("ATTACH DATABASE ? AS game_db_cache", self.filename)
+		except sqlite3.Error, e:
+			self.log.warning("Failed to open game db cache %s: %s", self.filename, e)
+			return False
+		try:
+			try:
+				checksum = db("SELECT checksum FROM game_db_cache.%s" % self.CHECKSUM_TABLE)
+			except sqlite3.Error:
+				checksum = None
+			if not checksum or checksum[0][0] != self.get_checksum():
+				self.log.debug("Game db cache %s is outdated", self.filename)
+				return False
+			try:
+				self._copy(db)
+			except sqlite3.Error, e:
+				self.log.warning("Failed to load game db cache %s: %s", self.filename, e)
+				return False
+			return True
+		finally:
+			db("DETACH DATABASE game_db_cache")
+
+	def _copy(self, db):
+		"""Copies the tables of the attached cache into the main database of db"""
+		schema = db("SELECT type, name, sql FROM game_db_cache.sqlite_master " + \
+		            "WHERE sql NOT NULL AND name != ? ORDER BY rowid", self.CHECKSUM_TABLE)
+		db("BEGIN TRANSACTION")
+		try:
+			for obj_type, name, sql in schema:
+				if obj_type == 'table':
+					db(sql)
+					db('INSERT INTO main."%s" SELECT * FROM game_db_cache."%s"' % (name, name))
+			# indices, views and triggers are created after the data has been copied
+			for obj_type, name, sql in schema:
+				if obj_type != 'table':
+					db(sql)
+		except sqlite3.Error:
+			db("ROLLBACK")
+			raise
+		db("COMMIT")
+
+	def build(self):
+		"""Builds the cache file from the sql files. Errors are only logged, the cache is optional.
+		@return: bool, whether the cache file has been written"""
+		def create(tmp_filename):
+			db = DbReader(tmp_filename)
+			try:
+				self.execute_sql_files(db)
+				db("CREATE TABLE %s(checksum TEXT NOT NULL)" % self.CHECKSUM_TABLE)
+				db("INSERT INTO %s(checksum) VALUES(?)" % self.CHECKSUM_TABLE, self.get_checksum())
+			finally:
+				db.close()
+		try:
+			atomic_create(self.filename, create)
+		except (IOError, OSError, sqlite3.Error), e:
+			self.log.warning("Failed to write game db cache: %s", e)
+			return False
+		return True
@@ -0,0 +1,101 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import hashlib
+
+from horizons.util.python.callback import Callback
+
+
+class IncrementalHash(object):
+	"""
+	Digest of a set of entries, that is updated incrementally.
+
+	Every entry has a key and a value. The digest is the sum of the hashes of all
+	(key, value) pairs, so it doesn't depend on the order of the entries and only changed
+	entries have to be hashed again.
+
+	Values of objects that are ChangeListeners can be tracked: they are recalculated when
+	the object has changed and removed together with the object. Other values have to be
+	set with update().
+	"""
+
+	DIGEST_BITS = 64
+
+	def __init__(self):
+		self._values = {} # { key : value }
+		self._hashes = {} # { key : hash of (key, value) }
+		self._digest = 0
+		self._getters = {} # { key : callable returning the value } for tracked objects
+		self._dirty = set() # tracked keys whose value has to be recalculated
+		self._removed = set() # tracked keys whose object has been removed
+
+	def update(self, key, value):
+		"""Sets the value of an entry.
+		@param key: hashable
+		@param value: anything with a stable repr (e.g. tuples of numbers and strings)"""
+		if key in self._values and self._values[key] == value:
+			return
+		self._remove_entry(key)
+		entry_hash = int(hashlib.md5(repr((key, value))).hexdigest()[:self.DIGEST_BITS // 4], 16)
+		self._values[key] = value
+		self._hashes[key] = entry_hash
+		self._digest = (self._digest + entry_hash) % (1 << self.DIGEST_BITS)
+
+	def remove(self, key):
+		"""Removes an entry, that has been set with update()"""
+		self._remove_entry(key)
+
+	def _remove_entry(self, key):
+		entry_hash = self._hashes.pop(key, None)
+		if entry_hash is not None:
+			del self._values[key]
+			self._digest = (self._digest - entry_hash) % (1 << self.DIGEST_BITS)
+
+	def track(self, key, obj, get_value):
+		"""Tracks the value of a ChangeListener.
+		@param key: hashable key of the entry
+		@param obj: ChangeListener, the value is recalculated after obj has changed
+		@param get_value: callable that returns the current value"""
+		self._getters[key] = get_value
+		self._dirty.add(key)
+		self._removed.discard(key)
+		obj.add_change_listener(Callback(self._dirty.add, key))
+		obj.add_remove_listener(Callback(self._on_remove, key))
+
+	def _on_remove(self, key):
+		# the object must not be accessed anymore, remove the entry on the next digest
+		self._getters.pop(key, None)
+		self._dirty.discard(key)
+		self._removed.add(key)
+
+	def get_digest(self):
+		"""Returns the digest as hex string of fixed length"""
+		for key in self._removed:
+			self._remove_entry(key)
+		self._removed.clear()
+		for key in self._dirty:
+			self.update(key, self._getters[key]())
+		self._dirty.clear()
+		return '%0*x' % (self.DIGEST_BITS // 4, self._digest)
+
+	def get_values(self):
+		"""Returns a copy of all entries as dict { key : value }, valid for the last digest"""
+		return dict(self._values)
@@ -26,6 +26,7 @@ import horizons.main
 
 from horizons.constants import PATHS
 from loader import GeneralLoader
+from indexcache import LoaderIndexCache
 
 class ActionSetLoader(object):
 	"""The ActionSetLoader loads action sets from a directory tree. The directories loaded
@@ -53,12 +54,23 @@ class ActionSetLoader(object):
 				if os.path.isdir(full_path) and entry != ".svn" and entry != ".DS_Store":
 					cls._find_action_sets(full_path)
 
+	@classmethod
+	def _find_all_action_sets(cls):
+		cls.action_sets = {}
+		cls._find_action_sets(PATHS.ACTION_SETS_DIRECTORY)
+		return cls.action_sets
+
+	@classmethod
+	def get_index_cache(cls):
+		"""Returns the LoaderIndexCache of the action sets directory"""
+		return LoaderIndexCache(PATHS.ACTION_SETS_INDEX_FILE, PATHS.ACTION_SETS_DIRECTORY)
+
 	@classmethod
 	def load(cls):
 		if not cls._loaded:
 			cls.log.debug("Loading action_sets...")
 			if not horizons.main.fife.use_atlases:
-				cls._find_action_sets(PATHS.ACTION_SETS_DIRECTORY)
+				cls.action_sets = cls.get_index_cache().load(cls._find_all_action_sets)
 			else:
 				import json
 				def _decode_list(lst):
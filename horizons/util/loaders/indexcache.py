@@ -0,0 +1,103 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import logging
+import marshal
+
+from horizons.util.atomicwrite import atomic_write
+
+class LoaderIndexCache(object):
+	"""Stores what the ActionSetLoader or TileSetLoader found in a directory tree, so that
+	the tree doesn't have to be searched for png files on every start.
+
+	The index file contains the marshalled tuple (FORMAT_VERSION, absolute path of the
+	directory, mtimes, sets), where mtimes is a list of (path, mtime) of every directory in
+	the tree. Adding or removing a file or directory changes the mtime of its parent
+	directory, so the index is only used if all mtimes are unchanged. Checking them only needs a stat call per
+	directory instead of listing its contents.
+	"""
+
+	log = logging.getLogger("util.loaders.indexcache")
+
+	FORMAT_VERSION = 1
+
+	def __init__(self, filename, directory):
+		"""
+		@param filename: path of the index file, its directory is created when needed
+		@param directory: root of the directory tree that is indexed
+		"""
+		self.filename = filename
+		self.directory = directory
+
+	def _get_mtimes(self):
+		mtimes = []
+		for dirpath, dirnames, filenames in os.walk(self.directory):
+			for ignored in ('.svn', '.DS_Store'):
+				if ignored in dirnames:
+					dirnames.remove(ignored)
+			mtimes.append((dirpath, os.stat(dirpath).st_mtime))
+		return mtimes
+
+	def get(self):
+		"""Returns the sets stored in the index or None if it is missing or outdated"""
+		try:
+			with open(self.filename, 'rb') as f:
+				format_version, directory, mtimes, sets = marshal.load(f)
+		except IOError:
+			return None
+		except (ValueError, EOFError, TypeError), e:
+			self.log.warning("Invalid index %s: %s", self.filename, e)
+			return None
+		# the absolute path distinguishes installations in different places
+		if format_version != self.FORMAT_VERSION or directory != os.path.abspath(self.directory):
+			return None
+		for path, mtime in mtimes:
+			try:
+				if os.stat(path).st_mtime != mtime:
+					self.log.debug("Index %s is outdated: %s changed", self.filename, path)
+					return None
+			except OSError:
+				return None
+		return sets
+
+	def load(self, find_sets):
+		"""Returns the sets from the index. If it is outdated, the sets are searched and the
+		index is written again.
+		@param find_sets: function that searches the directory and returns the sets"""
+		sets = self.get()
+		if sets is None:
+			sets = self.rebuild(find_sets)
+		return sets
+
+	def rebuild(self, find_sets):
+		"""Searches the sets with find_sets and writes the index. Errors are only logged,
+		the index is optional.
+		@return: the sets"""
+		# the mtimes are read first, so that changes during the search make the index outdated
+		mtimes = self._get_mtimes()
+		sets = find_sets()
+		try:
+			data = marshal.dumps((self.FORMAT_VERSION, os.path.abspath(self.directory), mtimes, sets))
+			atomic_write(self.filename, data)
+		except (IOError, OSError), e:
+			self.log.warning("Failed to write index %s: %s", self.filename, e)
+		return sets
@@ -24,6 +24,7 @@ import logging
 
 from horizons.constants import PATHS
 from loader import GeneralLoader
+from indexcache import LoaderIndexCache
 
 class TileSetLoader(object):
 	"""The TileSetLoader loads tile sets from a directory tree. The directories loaded
@@ -51,12 +52,23 @@ class TileSetLoader(object):
 				if os.path.isdir(full_path) and entry != ".svn" and entry != ".DS_Store":
 					cls._find_tile_sets(full_path)
 
+	@classmethod
+	def _find_all_tile_sets(cls):
+		cls.tile_sets = {}
+		cls._find_tile_sets(PATHS.TILE_SETS_DIRECTORY)
+		return cls.tile_sets
+
+	@classmethod
+	def get_index_cache(cls):
+		"""Returns the LoaderIndexCache of the tile sets directory"""
+		return LoaderIndexCache(PATHS.TILE_SETS_INDEX_FILE, PATHS.TILE_SETS_DIRECTORY)
+
 	@classmethod
 	def load(cls):
 		#print "called"
 		if not cls._loaded:
 			cls.log.debug("Loading tile_sets...")
-			cls._find_tile_sets(PATHS.TILE_SETS_DIRECTORY)
+			cls.tile_sets = cls.get_index_cache().load(cls._find_all_tile_sets)
 			cls.log.debug("Done!")
 			cls._loaded = True
 
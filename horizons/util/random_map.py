@@ -26,8 +26,15 @@ import shutil
 import re
 import string
 import copy
+import itertools
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
 
 from horizons.util import Circle, Rect, Point, DbReader
+from horizons.util.randomislandcache import RandomIslandCache
 from horizons.constants import GROUND, PATHS
 
 # this is how a random island id looks like (used for creation)
@@ -36,6 +43,12 @@ _random_island_id_template = "random:${creation_method}:${width}:${height}:${see
 # you can check for a random island id with this:
 _random_island_id_regexp = r"random:([0-9]+):([0-9]+):([0-9]+):([\-]?[0-9]+)"
 
+# increment this whenever the islands generated from an id string change
+RANDOM_ISLAND_GENERATOR_VERSION = 1
+
+# random islands are generated once and then stored in the user dir
+_island_cache = RandomIslandCache(PATHS.RANDOM_ISLAND_CACHE_DIR, RANDOM_ISLAND_GENERATOR_VERSION)
+
 
 def is_random_island_id_string(id_string):
 	"""Returns whether id_string is an instance of a random island id string"""
@@ -43,11 +56,41 @@ def is_random_island_id_string(id_string):
 
 def create_random_island(id_string):
 	"""Creates a random island as sqlite db.
+	@param id_string: random island id string
+	@return: sqlite db reader containing island
+	"""
+	map_db = DbReader(":memory:")
+	map_db("CREATE TABLE ground(x INTEGER NOT NULL, y INTEGER NOT NULL, ground_id INTEGER NOT NULL)")
+	map_db("CREATE TABLE island_properties(name TEXT PRIMARY KEY NOT NULL, value TEXT NOT NULL)")
+	map_db("BEGIN TRANSACTION")
+	map_db.execute_many("INSERT INTO ground VALUES(?, ?, ?)", get_random_island_ground(id_string))
+	map_db("COMMIT")
+	return map_db
+
+def get_random_island_ground(id_string):
+	"""Returns the ground tiles of a random island.
+	Islands are generated only once, later on they are read from the RandomIslandCache.
+	@param id_string: random island id string
+	@return: list of (x, y, ground_id) tuples
+	"""
+	ground = _island_cache.get(id_string)
+	if ground is None:
+		ground = _generate_random_island_ground(id_string)
+		_island_cache.put(id_string, ground)
+	return ground
+
+def _generate_random_island_ground(id_string, use_numpy=None):
+	"""Generates the ground of a random island.
 	It is rather primitive; it places shapes on the dict.
 	The coordinates of tiles will be 0 <= x < width and 0 <= y < height
+	NOTE: increment RANDOM_ISLAND_GENERATOR_VERSION when the result changes.
 	@param id_string: random island id string
-	@return: sqlite db reader containing island
+	@param use_numpy: whether to use the NumPy implementation, the default is to use it if
+	                  NumPy is available. Both implementations generate the same tiles.
+	@return: list of (x, y, ground_id) tuples
 	"""
+	if use_numpy is None:
+		use_numpy = numpy is not None
 	# NOTE: the tilesystem will be redone soon, so constants indicating grounds are temporary
 	# here and will have to be changed anyways.
 	match_obj = re.match(_random_island_id_regexp, id_string)
@@ -108,115 +151,100 @@ def create_random_island(id_string):
 				shape = Circle(Point(x, y), shape_id)
 
 		if shape:
-			for shape_coord in shape.tuple_iter():
+			if use_numpy:
+				shape_coords = _NumpyIslandCoast.get_shape_coords(shape)
+			else:
+				shape_coords = shape.tuple_iter()
+			# NOTE: don't use set.update/difference_update here, difference_update resizes the
+			# set and therefore changes the order of the tiles
+			for shape_coord in shape_coords:
 				if add:
 					map_set.add(shape_coord)
 				elif shape_coord in map_set:
 					map_set.discard(shape_coord)
 
-	# write values to db
-	map_db = DbReader(":memory:")
-	map_db("CREATE TABLE ground(x INTEGER NOT NULL, y INTEGER NOT NULL, ground_id INTEGER NOT NULL)")
-	map_db("CREATE TABLE island_properties(name TEXT PRIMARY KEY NOT NULL, value TEXT NOT NULL)")
-	map_db("BEGIN TRANSACTION")
+
+	# tiles in the order they are generated
+	ground = []
 
 	# add grass tiles
 	for x, y in map_set:
-		map_db("INSERT INTO ground VALUES(?, ?, ?)", x, y, GROUND.DEFAULT_LAND)
+		ground.append((x, y, GROUND.DEFAULT_LAND))
 
-	def fill_tiny_spaces(tile):
-		"""Fills 1 tile gulfs and straits with the specified tile
-		@param tile: ground tile to fill with
-		"""
-
-		all_neighbours = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-		neighbours = [(-1, 0), (0, -1), (0, 1), (1, 0)]
-		corners = [(-1, -1), (-1, 1)]
-		knight_moves = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
-		bad_configs = set([0, 1 << 0, 1 << 1, 1 << 2, 1 << 3, (1 << 0) | (1 << 3), (1 << 1) | (1 << 2)])
-
-		edge_set = copy.copy(map_set)
-		reduce_edge_set = True
-
-		while True:
-			to_fill = set()
-			to_ignore = set()
-			for x, y in edge_set:
-				# ignore the tiles with no empty neighbours
-				if reduce_edge_set:
-					is_edge = False
-					for x_offset, y_offset in all_neighbours:
-						if (x + x_offset, y + y_offset) not in map_set:
-							is_edge = True
-							break
-					if not is_edge:
-						to_ignore.add((x, y))
-						continue
-
-				for x_offset, y_offset in neighbours:
-					x2 = x + x_offset
-					y2 = y + y_offset
-					if (x2, y2) in map_set:
-						continue
-					# (x2, y2) is now a point just off the island
-
-					neighbours_dirs = 0
-					for i in xrange(len(neighbours)):
-						x3 = x2 + neighbours[i][0]
-						y3 = y2 + neighbours[i][1]
-						if (x3, y3) not in map_set:
-							neighbours_dirs |= (1 << i)
-					if neighbours_dirs in bad_configs:
-						# part of a straight 1 tile gulf
-						to_fill.add((x2, y2))
-					else:
-						for x_offset, y_offset in corners:
-							x3 = x2 + x_offset
-							y3 = y2 + y_offset
-							x4 = x2 - x_offset
-							y4 = y2 - y_offset
-							if (x3, y3) in map_set and (x4, y4) in map_set:
-								# part of a diagonal 1 tile gulf
-								to_fill.add((x2, y2))
-								break
-
-				# block 1 tile straits
-				for x_offset, y_offset in knight_moves:
-					x2 = x + x_offset
-					y2 = y + y_offset
-					if (x2, y2) not in map_set:
-						continue
-					if abs(x_offset) == 1:
-						y2 = y + y_offset / 2
-						if (x2, y2) in map_set or (x, y2) in map_set:
-							continue
-					else:
-						x2 = x + x_offset / 2
-						if (x2, y2) in map_set or (x2, y) in map_set:
-							continue
-					to_fill.add((x2, y2))
+	coast_class = _NumpyIslandCoast if use_numpy else _IslandCoast
+	coast = coast_class(map_set, ground)
+	# add grass to sand tiles
+	coast.fill_tiny_spaces(GROUND.DEFAULT_LAND)
+	coast.add_coast('SAND')
+	# add sand to shallow water tiles
+	coast.fill_tiny_spaces(GROUND.SAND)
+	coast.add_coast('COAST')
+	# add shallow water to deep water tiles
+	coast.fill_tiny_spaces(GROUND.SHALLOW_WATER)
+	coast.add_coast('DEEP_WATER')
 
-				# block diagonal 1 tile straits
-				for x_offset, y_offset in corners:
-					x2 = x + x_offset
-					y2 = y + y_offset
-					x3 = x + 2 * x_offset
-					y3 = y + 2 * y_offset
-					if (x2, y2) not in map_set and (x3, y3) in map_set:
-						to_fill.add((x2, y2))
-					elif (x2, y2) in map_set and (x2, y) not in map_set and (x, y2) not in map_set:
-						to_fill.add((x2, y))
+	return ground
 
-			if to_fill:
-				for x, y in to_fill:
-					map_set.add((x, y))
-					map_db("INSERT INTO ground VALUES(?, ?, ?)", x, y, tile)
+def _get_coast_tile(filled, layer):
+	"""Returns the tile of a coast layer that fits to the filled neighbours.
+	@param filled: sorted list of directions of the neighbours that are part of the island
+	@param layer: tile name prefix of the coast layer: 'SAND', 'COAST' or 'DEEP_WATER'
+	@return: ground tile or None if there is no fitting tile
+	"""
+	tile = None
+	# straight coast or 1 tile U-shaped gulfs
+	if filled == ['s', 'se', 'sw'] or filled == ['s']:
+		tile = 'NORTH'
+	elif filled == ['e', 'ne', 'se'] or filled == ['e']:
+		tile = 'WEST'
+	elif filled == ['n', 'ne', 'nw'] or filled == ['n']:
+		tile = 'SOUTH'
+	elif filled == ['nw', 'sw', 'w'] or filled == ['w']:
+		tile = 'EAST'
+	# slight turn (looks best with straight coast)
+	elif filled == ['e', 'se'] or filled == ['e', 'ne']:
+		tile = 'WEST'
+	elif filled == ['n', 'ne'] or filled == ['n', 'nw']:
+		tile = 'SOUTH'
+	elif filled == ['nw', 'w'] or filled == ['sw', 'w']:
+		tile = 'EAST'
+	elif filled == ['s', 'sw'] or filled == ['s', 'se']:
+		tile = 'NORTH'
+	# mostly outer corner
+	elif filled == ['se']:
+		tile = 'NORTHWEST1'
+	elif filled == ['ne']:
+		tile = 'SOUTHWEST1'
+	elif filled == ['nw']:
+		tile = 'SOUTHEAST1'
+	elif filled == ['sw']:
+		tile = 'NORTHEAST1'
+	# mostly inner corner
+	elif 3 <= len(filled) <= 5:
+		coast_set = set(filled)
+		if 'e' in coast_set and 'se' in coast_set and 's' in coast_set:
+			tile = 'NORTHEAST3'
+		elif 's' in coast_set and 'sw' in coast_set and 'w' in coast_set:
+			tile = 'NORTHWEST3'
+		elif 'w' in coast_set and 'nw' in coast_set and 'n' in coast_set:
+			tile = 'SOUTHWEST3'
+		elif 'n' in coast_set and 'ne' in coast_set and 'e' in coast_set:
+			tile = 'SOUTHEAST3'
+
+	return None if tile is None else getattr(GROUND, layer + '_' + tile)
+
+
+class _IslandCoast(object):
+	"""Grows the coast layers around the land tiles of a random island.
+	The order of the generated tiles depends on the iteration order of the coordinate sets,
+	so every step has to add and remove the same coordinates in the same order.
+	"""
 
-				old_size = len(edge_set)
-				edge_set = edge_set.difference(to_ignore).union(to_fill)
-				reduce_edge_set = old_size - len(edge_set) > 50
-			else:
-				break
+	all_neighbours = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+	neighbours = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+	corners = [(-1, -1), (-1, 1)]
+	knight_moves = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+	bad_configs = set([0, 1 << 0, 1 << 1, 1 << 2, 1 << 3, (1 << 0) | (1 << 3), (1 << 1) | (1 << 2)])
 
 	# possible movement directions
 	all_moves = {
@@ -230,181 +258,346 @@ def create_random_island(id_string):
 		'ne' : (1, 1)
 		}
 
-	def get_island_outline():
+	def __init__(self, map_set, ground):
+		"""
+		@param map_set: set of the coordinates that are part of the island
+		@param ground: list of (x, y, ground_id) tuples the new tiles are appended to
 		"""
-		@return: the points just off the island as a dict
+		self.map_set = map_set
+		self.ground = ground
+
+	def fill_tiny_spaces(self, tile):
+		"""Fills 1 tile gulfs and straits with the specified tile
+		@param tile: ground tile to fill with
+		"""
+		edge_set = copy.copy(self.map_set)
+		reduce_edge_set = True
+
+		while True:
+			to_fill, to_ignore = self._find_tiny_spaces(edge_set, reduce_edge_set)
+			if to_fill:
+				self._add_tiles(to_fill, tile)
+				old_size = len(edge_set)
+				edge_set = edge_set.difference(to_ignore).union(to_fill)
+				reduce_edge_set = old_size - len(edge_set) > 50
+			else:
+				break
+
+	def _find_tiny_spaces(self, edge_set, reduce_edge_set):
+		"""Finds the tiles that have to be filled next.
+		@param edge_set: set of the coordinates that might be next to a tiny space
+		@param reduce_edge_set: whether to find the coordinates with no empty neighbours
+		@return: tuple: (set of coordinates to fill, set of coordinates with no empty neighbours)
 		"""
+		map_set = self.map_set
+		neighbours = self.neighbours
+		to_fill = set()
+		to_ignore = set()
+		for x, y in edge_set:
+			# ignore the tiles with no empty neighbours
+			if reduce_edge_set:
+				is_edge = False
+				for x_offset, y_offset in self.all_neighbours:
+					if (x + x_offset, y + y_offset) not in map_set:
+						is_edge = True
+						break
+				if not is_edge:
+					to_ignore.add((x, y))
+					continue
+
+			for x_offset, y_offset in neighbours:
+				x2 = x + x_offset
+				y2 = y + y_offset
+				if (x2, y2) in map_set:
+					continue
+				# (x2, y2) is now a point just off the island
+
+				neighbours_dirs = 0
+				for i in xrange(len(neighbours)):
+					x3 = x2 + neighbours[i][0]
+					y3 = y2 + neighbours[i][1]
+					if (x3, y3) not in map_set:
+						neighbours_dirs |= (1 << i)
+				if neighbours_dirs in self.bad_configs:
+					# part of a straight 1 tile gulf
+					to_fill.add((x2, y2))
+				else:
+					for x_offset, y_offset in self.corners:
+						x3 = x2 + x_offset
+						y3 = y2 + y_offset
+						x4 = x2 - x_offset
+						y4 = y2 - y_offset
+						if (x3, y3) in map_set and (x4, y4) in map_set:
+							# part of a diagonal 1 tile gulf
+							to_fill.add((x2, y2))
+							break
+
+			# block 1 tile straits
+			for x_offset, y_offset in self.knight_moves:
+				x2 = x + x_offset
+				y2 = y + y_offset
+				if (x2, y2) not in map_set:
+					continue
+				if abs(x_offset) == 1:
+					y2 = y + y_offset / 2
+					if (x2, y2) in map_set or (x, y2) in map_set:
+						continue
+				else:
+					x2 = x + x_offset / 2
+					if (x2, y2) in map_set or (x2, y) in map_set:
+						continue
+				to_fill.add((x2, y2))
+
+			# block diagonal 1 tile straits
+			for x_offset, y_offset in self.corners:
+				x2 = x + x_offset
+				y2 = y + y_offset
+				x3 = x + 2 * x_offset
+				y3 = y + 2 * y_offset
+				if (x2, y2) not in map_set and (x3, y3) in map_set:
+					to_fill.add((x2, y2))
+				elif (x2, y2) in map_set and (x2, y) not in map_set and (x, y2) not in map_set:
+					to_fill.add((x2, y))
+		return to_fill, to_ignore
+
+	def _add_tiles(self, coords_set, tile):
+		"""Adds the coordinates to the island in the iteration order of coords_set.
+		@param coords_set: set of coordinates
+		@param tile: ground tile of the new coordinates
+		"""
+		for x, y in coords_set:
+			self.map_set.add((x, y))
+			self.ground.append((x, y, tile))
+
+	def get_island_outline(self):
+		"""
+		@return: the points just off the island as a set
+		"""
+		map_set = self.map_set
 		result = set()
 		for x, y in map_set:
-			for offset_x, offset_y in all_moves.itervalues():
+			for offset_x, offset_y in self.all_moves.itervalues():
 				coords = (x + offset_x, y + offset_y)
 				if coords not in map_set:
 					result.add(coords)
 		return result
 
-	# add grass to sand tiles
-	fill_tiny_spaces(GROUND.DEFAULT_LAND)
-	outline = get_island_outline()
-	for x, y in outline:
-		filled = []
-		for dir in sorted(all_moves):
-			coords = (x + all_moves[dir][1], y + all_moves[dir][0])
-			if coords in map_set:
-				filled.append(dir)
-
-		tile = None
-		# straight coast or 1 tile U-shaped gulfs
-		if filled == ['s', 'se', 'sw'] or filled == ['s']:
-			tile = GROUND.SAND_NORTH
-		elif filled == ['e', 'ne', 'se'] or filled == ['e']:
-			tile = GROUND.SAND_WEST
-		elif filled == ['n', 'ne', 'nw'] or filled == ['n']:
-			tile = GROUND.SAND_SOUTH
-		elif filled == ['nw', 'sw', 'w'] or filled == ['w']:
-			tile = GROUND.SAND_EAST
-		# slight turn (looks best with straight coast)
-		elif filled == ['e', 'se'] or filled == ['e', 'ne']:
-			tile = GROUND.SAND_WEST
-		elif filled == ['n', 'ne'] or filled == ['n', 'nw']:
-			tile = GROUND.SAND_SOUTH
-		elif filled == ['nw', 'w'] or filled == ['sw', 'w']:
-			tile = GROUND.SAND_EAST
-		elif filled == ['s', 'sw'] or filled == ['s', 'se']:
-			tile = GROUND.SAND_NORTH
-		# sandy corner
-		elif filled == ['se']:
-			tile = GROUND.SAND_NORTHWEST1
-		elif filled == ['ne']:
-			tile = GROUND.SAND_SOUTHWEST1
-		elif filled == ['nw']:
-			tile = GROUND.SAND_SOUTHEAST1
-		elif filled == ['sw']:
-			tile = GROUND.SAND_NORTHEAST1
-		# grassy corner
-		elif 3 <= len(filled) <= 5:
-			coast_set = set(filled)
-			if 'e' in coast_set and 'se' in coast_set and 's' in coast_set:
-				tile = GROUND.SAND_NORTHEAST3
-			elif 's' in coast_set and 'sw' in coast_set and 'w' in coast_set:
-				tile = GROUND.SAND_NORTHWEST3
-			elif 'w' in coast_set and 'nw' in coast_set and 'n' in coast_set:
-				tile = GROUND.SAND_SOUTHWEST3
-			elif 'n' in coast_set and 'ne' in coast_set and 'e' in coast_set:
-				tile = GROUND.SAND_SOUTHEAST3
-
-		assert tile
-		map_db("INSERT INTO ground VALUES(?, ?, ?)", x, y, tile)
-	map_set = map_set.union(outline)
-
-	# add sand to shallow water tiles
-	fill_tiny_spaces(GROUND.SAND)
-	outline = get_island_outline()
-	for x, y in outline:
-		filled = []
-		for dir in sorted(all_moves):
-			coords = (x + all_moves[dir][1], y + all_moves[dir][0])
-			if coords in map_set:
-				filled.append(dir)
-
-		tile = None
-		# straight coast or 1 tile U-shaped gulfs
-		if filled == ['s', 'se', 'sw'] or filled == ['s']:
-			tile = GROUND.COAST_NORTH
-		elif filled == ['e', 'ne', 'se'] or filled == ['e']:
-			tile = GROUND.COAST_WEST
-		elif filled == ['n', 'ne', 'nw'] or filled == ['n']:
-			tile = GROUND.COAST_SOUTH
-		elif filled == ['nw', 'sw', 'w'] or filled == ['w']:
-			tile = GROUND.COAST_EAST
-		# slight turn (looks best with straight coast)
-		elif filled == ['e', 'se'] or filled == ['e', 'ne']:
-			tile = GROUND.COAST_WEST
-		elif filled == ['n', 'ne'] or filled == ['n', 'nw']:
-			tile = GROUND.COAST_SOUTH
-		elif filled == ['nw', 'w'] or filled == ['sw', 'w']:
-			tile = GROUND.COAST_EAST
-		elif filled == ['s', 'sw'] or filled == ['s', 'se']:
-			tile = GROUND.COAST_NORTH
-		# mostly wet corner
-		elif filled == ['se']:
-			tile = GROUND.COAST_NORTHWEST1
-		elif filled == ['ne']:
-			tile = GROUND.COAST_SOUTHWEST1
-		elif filled == ['nw']:
-			tile = GROUND.COAST_SOUTHEAST1
-		elif filled == ['sw']:
-			tile = GROUND.COAST_NORTHEAST1
-		# mostly dry corner
-		elif 3 <= len(filled) <= 5:
-			coast_set = set(filled)
-			if 'e' in coast_set and 'se' in coast_set and 's' in coast_set:
-				tile = GROUND.COAST_NORTHEAST3
-			elif 's' in coast_set and 'sw' in coast_set and 'w' in coast_set:
-				tile = GROUND.COAST_NORTHWEST3
-			elif 'w' in coast_set and 'nw' in coast_set and 'n' in coast_set:
-				tile = GROUND.COAST_SOUTHWEST3
-			elif 'n' in coast_set and 'ne' in coast_set and 'e' in coast_set:
-				tile = GROUND.COAST_SOUTHEAST3
-
-		assert tile
-		map_db("INSERT INTO ground VALUES(?, ?, ?)", x, y, tile)
-	map_set = map_set.union(outline)
+	def add_coast(self, layer):
+		"""Surrounds the island with a layer of coast tiles.
+		@param layer: tile name prefix of the coast layer, see _get_coast_tile
+		"""
+		map_set = self.map_set
+		all_moves = self.all_moves
+		outline = self.get_island_outline()
+		for x, y in outline:
+			filled = []
+			for dir in sorted(all_moves):
+				coords = (x + all_moves[dir][1], y + all_moves[dir][0])
+				if coords in map_set:
+					filled.append(dir)
+
+			tile = _get_coast_tile(filled, layer)
+			assert tile
+			self.ground.append((x, y, tile))
+		self.map_set = map_set.union(outline)
+
+
+class _NumpyIslandCoast(_IslandCoast):
+	"""Does the per tile neighbour checks of _IslandCoast with array operations.
+	The island is mirrored in a boolean array so that whole coordinate lists can be looked
+	up at once. The coordinate sets are still maintained the same way as in _IslandCoast,
+	which keeps the generated tiles and their order identical.
+	"""
 
-	# add shallow water to deep water tiles
-	fill_tiny_spaces(GROUND.SHALLOW_WATER)
-	outline = get_island_outline()
-	for x, y in outline:
-		filled = []
-		for dir in sorted(all_moves):
-			coords = (x + all_moves[dir][1], y + all_moves[dir][0])
-			if coords in map_set:
-				filled.append(dir)
-
-		tile = None
-		# straight coast or 1 tile U-shaped gulfs
-		if filled == ['s', 'se', 'sw'] or filled == ['s']:
-			tile = GROUND.DEEP_WATER_NORTH
-		elif filled == ['e', 'ne', 'se'] or filled == ['e']:
-			tile = GROUND.DEEP_WATER_WEST
-		elif filled == ['n', 'ne', 'nw'] or filled == ['n']:
-			tile = GROUND.DEEP_WATER_SOUTH
-		elif filled == ['nw', 'sw', 'w'] or filled == ['w']:
-			tile = GROUND.DEEP_WATER_EAST
-		# slight turn (looks best with straight coast)
-		elif filled == ['e', 'se'] or filled == ['e', 'ne']:
-			tile = GROUND.DEEP_WATER_WEST
-		elif filled == ['n', 'ne'] or filled == ['n', 'nw']:
-			tile = GROUND.DEEP_WATER_SOUTH
-		elif filled == ['nw', 'w'] or filled == ['sw', 'w']:
-			tile = GROUND.DEEP_WATER_EAST
-		elif filled == ['s', 'sw'] or filled == ['s', 'se']:
-			tile = GROUND.DEEP_WATER_NORTH
-		# mostly deep corner
-		elif filled == ['se']:
-			tile = GROUND.DEEP_WATER_NORTHWEST1
-		elif filled == ['ne']:
-			tile = GROUND.DEEP_WATER_SOUTHWEST1
-		elif filled == ['nw']:
-			tile = GROUND.DEEP_WATER_SOUTHEAST1
-		elif filled == ['sw']:
-			tile = GROUND.DEEP_WATER_NORTHEAST1
-		# mostly shallow corner
-		elif 3 <= len(filled) <= 5:
-			coast_set = set(filled)
-			if 'e' in coast_set and 'se' in coast_set and 's' in coast_set:
-				tile = GROUND.DEEP_WATER_NORTHEAST3
-			elif 's' in coast_set and 'sw' in coast_set and 'w' in coast_set:
-				tile = GROUND.DEEP_WATER_NORTHWEST3
-			elif 'w' in coast_set and 'nw' in coast_set and 'n' in coast_set:
-				tile = GROUND.DEEP_WATER_SOUTHWEST3
-			elif 'n' in coast_set and 'ne' in coast_set and 'e' in coast_set:
-				tile = GROUND.DEEP_WATER_SOUTHEAST3
-
-		assert tile
-		map_db("INSERT INTO ground VALUES(?, ?, ?)", x, y, tile)
+	# free space around the island in the array, lookups are at most 2 tiles off the island
+	MIN_MARGIN = 3
+	MARGIN = 16
+
+	# directions in the order they are checked when classifying coast tiles
+	_coast_dirs = sorted(_IslandCoast.all_moves)
+
+	# lookup table telling which bitmasks of empty neighbours are in bad_configs
+	_bad_configs = numpy.zeros(1 << len(_IslandCoast.neighbours), dtype=bool) if numpy else None
+	if numpy:
+		_bad_configs[list(_IslandCoast.bad_configs)] = True
+
+	# cached coordinate offsets of circles by radius
+	_circle_offsets = {}
+	# cached lookup tables from the bitmask of filled neighbours to the tile of each layer
+	_coast_tiles = {}
+
+	def __init__(self, map_set, ground):
+		super(_NumpyIslandCoast, self).__init__(map_set, ground)
+		self.mask = numpy.zeros((0, 0), dtype=bool)
+		self.x_offset = self.y_offset = 0
+		self._update_mask(*self._to_arrays(map_set))
+
+	@classmethod
+	def get_shape_coords(cls, shape):
+		"""Returns the coordinates of a shape in the order of shape.tuple_iter().
+		@param shape: Rect or Circle
+		@return: list of (x, y) tuples
+		"""
+		if not isinstance(shape, Circle):
+			return list(shape.tuple_iter())
+		radius = shape.radius
+		if radius not in cls._circle_offsets:
+			x_offsets, y_offsets = numpy.mgrid[-radius:radius + 1, -radius:radius + 1]
+			inside = x_offsets ** 2 + y_offsets ** 2 <= radius ** 2
+			cls._circle_offsets[radius] = (x_offsets[inside], y_offsets[inside])
+		x_offsets, y_offsets = cls._circle_offsets[radius]
+		return zip((x_offsets + shape.center.x).tolist(), (y_offsets + shape.center.y).tolist())
+
+	@classmethod
+	def _to_arrays(cls, coords):
+		"""Splits an iterable of (x, y) tuples into an array of x and an array of y coordinates"""
+		coords = numpy.fromiter(itertools.chain.from_iterable(coords), dtype=int).reshape(-1, 2)
+		return coords[:, 0], coords[:, 1]
+
+	def _update_mask(self, xs, ys):
+		"""Marks the coordinates as part of the island and grows the array if necessary."""
+		if not len(xs):
+			return
+		x_min, x_max = xs.min() - self.MIN_MARGIN, xs.max() + self.MIN_MARGIN
+		y_min, y_max = ys.min() - self.MIN_MARGIN, ys.max() + self.MIN_MARGIN
+		width, height = self.mask.shape
+		if x_min < self.x_offset or y_min < self.y_offset or \
+		   x_max >= self.x_offset + width or y_max >= self.y_offset + height:
+			# reallocate with some free space around the old and the new coordinates
+			x_offset = min(x_min, self.x_offset if width else x_min) - self.MARGIN
+			y_offset = min(y_min, self.y_offset if height else y_min) - self.MARGIN
+			new_width = max(x_max, self.x_offset + width) + self.MARGIN - x_offset
+			new_height = max(y_max, self.y_offset + height) + self.MARGIN - y_offset
+			mask = numpy.zeros((new_width, new_height), dtype=bool)
+			mask[self.x_offset - x_offset : self.x_offset - x_offset + width, \
+			     self.y_offset - y_offset : self.y_offset - y_offset + height] = self.mask
+			self.mask = mask
+			self.x_offset = x_offset
+			self.y_offset = y_offset
+		self.mask[xs - self.x_offset, ys - self.y_offset] = True
+
+	def _contains(self, xs, ys):
+		"""Returns a boolean array telling which of the coordinates are part of the island"""
+		return self.mask.take((xs - self.x_offset) * self.mask.shape[1] + (ys - self.y_offset))
+
+	@classmethod
+	def _ordered_coords(cls, xs, ys, selected):
+		"""Returns the selected coordinates as list of tuples.
+		The arrays have a row per tile and a column per checked coordinate of the tile;
+		the result is in the order in which the coordinates are checked in _IslandCoast.
+		"""
+		return zip(xs[selected].tolist(), ys[selected].tolist())
+
+	def _find_tiny_spaces(self, edge_set, reduce_edge_set):
+		x, y = self._to_arrays(edge_set)
+		contains = self._contains
+
+		to_ignore = set()
+		if reduce_edge_set:
+			is_edge = numpy.zeros(len(x), dtype=bool)
+			for x_offset, y_offset in self.all_neighbours:
+				is_edge |= ~contains(x + x_offset, y + y_offset)
+			to_ignore.update(self._ordered_coords(x, y, ~is_edge))
+			x = x[is_edge]
+			y = y[is_edge]
+
+		# every edge tile can fill one coordinate per check, the checks are the columns
+		checks = len(self.neighbours) + len(self.knight_moves) + len(self.corners)
+		fill_x = numpy.empty((len(x), checks), dtype=int)
+		fill_y = numpy.empty((len(x), checks), dtype=int)
+		fill = numpy.empty((len(x), checks), dtype=bool)
+		column = 0
+
+		for x_offset, y_offset in self.neighbours:
+			x2 = x + x_offset
+			y2 = y + y_offset
+			# (x2, y2) is a point just off the island
+			neighbours_dirs = numpy.zeros(len(x), dtype=int)
+			for i, (x3_offset, y3_offset) in enumerate(self.neighbours):
+				neighbours_dirs |= (~contains(x2 + x3_offset, y2 + y3_offset)).astype(int) << i
+			# part of a straight 1 tile gulf
+			gulf = self._bad_configs[neighbours_dirs]
+			# part of a diagonal 1 tile gulf
+			for x3_offset, y3_offset in self.corners:
+				gulf |= contains(x2 + x3_offset, y2 + y3_offset) & contains(x2 - x3_offset, y2 - y3_offset)
+			fill_x[:, column] = x2
+			fill_y[:, column] = y2
+			fill[:, column] = ~contains(x2, y2) & gulf
+			column += 1
+
+		# block 1 tile straits
+		for x_offset, y_offset in self.knight_moves:
+			straits = contains(x + x_offset, y + y_offset)
+			if abs(x_offset) == 1:
+				x2 = x + x_offset
+				y2 = y + y_offset / 2
+				straits &= ~contains(x, y2)
+			else:
+				x2 = x + x_offset / 2
+				y2 = y + y_offset
+				straits &= ~contains(x2, y)
+			fill_x[:, column] = x2
+			fill_y[:, column] = y2
+			fill[:, column] = straits & ~contains(x2, y2)
+			column += 1
+
+		# block diagonal 1 tile straits
+		for x_offset, y_offset in self.corners:
+			x2 = x + x_offset
+			y2 = y + y_offset
+			corner_filled = contains(x2, y2)
+			diagonal = ~corner_filled & contains(x + 2 * x_offset, y + 2 * y_offset)
+			side = corner_filled & ~contains(x2, y) & ~contains(x, y2)
+			fill_x[:, column] = x2
+			fill_y[:, column] = numpy.where(diagonal, y2, y)
+			fill[:, column] = diagonal | side
+			column += 1
+
+		to_fill = set()
+		to_fill.update(self._ordered_coords(fill_x, fill_y, fill))
+		return to_fill, to_ignore
+
+	def _add_tiles(self, coords_set, tile):
+		super(_NumpyIslandCoast, self)._add_tiles(coords_set, tile)
+		self._update_mask(*self._to_arrays(coords_set))
+
+	def get_island_outline(self):
+		x, y = self._to_arrays(self.map_set)
+		moves = self.all_moves.values()
+		outline_x = numpy.empty((len(x), len(moves)), dtype=int)
+		outline_y = numpy.empty((len(x), len(moves)), dtype=int)
+		for column, (offset_x, offset_y) in enumerate(moves):
+			outline_x[:, column] = x + offset_x
+			outline_y[:, column] = y + offset_y
+		result = set()
+		result.update(self._ordered_coords(outline_x, outline_y, ~self._contains(outline_x, outline_y)))
+		return result
 
-	map_db("COMMIT")
-	return map_db
+	@classmethod
+	def _get_coast_tiles(cls, layer):
+		"""Returns an array that maps the bitmask of the filled neighbours to the coast tile.
+		Bit i of the bitmask is set if the neighbour in direction sorted(all_moves)[i] is filled.
+		"""
+		if layer not in cls._coast_tiles:
+			tiles = numpy.zeros(1 << len(cls._coast_dirs), dtype=int)
+			for bitmask in xrange(len(tiles)):
+				filled = [dir for i, dir in enumerate(cls._coast_dirs) if bitmask & (1 << i)]
+				tiles[bitmask] = _get_coast_tile(filled, layer) or 0
+			cls._coast_tiles[layer] = tiles
+		return cls._coast_tiles[layer]
+
+	def add_coast(self, layer):
+		outline = self.get_island_outline()
+		x, y = self._to_arrays(outline)
+		filled = numpy.zeros(len(x), dtype=int)
+		for i, dir in enumerate(self._coast_dirs):
+			move = self.all_moves[dir]
+			filled |= self._contains(x + move[1], y + move[0]).astype(int) << i
+		tiles = self._get_coast_tiles(layer)[filled]
+		assert tiles.all()
+		self.ground.extend(zip(x.tolist(), y.tolist(), tiles.tolist()))
+		self.map_set = self.map_set.union(outline)
+		self._update_mask(x, y)
 
 def generate_map(seed, map_size, water_percent, max_island_size, preferred_island_size, island_size_deviation):
 	"""
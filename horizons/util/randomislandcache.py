@@ -0,0 +1,168 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import array
+import hashlib
+import logging
+import os
+import struct
+import sys
+import zlib
+
+from horizons.util.atomicwrite import atomic_write
+
+
+class RandomIslandCache(object):
+	"""Stores the ground of generated random islands in the user's cache dir, so that they
+	don't have to be generated again each time a map with random islands is loaded.
+
+	Files are named after a hash of the island id string and the generator version, so
+	islands of older generators are never used. Each file contains:
+	  header: struct '!4sHHI' (MAGIC, FORMAT_VERSION, generator version, number of tiles)
+	  id string: struct '!H' length, followed by the string
+	  tiles: zlib compressed little endian int16 array of x, y, ground_id per tile
+	The tiles are stored in the order they were generated in. If the size of all files
+	exceeds max_size, the least recently used ones are removed.
+	"""
+	log = logging.getLogger("util.randomislandcache")
+
+	MAGIC = 'UHRI'
+	FORMAT_VERSION = 1
+	HEADER = struct.Struct('!4sHHI')
+	ID_LENGTH = struct.Struct('!H')
+	FILE_EXTENSION = '.island'
+	DEFAULT_MAX_SIZE = 16 * 1024 * 1024 # bytes
+
+	def __init__(self, directory, generator_version, max_size=DEFAULT_MAX_SIZE):
+		"""
+		@param directory: where to store the files, created when needed
+		@param generator_version: int, version of the island generator
+		@param max_size: maximal size of all files in bytes
+		"""
+		self.directory = directory
+		self.generator_version = generator_version
+		self.max_size = max_size
+
+	def _get_filename(self, id_string):
+		key = hashlib.sha1('%s:%s' % (self.generator_version, id_string)).hexdigest()
+		return os.path.join(self.directory, key + self.FILE_EXTENSION)
+
+	def get(self, id_string):
+		"""Returns the ground of the island or None if it isn't cached
+		@return: list of (x, y, ground_id) tuples"""
+		filename = self._get_filename(id_string)
+		try:
+			with open(filename, 'rb') as f:
+				data = f.read()
+		except IOError:
+			return None
+		try:
+			ground = self._decode(id_string, data)
+		except (ValueError, struct.error, zlib.error), e:
+			self.log.warning("Removing invalid random island cache file %s: %s", filename, e)
+			self._remove(filename)
+			return None
+		try:
+			os.utime(filename, None) # mark as recently used
+		except OSError:
+			pass
+		return ground
+
+	def put(self, id_string, ground):
+		"""Stores the ground of an island. Errors are only logged, the cache is optional.
+		@param ground: list of (x, y, ground_id) tuples"""
+		try:
+			data = self._encode(id_string, ground)
+		except OverflowError:
+			return # values don't fit into the format, generate this island every time
+		try:
+			atomic_write(self._get_filename(id_string), data)
+		except (IOError, OSError), e:
+			self.log.warning("Failed to write random island cache: %s", e)
+			return
+		self.evict()
+
+	def evict(self):
+		"""Removes least recently used files until the size limit is kept"""
+		entries = []
+		total_size = 0
+		for name in os.listdir(self.directory):
+			if not name.endswith(self.FILE_EXTENSION):
+				continue
+			filename = os.path.join(self.directory, name)
+			try:
+				stat = os.stat(filename)
+			except OSError:
+				continue
+			entries.append((stat.st_mtime, filename, stat.st_size))
+			total_size += stat.st_size
+		entries.sort()
+		for mtime, filename, size in entries:
+			if total_size <= self.max_size:
+				break
+			self._remove(filename)
+			total_size -= size
+
+	def clear(self):
+		"""Removes all cached islands"""
+		if not os.path.isdir(self.directory):
+			return
+		for name in os.listdir(self.directory):
+			if name.endswith(self.FILE_EXTENSION):
+				self._remove(os.path.join(self.directory, name))
+
+	def _remove(self, filename):
+		try:
+			os.remove(filename)
+		except OSError:
+			pass
+
+	def _encode(self, id_string, ground):
+		values = array.array('h')
+		for tile in ground:
+			values.extend(tile) # raises OverflowError if a value doesn't fit
+		if sys.byteorder != 'little':
+			values.byteswap()
+		return ''.join([
+			self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, self.generator_version, len(ground)),
+			self.ID_LENGTH.pack(len(id_string)),
+			id_string,
+			zlib.compress(values.tostring()),
+		])
+
+	def _decode(self, id_string, data):
+		magic, format_version, generator_version, count = self.HEADER.unpack_from(data)
+		if magic != self.MAGIC or format_version != self.FORMAT_VERSION:
+			raise ValueError("unknown format")
+		if generator_version != self.generator_version:
+			raise ValueError("generator version %s" % generator_version)
+		pos = self.HEADER.size
+		id_length = self.ID_LENGTH.unpack_from(data, pos)[0]
+		pos += self.ID_LENGTH.size
+		if data[pos:pos + id_length] != id_string:
+			raise ValueError("file of a different island")
+		values = array.array('h')
+		values.fromstring(zlib.decompress(data[pos + id_length:]))
+		if sys.byteorder != 'little':
+			values.byteswap()
+		if len(values) != 3 * count:
+			raise ValueError("expected %s tiles, found %s" % (count, len(values) // 3))
+		return zip(values[0::3], values[1::3], values[2::3])
@@ -0,0 +1,118 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import logging
+import marshal
+
+from horizons.util.atomicwrite import atomic_write
+
+class SavegameMetadataIndex(object):
+	"""Stores the metadata of savegames, so that listing them doesn't require opening every
+	savegame.
+
+	The index file contains the marshalled tuple (FORMAT_VERSION, entries), where entries is a
+	dict { absolute path: (size, mtime, metadata) }. An entry is only used while size and mtime
+	of the savegame are unchanged. Entries of savegames that are still being written are
+	stored with size and mtime None, these are taken when the entry is used or saved.
+	"""
+
+	log = logging.getLogger("util.savegamemetadataindex")
+
+	FORMAT_VERSION = 1
+
+	def __init__(self, filename):
+		"""
+		@param filename: path of the index file, its directory is created when needed
+		"""
+		self.filename = filename
+		self._entries = None # read on first access
+		self._dirty = False
+
+	@classmethod
+	def get_stat(cls, path):
+		"""Returns (size, mtime) of a file or None if it doesn't exist"""
+		try:
+			stat = os.stat(path)
+		except OSError:
+			return None
+		return (stat.st_size, stat.st_mtime)
+
+	def _get_entries(self):
+		if self._entries is None:
+			self._entries = {}
+			try:
+				with open(self.filename, 'rb') as f:
+					format_version, entries = marshal.load(f)
+				if format_version == self.FORMAT_VERSION:
+					self._entries = entries
+			except IOError:
+				pass
+			except (ValueError, EOFError, TypeError), e:
+				self.log.warning("Invalid index %s: %s", self.filename, e)
+		return self._entries
+
+	def get(self, path):
+		"""Returns the metadata of a savegame or None if it isn't indexed or has changed.
+		@param path: path of the savegame"""
+		path = os.path.abspath(path)
+		entry = self._get_entries().get(path)
+		if entry is None:
+			return None
+		stat = self.get_stat(path)
+		if stat is None:
+			return None
+		if entry[0] is None:
+			self.put(path, entry[2], stat)
+		elif stat != entry[:2]:
+			self.log.debug("Savegame %s has changed", path)
+			return None
+		return entry[2].copy()
+
+	def put(self, path, metadata, stat=None):
+		"""Adds the metadata of a savegame to the index.
+		@param path: path of the savegame
+		@param metadata: dict, may only contain builtin types
+		@param stat: (size, mtime) of the savegame when the metadata was read, as returned by
+		             get_stat. None if the savegame is still being written."""
+		if stat is None:
+			stat = (None, None)
+		self._get_entries()[os.path.abspath(path)] = stat + (metadata.copy(), )
+		self._dirty = True
+
+	def save(self):
+		"""Writes the index if it has changed. Entries of savegames that don't exist anymore
+		are removed. Errors are only logged, the index is optional."""
+		if not self._dirty:
+			return
+		entries = self._get_entries()
+		for path, (size, mtime, metadata) in entries.items():
+			stat = self.get_stat(path)
+			if stat is None:
+				del entries[path]
+			elif size is None:
+				entries[path] = stat + (metadata, )
+		try:
+			data = marshal.dumps((self.FORMAT_VERSION, entries))
+			atomic_write(self.filename, data)
+		except (IOError, OSError), e:
+			self.log.warning("Failed to write index %s: %s", self.filename, e)
+		self._dirty = False
@@ -0,0 +1,122 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import math
+
+
+class SpatialIndex(object):
+	"""
+	Indexes objects on the map by their position in a grid of buckets.
+
+	Used to answer queries of the form 'which ships are in range of (x, y)' without checking
+	every object. The time of a query depends on the number of objects near the position,
+	not on the number of objects on the map.
+
+	The position of an object has to be updated with move() whenever it changes.
+	Query results are sorted in the order in which the objects were added, so they don't
+	depend on memory addresses and are the same on all clients of a multiplayer game.
+	"""
+
+	CELL_SIZE = 8
+
+	def __init__(self, cell_size=CELL_SIZE):
+		"""
+		@param cell_size: width and height of the buckets
+		"""
+		self._cell_size = cell_size
+		self._cells = {} # { (cell x, cell y) : { object : (x, y, order) } }
+		self._entries = {} # { object : (cell, (x, y, order)) }
+		self._counter = 0 # source of the order values
+
+	def __len__(self):
+		return len(self._entries)
+
+	def __contains__(self, obj):
+		return obj in self._entries
+
+	def add(self, obj, position):
+		"""
+		@param obj: object to index, must be hashable
+		@param position: Point
+		"""
+		assert obj not in self._entries
+		self._counter += 1
+		self._insert(obj, position.x, position.y, self._counter)
+
+	def remove(self, obj):
+		cell, data = self._entries.pop(obj)
+		bucket = self._cells[cell]
+		del bucket[obj]
+		if not bucket:
+			del self._cells[cell]
+
+	def move(self, obj, position):
+		"""Updates the position of an object that has been added before.
+		@param position: Point, the new position"""
+		cell, data = self._entries[obj]
+		if position.x == data[0] and position.y == data[1]:
+			return
+		new_cell = (position.x // self._cell_size, position.y // self._cell_size)
+		if new_cell == cell:
+			data = (position.x, position.y, data[2])
+			self._cells[cell][obj] = data
+			self._entries[obj] = (cell, data)
+		else:
+			self.remove(obj)
+			self._insert(obj, position.x, position.y, data[2])
+
+	def _insert(self, obj, x, y, order):
+		cell = (x // self._cell_size, y // self._cell_size)
+		data = (x, y, order)
+		self._entries[obj] = (cell, data)
+		bucket = self._cells.get(cell)
+		if bucket is None:
+			bucket = self._cells[cell] = {}
+		bucket[obj] = data
+
+	def get_in_radius(self, center, radius):
+		"""Returns the objects in the radius, which would also be found by Circle.contains.
+		@param center: Point
+		@param radius: int or float
+		@return: list of objects in the order in which they were added"""
+		cx, cy = center.x, center.y
+		cell_size = self._cell_size
+		first_x = int(math.floor((cx - radius) / float(cell_size)))
+		last_x = int(math.floor((cx + radius) / float(cell_size)))
+		first_y = int(math.floor((cy - radius) / float(cell_size)))
+		last_y = int(math.floor((cy + radius) / float(cell_size)))
+
+		found = []
+		cells = self._cells
+		if (last_x - first_x + 1) * (last_y - first_y + 1) > len(cells):
+			# big radius, checking the used cells is faster
+			buckets = [ bucket for cell, bucket in cells.iteritems() if \
+			            first_x <= cell[0] <= last_x and first_y <= cell[1] <= last_y ]
+		else:
+			buckets = [ cells[(x, y)] for x in xrange(first_x, last_x + 1) \
+			            for y in xrange(first_y, last_y + 1) if (x, y) in cells ]
+		for bucket in buckets:
+			for obj, (x, y, order) in bucket.iteritems():
+				# same formula as Circle.contains
+				if ((x - cx) ** 2 + (y - cy) ** 2) ** 0.5 <= radius:
+					found.append( (order, obj) )
+		found.sort()
+		return [ obj for order, obj in found ]
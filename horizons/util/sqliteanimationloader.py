@@ -25,13 +25,34 @@ import horizons.main
 
 from horizons.util import ActionSetLoader
 
-class SQLiteAnimationLoader(object):
-	"""Loads animations from a SQLite database.
-	"""
+class CachingAnimationLoader(object):
+	"""Base class for animation loaders that only create each animation once.
+	Animations are memoized by their location string, which describes them completely.
+	The numbers of hits and misses of the cache are counted."""
 	def __init__(self):
-		pass
+		self._animations = {} # location : animation
+		self.hits = 0
+		self.misses = 0
 
 	def loadResource(self, location):
+		"""Returns the animation of a location, see _load_animation for the format"""
+		try:
+			animation = self._animations[location]
+		except KeyError:
+			self.misses += 1
+			animation = self._animations[location] = self._load_animation(location)
+		else:
+			self.hits += 1
+		return animation
+
+	def _load_animation(self, location):
+		raise NotImplementedError
+
+
+class SQLiteAnimationLoader(CachingAnimationLoader):
+	"""Loads animations from a SQLite database.
+	"""
+	def _load_animation(self, location):
 		"""
 		@param location: String with the location. See below for details:
 		Location format: <animation_id>:<command>:<params> (e.g.: "123:shift:left-16, bottom-8)
@@ -51,8 +72,9 @@ class SQLiteAnimationLoader(object):
 		ani = fife.Animation.createAnimation()
 
 		frame_start, frame_end = 0.0, 0.0
-		for file in sorted(ActionSetLoader.get_action_sets()[actionset][action][int(rotation)].iterkeys()):
-			frame_end = ActionSetLoader.get_action_sets()[actionset][action][int(rotation)][file]
+		frames = ActionSetLoader.get_action_sets()[actionset][action][int(rotation)]
+		for file in sorted(frames.iterkeys()):
+			frame_end = frames[file]
 			img = horizons.main.fife.imagemanager.load(file)
 			for command, arg in commands:
 				if command == 'shift':
@@ -19,17 +19,32 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from collections import OrderedDict
+
 from fife import fife
 
 import horizons.main
 
+from horizons.constants import VIEW
 from horizons.util import ActionSetLoader
+from horizons.util.sqliteanimationloader import CachingAnimationLoader
 
-class SQLiteAtlasLoader(object):
+class SQLiteAtlasLoader(CachingAnimationLoader):
 	"""Loads atlases and appropriate action sets from a JSON file and a SQLite database.
+
+	Atlas pages are only loaded when an image on them is requested first. If memory_budget
+	is set, the pages that have been used least recently are freed as soon as the loaded
+	pages need more memory than that, together with the images that have been cut out of
+	them. A page is used when an animation with images on it is requested, also if the
+	animation is memoized, and when an image on it is requested. FIFE loads freed pages
+	again when they are drawn, such pages are counted as used most recently as soon as
+	pages are checked the next time.
 	"""
-	def __init__(self):
-		self.atlaslib = []
+	def __init__(self, memory_budget=VIEW.ATLAS_MEMORY_BUDGET):
+		"""
+		@param memory_budget: bytes of decoded atlas pages that are kept loaded, None for no limit
+		"""
+		super(SQLiteAtlasLoader, self).__init__()
 
 		# TODO: There's something wrong with ground entities if atlas.sql
 		# is loaded only here, for now it's added to DB_FILES (empty file if no atlases are used)
@@ -38,15 +53,80 @@ class SQLiteAtlasLoader(object):
 		#sql = "BEGIN TRANSACTION;" + f.read() + "COMMIT;"
 		#horizons.main.db.execute_script(sql)
 
-		self.atlases = horizons.main.db("SELECT atlas_path FROM atlas ORDER BY atlas_id ASC")
-
-		for (atlas,) in self.atlases:
-			# print 'creating', atlas
-			img = horizons.main.fife.imagemanager.create(atlas)
-			self.atlaslib.append(img)
-
+		self.atlases = [ atlas for (atlas,) in horizons.main.db("SELECT atlas_path FROM atlas ORDER BY atlas_id ASC") ]
+		self.memory_budget = memory_budget
+		self._pages = OrderedDict() # atlas_id : (image, bytes) of loaded pages, least recently used first
+		self._page_images = {} # atlas_id : image of every page that has been loaded once
+		self._sub_images = {} # atlas_id : list of images that use the page
+		self._animation_pages = {} # location : set of atlas_ids of the images of the animation
+		self.evicted_bytes = 0
 
 	def loadResource(self, location):
+		animation = super(SQLiteAtlasLoader, self).loadResource(location)
+		for atlas_id in self._animation_pages.get(location, ()):
+			self._use_page(atlas_id)
+		self._evict()
+		return animation
+
+	def get_atlas(self, atlas_id):
+		"""Returns the image of an atlas page and loads it if necessary"""
+		img = self._use_page(atlas_id)
+		self._evict()
+		return img
+
+	def _use_page(self, atlas_id):
+		"""Marks a page as used most recently and loads it if necessary.
+		@return: image of the page"""
+		page = self._pages.pop(atlas_id, None)
+		if page is None:
+			img = self._page_images.get(atlas_id)
+			if img is None:
+				imagemanager = horizons.main.fife.imagemanager
+				path = self.atlases[atlas_id]
+				img = imagemanager.get(path) if imagemanager.exists(path) else imagemanager.load(path)
+				self._page_images[atlas_id] = img
+			if not self._is_loaded(img):
+				img.load()
+			page = (img, img.getSize())
+		self._pages[atlas_id] = page # most recently used now
+		return page[0]
+
+	def get_image(self, file, atlas_id, region):
+		"""Returns the image of a file that is stored on an atlas page.
+		@param region: fife.Rect of the image on the page"""
+		imagemanager = horizons.main.fife.imagemanager
+		if imagemanager.exists(file):
+			img = imagemanager.get(file)
+			self.get_atlas(atlas_id)
+			return img
+		img = imagemanager.create(file)
+		img.useSharedImage(self.get_atlas(atlas_id), region)
+		self._sub_images.setdefault(atlas_id, []).append(img)
+		return img
+
+	def _is_loaded(self, img):
+		return img.getState() == fife.IResource.RES_LOADED
+
+	def _evict(self):
+		"""Frees the least recently used pages until the memory budget is kept.
+		The most recently used page is never freed."""
+		if self.memory_budget is None:
+			return
+		# pages that FIFE has loaded again to draw them
+		for atlas_id, img in self._page_images.iteritems():
+			if atlas_id not in self._pages and self._is_loaded(img):
+				self._pages[atlas_id] = (img, img.getSize())
+		used = sum(size for img, size in self._pages.itervalues())
+		while used > self.memory_budget and len(self._pages) > 1:
+			atlas_id, (img, size) = self._pages.popitem(last=False)
+			# the images stay registered, FIFE loads them and the page again when drawing them
+			for sub_img in self._sub_images.get(atlas_id, []):
+				sub_img.free()
+			img.free()
+			used -= size
+			self.evicted_bytes += size
+
+	def _load_animation(self, location):
 		"""
 		@param location: String with the location. See below for details:
 		Location format: <animation_id>:<command>:<params> (e.g.: "123:shift:left-16, bottom-8)
@@ -66,18 +146,15 @@ class SQLiteAtlasLoader(object):
 		ani = fife.Animation.createAnimation()
 
 		frame_start, frame_end = 0.0, 0.0
-		for file in sorted(ActionSetLoader.get_action_sets()[actionset][action][int(rotation)].iterkeys()):
-			entry = ActionSetLoader.get_action_sets()[actionset][action][int(rotation)][file]
+		frames = ActionSetLoader.get_action_sets()[actionset][action][int(rotation)]
+		pages = self._animation_pages[location] = set()
+		for file in sorted(frames.iterkeys()):
+			entry = frames[file]
+			pages.add(entry[1])
 			# we don't need to load images at this point to query for its parameters
 			# such as width and height because we can get those from json file
 			xpos, ypos, width, height = entry[2:]
-
-			if horizons.main.fife.imagemanager.exists(file):
-				img = horizons.main.fife.imagemanager.get(file)
-			else:
-				img = horizons.main.fife.imagemanager.create(file)
-				region = fife.Rect(xpos, ypos, width, height)
-				img.useSharedImage(self.atlaslib[entry[1]], region)
+			img = self.get_image(file, entry[1], fife.Rect(xpos, ypos, width, height))
 
 			for command, arg in commands:
 				if command == 'shift':
@@ -0,0 +1,167 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import csv
+import heapq
+import json
+import random
+import time
+
+from horizons.util.python.callback import Callback
+from horizons.util.python.weakmethod import WeakMethod
+
+
+class TickProfiler(object):
+	"""Collects timing data about the calls executed by the Scheduler.
+
+	Wall time, call counts and duration percentiles are aggregated per
+	(class of the class_instance, callback name), and per tick. The percentiles
+	are computed from a bounded random sample of the durations, so memory usage
+	doesn't grow with the length of the game.
+
+	Enable it via Scheduler().enable_profiling() or the --profile-ticks command line option.
+	NOTE: the profiler uses its own RNG, it must never touch the session RNG (mp sync).
+	"""
+
+	SAMPLE_SIZE = 2000 # max number of durations kept per key for the percentiles
+	SLOWEST_TICKS = 20 # number of slowest ticks that are remembered
+
+	def __init__(self):
+		self._random = random.Random(0)
+		self.stats = {} # { (class name, callback name) : _CallStats }
+		self.tick_stats = _CallStats() # one "call" per tick
+		self.slowest_ticks = [] # min-heap of (duration, tick, number of calls)
+		self._tick_start = None
+		self._tick_calls = 0
+
+	def start_tick(self, tick):
+		self._tick_start = time.time()
+		self._tick_calls = 0
+
+	def end_tick(self, tick):
+		duration = time.time() - self._tick_start
+		self.tick_stats.add(duration, self._random)
+		entry = (duration, tick, self._tick_calls)
+		if len(self.slowest_ticks) < self.SLOWEST_TICKS:
+			heapq.heappush(self.slowest_ticks, entry)
+		elif entry > self.slowest_ticks[0]:
+			heapq.heapreplace(self.slowest_ticks, entry)
+
+	def call(self, callback_obj):
+		"""Executes the callback of callback_obj and records its duration."""
+		start = time.time()
+		callback_obj.callback()
+		duration = time.time() - start
+
+		key = (self.get_class_name(callback_obj.class_instance), self.get_callback_name(callback_obj.callback))
+		if key not in self.stats:
+			self.stats[key] = _CallStats()
+		self.stats[key].add(duration, self._random)
+		self._tick_calls += 1
+
+	@classmethod
+	def get_class_name(cls, class_instance):
+		if isinstance(class_instance, type): # calls can be registered for classes too
+			return class_instance.__name__
+		return class_instance.__class__.__name__
+
+	@classmethod
+	def get_callback_name(cls, callback):
+		"""Returns a readable name of a callable, unwrapping Callback and WeakMethod objects."""
+		while isinstance(callback, (Callback, WeakMethod)):
+			callback = callback.callback if isinstance(callback, Callback) else callback.function
+		return getattr(callback, '__name__', callback.__class__.__name__)
+
+	def get_stats(self):
+		"""Returns the aggregated data of all callbacks, most expensive first.
+		@return: list of dicts with the keys of _CallStats.to_dict plus 'class' and 'callback'"""
+		result = []
+		for (class_name, callback_name), stats in self.stats.iteritems():
+			data = stats.to_dict()
+			data['class'] = class_name
+			data['callback'] = callback_name
+			result.append(data)
+		result.sort(key=lambda data: data['total_time'], reverse=True)
+		return result
+
+	def get_tick_stats(self):
+		"""Returns the aggregated data of the ticks and the slowest ticks."""
+		data = self.tick_stats.to_dict()
+		data['slowest'] = [ {'tick': tick, 'time': duration, 'calls': calls} for \
+		                    (duration, tick, calls) in sorted(self.slowest_ticks, reverse=True) ]
+		return data
+
+	CSV_FIELDS = ('class', 'callback', 'calls', 'total_time', 'mean', 'p50', 'p99', 'max')
+
+	def dump(self, basename):
+		"""Writes the data to basename.csv (callbacks only) and basename.json."""
+		self.dump_csv(basename + '.csv')
+		self.dump_json(basename + '.json')
+
+	def dump_csv(self, filename):
+		f = open(filename, 'wb')
+		try:
+			writer = csv.DictWriter(f, self.CSV_FIELDS, extrasaction='ignore')
+			writer.writerow(dict( (field, field) for field in self.CSV_FIELDS ))
+			writer.writerows(self.get_stats())
+		finally:
+			f.close()
+
+	def dump_json(self, filename):
+		f = open(filename, 'w')
+		try:
+			json.dump({'callbacks': self.get_stats(), 'ticks': self.get_tick_stats()}, f, indent=1)
+		finally:
+			f.close()
+
+
+class _CallStats(object):
+	"""Aggregated durations of one kind of call."""
+	__slots__ = ('calls', 'total_time', 'max', 'sample')
+
+	def __init__(self):
+		self.calls = 0
+		self.total_time = 0.0
+		self.max = 0.0
+		self.sample = []
+
+	def add(self, duration, rng):
+		self.calls += 1
+		self.total_time += duration
+		if duration > self.max:
+			self.max = duration
+		# reservoir sampling: every duration is in the sample with the same probability
+		if len(self.sample) < TickProfiler.SAMPLE_SIZE:
+			self.sample.append(duration)
+		else:
+			index = rng.randint(0, self.calls - 1)
+			if index < TickProfiler.SAMPLE_SIZE:
+				self.sample[index] = duration
+
+	def to_dict(self):
+		ordered = sorted(self.sample)
+		def percentile(percent):
+			if not ordered:
+				return 0.0
+			return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100.0))]
+		return {'calls': self.calls, 'total_time': self.total_time,
+		        'mean': self.total_time / self.calls if self.calls else 0.0,
+		        'p50': percentile(50), 'p99': percentile(99), 'max': self.max}
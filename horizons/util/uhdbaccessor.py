@@ -39,6 +39,8 @@ class UhDbAccessor(DbReader):
 
 	def __init__(self, dbfile):
 		super(UhDbAccessor, self).__init__(dbfile=dbfile)
+		# checksum of the game data in the db, set if it has been created from the content files
+		self.game_data_checksum = None
 
 
 	# ------------------------------------------------------------------
@@ -41,9 +41,11 @@ from horizons.ai.trader import Trader
 from horizons.ai.pirate import Pirate
 from horizons.ai.aiplayer import AIPlayer
 from horizons.entities import Entities
-from horizons.util import decorators, BuildingIndexer
+from horizons.util import decorators, BuildingIndexer, SpatialIndex, IncrementalHash
 from horizons.world.buildingowner import BuildingOwner
 from horizons.world.diplomacy import Diplomacy
+from horizons.world.tilemap import TileMap
+from horizons.world.pathfinding.pathnodes import PathGrid, ClusterGraph
 from horizons.world.units.bullet import Bullet
 from horizons.world.units.weapon import Weapon
 from horizons.command.building import Build
@@ -55,16 +57,19 @@ class World(BuildingOwner, LivingObject, WorldObject):
 	   * players - a list of all the session's players - Player instances
 	   * islands - a list of all the map's islands - Island instances
 	   * grounds - a list of all the map's groundtiles
-	   * ground_map - a dictionary that binds tuples of coordinates with a reference to the tile:
+	   * ground_map - a TileMap of the water tiles, it can be used like a dictionary:
 	                  { (x, y): tileref, ...}
 	                 This is important for pathfinding and quick tile fetching.z
-	   * full_map - a dictionary that binds tuples of coordinates with a reference to the tile (includes water and ground)
-	   * island_map - a dictionary that binds tuples of coordinates with a reference to the island
+	   * full_map - a TileMap of all tiles (includes water and ground), it also knows the island of each tile
 	   * ships - a list of all the ships ingame - horizons.world.units.ship.Ship instances
 	   * ship_map - same as ground_map, but for ships
 	   * fish_indexer - a BuildingIndexer for all fish on the map
+	   * ship_index, ground_unit_index, building_index - SpatialIndex for range queries
+	   * checkup_hash - IncrementalHash of the state that is compared in multiplayer games
 	   * session - reference to horizons.session.Session instance of the current game
 	   * water - Dictionary of coordinates that are water
+	   * water_grid - PathGrid of water, used for ship pathfinding
+	   * water_clusters - ClusterGraph of water_grid for long ship paths
 	   * water_body - Dictionary of water bodies {coords: area_number, ...}
 	   * sea_number - The water_body number of the sea
 	   * trader - The world's ingame free trader player instance
@@ -87,10 +92,17 @@ class World(BuildingOwner, LivingObject, WorldObject):
 		self.player = None
 		self.ground_map = None
 		self.full_map = None
-		self.island_map = None
 		self.water = None
+		self.water_grid = None
+		self.water_and_coastline_grid = None
+		self.water_clusters = None
+		self.water_and_coastline_clusters = None
 		self.ships = None
 		self.ship_map = None
+		self.ship_index = None
+		self.ground_unit_index = None
+		self.building_index = None
+		self.checkup_hash = None
 		self.fish_indexer = None
 		self.ground_units = None
 		self.trader = None
@@ -159,6 +171,14 @@ class World(BuildingOwner, LivingObject, WorldObject):
 			self.log.warning('WARNING: Cannot autoselect a player because there are no \
 			or multiple candidates.')
 
+		# spatial indices for range queries, buildings are added by the islands
+		self.ship_index = SpatialIndex()
+		self.ground_unit_index = SpatialIndex()
+		self.building_index = SpatialIndex()
+
+		# ships and settlements register here, see get_checkup_hash
+		self.checkup_hash = IncrementalHash()
+
 		# load islands
 		self.islands = []
 		for (islandid,) in savegame_db("SELECT rowid + 1000 FROM island"):
@@ -181,7 +201,9 @@ class World(BuildingOwner, LivingObject, WorldObject):
 
 		#add water
 		self.log.debug("Filling world with water...")
-		self.ground_map = {}
+		width, height = self.max_x - self.min_x, self.max_y - self.min_y
+		self.ground_map = TileMap(self.min_x, self.min_y, width, height)
+		self.full_map = TileMap(self.min_x, self.min_y, width, height)
 		default_grounds = Entities.grounds[int(self.properties.get('default_ground', GROUND.WATER))]
 
 		# extra world size that is added so that he player can't see the "black void"
@@ -193,17 +215,15 @@ class World(BuildingOwner, LivingObject, WorldObject):
 					if x+x_offset < self.max_x and x+x_offset>= self.min_x:
 						for y_offset in xrange(0,10):
 							if y+y_offset < self.max_y and y+y_offset >= self.min_y:
-								self.ground_map[(x+x_offset, y+y_offset)] = ground
+								self.ground_map.set_tile(x+x_offset, y+y_offset, ground)
+								self.full_map.set_tile(x+x_offset, y+y_offset, ground)
 
-		# remove parts that are occupied by islands, create the island map and the full map
-		self.island_map = {}
-		self.full_map = copy.copy(self.ground_map)
+		# remove parts that are occupied by islands and add the island tiles to the full map
 		for island in self.islands:
-			for coords in island.ground_map:
-				if coords in self.ground_map:
-					self.full_map[coords] = island.ground_map[coords]
-					del self.ground_map[coords]
-					self.island_map[coords] = island
+			for (x, y), tile in island.ground_map.iteritems():
+				if (x, y) in self.ground_map:
+					self.full_map.set_tile(x, y, tile, island)
+					self.ground_map.set_tile(x, y, None)
 
 		# load world buildings (e.g. fish)
 		for (building_worldid, building_typeid) in \
@@ -225,6 +245,12 @@ class World(BuildingOwner, LivingObject, WorldObject):
 				if 'coastline' in tile.classes or 'constructible' not in tile.classes:
 					self.water_and_coastline[coord] = 1.0
 
+		# dense versions of the above for the ship pathfinding, the water doesn't change
+		self.water_grid = PathGrid(self.water)
+		self.water_and_coastline_grid = PathGrid(self.water_and_coastline)
+		self.water_clusters = ClusterGraph(self.water_grid)
+		self.water_and_coastline_clusters = ClusterGraph(self.water_and_coastline_grid)
+
 		# create ship position list. entries: ship_map[(x, y)] = ship
 		self.ship_map = {}
 		self.ground_unit_map = {}
@@ -660,17 +686,29 @@ class World(BuildingOwner, LivingObject, WorldObject):
 		@param point: coords as Point
 		@return: instance of Ground at x, y
 		"""
-		return self.full_map[(point.x, point.y)]
+		# the lookups of the TileMap are inlined in the getters, they are called very often
+		left, top, width, height, tiles, island_ids, islands = self.full_map.lookup_fields
+		x = point.x - left
+		y = point.y - top
+		if 0 <= x < width and 0 <= y < height:
+			tile = tiles[x * height + y]
+			if tile is not None:
+				return tile
+		raise KeyError((point.x, point.y))
 
 	def get_settlement(self, point):
 		"""Returns settlement on point. Very fast (O(1)).
 		Returns None if point isn't on world.
 		@param point: instance of Point
 		@return: instance of Settlement or None"""
-		try:
-			return self.get_tile(point).settlement
-		except KeyError:
-			return None
+		left, top, width, height, tiles, island_ids, islands = self.full_map.lookup_fields
+		x = point.x - left
+		y = point.y - top
+		if 0 <= x < width and 0 <= y < height:
+			tile = tiles[x * height + y]
+			if tile is not None:
+				return tile.settlement
+		return None
 
 	@property
 	def settlements(self):
@@ -690,10 +728,14 @@ class World(BuildingOwner, LivingObject, WorldObject):
 	def get_island(self, point):
 		"""Returns the island for that coordinate, if none is found, returns None.
 		@param point: instance of Point"""
-		tup = point.to_tuple()
-		if tup not in self.island_map:
-			return None
-		return self.island_map[tup]
+		left, top, width, height, tiles, island_ids, islands = self.full_map.lookup_fields
+		x = point.x - left
+		y = point.y - top
+		if 0 <= x < width and 0 <= y < height:
+			island_id = island_ids[x * height + y]
+			if island_id:
+				return islands[island_id - 1]
+		return None
 
 	def get_islands_in_radius(self, point, radius):
 		"""Returns all islands in a certain radius around a point.
@@ -735,17 +777,12 @@ class World(BuildingOwner, LivingObject, WorldObject):
 	def get_ships(self, position=None, radius=None):
 		"""Returns all ships on the map. Optionally only those in range
 		around the specified position.
-		@param position: Point or Rect instance.
+		@param position: Point instance.
 		@param radius: int radius to use.
 		@return: List of ships.
 		"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			ships = []
-			for ship in self.ships:
-				if circle.contains(ship.position):
-					ships.append(ship)
-			return ships
+			return self.ship_index.get_in_radius(position, radius)
 		else:
 			return self.ships
 
@@ -753,29 +790,21 @@ class World(BuildingOwner, LivingObject, WorldObject):
 	def get_ground_units(self, position=None, radius=None):
 		"""@see get_ships"""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			units = []
-			for unit in self.ground_units:
-				if circle.contains(unit.position):
-					units.append(unit)
-			return units
+			return self.ground_unit_index.get_in_radius(position, radius)
 		else:
 			return self.ground_units
 
 	@decorators.make_constants()
 	def get_buildings(self, position=None, radius=None):
-		"""@see get_ships"""
-		buildings = []
+		"""@see get_ships
+		Buildings are in range if their center is. Buildings in range are returned in the
+		order in which they were built."""
 		if position is not None and radius is not None:
-			circle = Circle(position, radius)
-			for island in self.islands:
-				for building in island.buildings:
-					if circle.contains(building.position.center()):
-						buildings.append(building)
-		else:
-			for island in self.islands:
-				for building in island.buildings:
-					buildings.append(building)
+			return self.building_index.get_in_radius(position, radius)
+		buildings = []
+		for island in self.islands:
+			for building in island.buildings:
+				buildings.append(building)
 		return buildings
 
 	@decorators.make_constants()
@@ -812,29 +841,28 @@ class World(BuildingOwner, LivingObject, WorldObject):
 		Weapon.save_attacks(db)
 
 	def get_checkup_hash(self):
-		dict = {
-			'rngvalue': self.session.random.random(),
-			'settlements': [],
-			'ships': [],
-		}
-		for island in self.islands:
-			for settlement in island.settlements:
-				entry = {
-					'owner': str(settlement.owner.worldid),
-					'tax_settings': str(settlement.tax_settings),
-					'inhabitants': str(settlement.inhabitants),
-					'cumulative_running_costs': str(settlement.cumulative_running_costs),
-					'cumulative_taxes': str(settlement.cumulative_taxes),
-					'inventory': str(settlement.inventory._storage),
-				}
-				dict['settlements'].append(entry)
-		for ship in self.ships:
-			entry = {
-				'owner': str(ship.owner.worldid),
-				'position': ship.position.to_tuple(),
-			}
-			dict['ships'].append(entry)
-		return dict
+		"""Returns a digest of the game state, that is compared between the clients of a
+		multiplayer game. Ship positions and settlement inventories are tracked by change
+		listeners, so only values that have changed since the last call are hashed again.
+		@return: hex string of fixed length"""
+		checkup_hash = self.checkup_hash
+		checkup_hash.update('rngvalue', self.session.random.random())
+		# these values depend on all buildings of the settlement, so they aren't tracked
+		for settlement in self.settlements:
+			checkup_hash.update(('settlement', settlement.worldid), (
+				settlement.owner.worldid,
+				tuple(sorted(settlement.tax_settings.iteritems())),
+				settlement.inhabitants,
+				settlement.cumulative_running_costs,
+				settlement.cumulative_taxes,
+			))
+		return checkup_hash.get_digest()
+
+	def get_checkup_hash_details(self):
+		"""Returns the values that the last checkup hash has been calculated from.
+		Used to find the differences when the hashes of the clients don't match.
+		@return: dict { key : value }"""
+		return self.checkup_hash.get_values()
 
 	def notify_new_settlement(self):
 		"""Called when a new settlement is created"""
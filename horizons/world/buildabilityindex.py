@@ -0,0 +1,197 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from array import array
+
+from horizons.util import Point
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+
+class BuildabilityIndex(object):
+	"""
+	Knows for every tile of an island what could prevent building on it and answers whether
+	a rectangle is free of such reasons.
+
+	The reasons are stored as bit flags per tile. For the flags of the ground, which never
+	change, a summed-area table (the number of flagged tiles in the rectangle from the top
+	left corner to each tile) is built when it is needed, so the number of flagged tiles in
+	any rectangle can be computed from 4 values of the table. If NumPy is available, the
+	tables are computed with it.
+
+	The building flags change with every building that is added or removed, so rebuilding
+	their tables would cost more than it saves. Queries of them count the flags of the tiles
+	in the rectangle, which are only a few for buildings.
+
+	The flags of a tile have to be updated with update() when a building is added or removed.
+	All queries also accept a combination of flags, then the tiles with any of them are counted.
+	"""
+
+	LAND = 1 # the tile belongs to the island
+	CONSTRUCTIBLE = 2 # the ground of the tile can be built on
+	COASTLINE = 4 # the tile is coastline
+	OCCUPIED = 8 # there is a building on the tile
+	BLOCKED = 16 # there is a building that can't be built over on the tile
+
+	BUILDING_FLAGS = OCCUPIED | BLOCKED
+
+	def __init__(self, position, ground_map, use_numpy=None):
+		"""
+		@param position: Rect that contains all tiles of the island
+		@param ground_map: the ground map of the island, { (x, y): tile }
+		@param use_numpy: whether to use NumPy, the default is to use it if it is available
+		"""
+		self.left = position.left
+		self.top = position.top
+		self.width = position.right - position.left + 1
+		self.height = position.bottom - position.top + 1
+		self._ground_map = ground_map
+		self._use_numpy = numpy is not None if use_numpy is None else use_numpy
+		self._flags = array('B', [0]) * (self.width * self.height) # index (y - top) * width + (x - left)
+		self._tables = {} # { flag: summed-area table as list }, only for ground flags
+
+		for (x, y), tile in ground_map.iteritems():
+			flags = self.LAND
+			if 'constructible' in tile.classes:
+				flags |= self.CONSTRUCTIBLE
+			if 'coastline' in tile.classes:
+				flags |= self.COASTLINE
+			self._flags[(y - self.top) * self.width + x - self.left] = flags | self._get_building_flags(tile)
+
+	def _get_building_flags(self, tile):
+		if tile.object is None:
+			return 0
+		if tile.object.buildable_upon:
+			return self.OCCUPIED
+		return self.OCCUPIED | self.BLOCKED
+
+	def update(self, position):
+		"""Updates the flags of the tiles after a building has been added or removed there.
+		@param position: Rect or Point of the tiles"""
+		for coords in position.tuple_iter():
+			tile = self._ground_map.get(coords)
+			if tile is not None:
+				index = (coords[1] - self.top) * self.width + coords[0] - self.left
+				self._flags[index] = (self._flags[index] & ~self.BUILDING_FLAGS) | \
+				                     self._get_building_flags(tile)
+
+	def count(self, flag, position):
+		"""Returns the number of tiles with flag in position.
+		@param position: Rect or Point"""
+		if isinstance(position, Point):
+			left = right = position.x
+			top = bottom = position.y
+		else:
+			left, top, right, bottom = position.left, position.top, position.right, position.bottom
+		# clip to the area of the island, there are no flags outside of it
+		x1 = max(left - self.left, 0)
+		y1 = max(top - self.top, 0)
+		x2 = min(right - self.left + 1, self.width)
+		y2 = min(bottom - self.top + 1, self.height)
+		if x1 >= x2 or y1 >= y2:
+			return 0
+		if flag & self.BUILDING_FLAGS:
+			flags = self._flags
+			count = 0
+			for y in xrange(y1, y2):
+				row = y * self.width
+				for index in xrange(row + x1, row + x2):
+					if flags[index] & flag:
+						count += 1
+			return count
+		table = self._get_table(flag)
+		stride = self.width + 1
+		return table[y2 * stride + x2] - table[y1 * stride + x2] - table[y2 * stride + x1] + table[y1 * stride + x1]
+
+	def all_set(self, flag, position):
+		"""Returns whether all tiles in position have flag.
+		@param position: Rect or Point"""
+		if isinstance(position, Point):
+			area = 1
+		else:
+			area = (position.right - position.left + 1) * (position.bottom - position.top + 1)
+		return self.count(flag, position) == area
+
+	def any_set(self, flag, position):
+		"""Returns whether any tile in position has flag.
+		@param position: Rect or Point"""
+		return self.count(flag, position) > 0
+
+	def get_origins(self, flag, width, height):
+		"""Returns the top left corners of all rectangles of the size whose tiles all have flag.
+		@return: list of (x, y) tuples"""
+		if width > self.width or height > self.height:
+			return []
+		if self._use_numpy:
+			table = numpy.array(self._get_table(flag)).reshape(self.height + 1, self.width + 1)
+			counts = table[height:, width:] - table[:-height, width:] - table[height:, :-width] + table[:-height, :-width]
+			ys, xs = numpy.nonzero(counts == width * height)
+			return zip((xs + self.left).tolist(), (ys + self.top).tolist())
+
+		table = self._get_table(flag)
+		stride = self.width + 1
+		area = width * height
+		origins = []
+		for y in xrange(self.height - height + 1):
+			top_row = y * stride
+			bottom_row = (y + height) * stride
+			for x in xrange(self.width - width + 1):
+				if table[bottom_row + x + width] - table[top_row + x + width] - table[bottom_row + x] + \
+				   table[top_row + x] == area:
+					origins.append((x + self.left, y + self.top))
+		return origins
+
+	def _get_table(self, flag):
+		"""Returns the summed-area table of flag. Entry (y * (width + 1) + x) is the number of
+		tiles with flag whose coordinates relative to the top left corner are < x and < y.
+		Tables of building flags are built again on every call."""
+		if flag & self.BUILDING_FLAGS:
+			return self._build_table(flag)
+		table = self._tables.get(flag)
+		if table is None:
+			table = self._build_table(flag)
+			self._tables[flag] = table
+		return table
+
+	def _build_table(self, flag):
+		width, height = self.width, self.height
+		if self._use_numpy:
+			flags = numpy.frombuffer(self._flags, dtype=numpy.uint8).reshape(height, width)
+			table = numpy.zeros((height + 1, width + 1), dtype=int)
+			table[1:, 1:] = ((flags & flag) != 0).cumsum(axis=0).cumsum(axis=1)
+			return table.ravel().tolist()
+
+		flags = self._flags
+		stride = width + 1
+		table = [0] * (stride * (height + 1))
+		for y in xrange(height):
+			row_count = 0
+			row = y * width
+			above = y * stride + 1
+			current = above + stride
+			for x in xrange(width):
+				if flags[row + x] & flag:
+					row_count += 1
+				table[current + x] = table[above + x] + row_count
+		return table
@@ -44,8 +44,11 @@ class BuildingClass(type):
 	"""
 	log = logging.getLogger('world.building')
 
-	def __new__(self, db, id):
-		class_package, class_name = db.get_building_class_data(id)
+	def __new__(self, db, id, data=None):
+		if data is None:
+			class_package, class_name = db.get_building_class_data(id)
+		else:
+			class_package, class_name = data['class_package'], data['class_name']
 		__import__('horizons.world.building.'+class_package)
 
 		@classmethod
@@ -59,45 +62,38 @@ class BuildingClass(type):
 			(getattr(globals()[class_package], class_name),),
 			{'load': load})
 
-	def __init__(self, db, id):
+	def __init__(self, db, id, data=None):
 		"""
 		Final loading for the building class. Load a lot of attributes for the building classes
 		@param id: building id.
 		@param db: DbReader
+		@param data: return value of get_data, read from db if None
 		"""
 		super(BuildingClass, self).__init__(self)
+		if data is None:
+			data = BuildingClass.get_data(db, id)
 		self.id = id
 		self._object = None
 
-		self.class_package, size_x, size_y, name, self.radius, inhabitants, inhabitants_max = \
-		    db("SELECT class_package, size_x, size_y, name, radius, \
-		    inhabitants_start, inhabitants_max FROM building WHERE id = ?", id)[0]
-		self._name = name
-		self.size = (int(size_x), int(size_y))
-		self.inhabitants = int(inhabitants)
-		self.inhabitants_max = int(inhabitants_max)
+		self.class_package = data['class_package']
+		self._name = data['name']
+		self.radius = data['radius']
+		self.size = tuple(data['size'])
+		self.inhabitants = data['inhabitants']
+		self.inhabitants_max = data['inhabitants_max']
 		#for (name,  value) in db("SELECT name, value FROM building_property WHERE building = ?", str(id)):
 		#	setattr(self, name, value)
 		self.costs = {}
-		for (name, value) in db("SELECT resource, amount FROM building_costs WHERE building = ?", str(id)):
+		for (name, value) in data['costs']:
 			self.costs[name]=value
-		self._loadObject(db)
-		running_costs = db("SELECT cost_active, cost_inactive FROM building_running_costs WHERE building=?", self.id)
-		if len(running_costs) > 0:
-			self.running_costs = running_costs[0][0]
-			self.running_costs_inactive = running_costs[0][1]
-		else:
-			self.running_costs = 0
-			self.running_costs_inactive = 0
+		self._loadObject(data['action_sets'])
+		self.running_costs, self.running_costs_inactive = data['running_costs']
 		self.has_running_costs = (self.running_costs != 0)
-		soundfiles = db("SELECT file FROM sounds INNER JOIN object_sounds ON \
-			sounds.rowid = object_sounds.sound AND object_sounds.object = ?", self.id)
-		self.soundfiles = [ i[0] for i in soundfiles ]
+		self.soundfiles = data['soundfiles']
 
 		# for mines: on which deposit is it buildable
-		buildable_on_deposit_type = db("SELECT deposit FROM mine WHERE mine = ?", self.id)
-		if buildable_on_deposit_type:
-			self.buildable_on_deposit_type = buildable_on_deposit_type[0][0]
+		if data['buildable_on_deposit_type'] is not None:
+			self.buildable_on_deposit_type = data['buildable_on_deposit_type']
 
 		"""TUTORIAL: Now you know the basic attributes each building has. To check out further functions of single
 		             buildings you should check out the separate classes in horizons/world/buildings/*.
@@ -108,8 +104,33 @@ class BuildingClass(type):
 					 horizons/world/storageholder.py is the next place to go.
 					 """
 
-	def _loadObject(cls, db):
+	@staticmethod
+	def get_data(db, id):
+		"""Returns the data of a building class in the db. It only consists of builtin types.
+		@return: dict"""
+		data = {}
+		data['class_package'], data['class_name'] = db.get_building_class_data(id)
+		size_x, size_y, data['name'], data['radius'], inhabitants, inhabitants_max = \
+		    db("SELECT size_x, size_y, name, radius, \
+		    inhabitants_start, inhabitants_max FROM building WHERE id = ?", id)[0]
+		data['size'] = (int(size_x), int(size_y))
+		data['inhabitants'] = int(inhabitants)
+		data['inhabitants_max'] = int(inhabitants_max)
+		data['costs'] = db("SELECT resource, amount FROM building_costs WHERE building = ?", str(id)).rows
+		running_costs = db("SELECT cost_active, cost_inactive FROM building_running_costs WHERE building=?", id)
+		data['running_costs'] = running_costs[0] if len(running_costs) > 0 else (0, 0)
+		soundfiles = db("SELECT file FROM sounds INNER JOIN object_sounds ON \
+			sounds.rowid = object_sounds.sound AND object_sounds.object = ?", id)
+		data['soundfiles'] = [ i[0] for i in soundfiles ]
+		buildable_on_deposit_type = db("SELECT deposit FROM mine WHERE mine = ?", id)
+		data['buildable_on_deposit_type'] = buildable_on_deposit_type[0][0] if buildable_on_deposit_type else None
+		data['action_sets'] = [ action_set_id for (action_set_id,) in \
+		                        db("SELECT action_set_id FROM action_set WHERE object_id=?", id) ]
+		return data
+
+	def _loadObject(cls, action_sets):
 		"""Loads building from the db.
+		@param action_sets: ids of the action sets of the building
 		"""
 		cls.log.debug("Loading building %s", cls.id)
 		try:
@@ -118,9 +139,8 @@ class BuildingClass(type):
 			cls.log.debug("Already loaded building %s", cls.id)
 			cls._object = horizons.main.fife.engine.getModel().getObject(str(cls.id), 'building')
 			return
-		action_sets = db("SELECT action_set_id FROM action_set WHERE object_id=?",cls.id)
 		all_action_sets = ActionSetLoader.get_action_sets()
-		for (action_set_id,) in action_sets:
+		for action_set_id in action_sets:
 			for action_id in all_action_sets[action_set_id].iterkeys():
 				action = cls._object.createAction(action_id+"_"+str(action_set_id))
 				fife.ActionVisual.create(action)
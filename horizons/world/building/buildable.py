@@ -21,6 +21,7 @@
 
 from horizons.util import Point, Rect, decorators
 from horizons.world.pathfinding.pather import StaticPather
+from horizons.world.buildabilityindex import BuildabilityIndex
 from horizons.constants import BUILDINGS
 from horizons.entities import Entities
 
@@ -136,11 +137,8 @@ class Buildable(object):
 			island = session.world.get_island(position.center())
 			if island is None:
 				raise _NotBuildableError()
-		for tup in position.tuple_iter():
-			# can't use get_tile_tuples since it discards None's
-			tile = island.get_tile_tuple(tup)
-			if tile is None or 'constructible' not in tile.classes:
-				raise _NotBuildableError()
+		if not island.buildability_index.all_set(BuildabilityIndex.CONSTRUCTIBLE, position):
+			raise _NotBuildableError()
 
 	@classmethod
 	def _check_rotation(cls, session, position, rotation):
@@ -166,18 +164,18 @@ class Buildable(object):
 			island = session.world.get_island(position.center())
 			# _check_island already confirmed that there must be an island here, so no check for None again
 		tearset = set()
-		for tile in island.get_tiles_tuple( position.tuple_iter() ):
-			obj = tile.object
-			if obj is not None: # tile contains an object
-				if obj.buildable_upon:
+		if island.buildability_index.any_set(BuildabilityIndex.BLOCKED, position):
+			# building is blocking the build
+			raise _NotBuildableError()
+		if island.buildability_index.any_set(BuildabilityIndex.OCCUPIED, position):
+			for tile in island.get_tiles_tuple( position.tuple_iter() ):
+				obj = tile.object
+				if obj is not None: # tile contains an object that can be built upon
 					if obj.__class__ is cls:
 						# don't tear trees to build trees over them
 						raise _NotBuildableError()
 					# tear it so we can build over it
 					tearset.add(obj.worldid)
-				else:
-					# building is blocking the build
-					raise _NotBuildableError()
 		if hasattr(session.manager, 'get_builds_in_construction'):
 			builds_in_constructin = session.manager.get_builds_in_construction()
 			for build in builds_in_constructin:
@@ -287,17 +285,9 @@ class BuildableSingleOnCoast(BuildableSingle):
 			if island is None:
 				raise _NotBuildableError()
 
-		coastline_found = False
-		for tup in position.tuple_iter():
-			# can't use get_tile_tuples since it discards None's
-			tile = island.get_tile_tuple(tup)
-			if tile is None:
-				raise _NotBuildableError()
-			if 'coastline' in tile.classes:
-				coastline_found = True
-			elif 'constructible' not in tile.classes: # neither coastline, nor constructible
-				raise _NotBuildableError()
-		if not coastline_found:
+		index = island.buildability_index
+		if not index.all_set(BuildabilityIndex.COASTLINE | BuildabilityIndex.CONSTRUCTIBLE, position) or \
+		   not index.any_set(BuildabilityIndex.COASTLINE, position):
 			raise _NotBuildableError()
 
 	@classmethod
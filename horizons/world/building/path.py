@@ -24,6 +24,7 @@ from fife import fife
 from horizons.constants import LAYERS, BUILDINGS
 from horizons.world.building.building import BasicBuilding
 from horizons.world.building.buildable import BuildableLine, BuildableSingle
+from horizons.scenario import CHANGES
 
 class Path(BasicBuilding, BuildableLine):
 	walkable = True
@@ -41,11 +42,13 @@ class Path(BasicBuilding, BuildableLine):
 
 	def __init(self):
 		self.island.path_nodes.register_road(self)
+		self.session.scenario_eventhandler.notify_change(CHANGES.roads)
 		self.recalculate_orientation()
 
 	def remove(self):
 		super(Path, self).remove()
 		self.island.path_nodes.unregister_road(self)
+		self.session.scenario_eventhandler.notify_change(CHANGES.roads)
 		self.recalculate_surrounding_tile_orientation()
 
 	def recalculate_surrounding_tile_orientation(self):
@@ -32,7 +32,6 @@ from horizons.world.building.collectingproducerbuilding import CollectingProduce
 from horizons.world.production.production import SettlerProduction, SingleUseProduction
 from horizons.command.building import Build
 from horizons.util import decorators, Callback
-from horizons.world.pathfinding.pather import StaticPather
 from horizons.command.production import ToggleActive
 
 class SettlerRuin(BasicBuilding, BuildableSingle):
@@ -297,8 +296,8 @@ class Settler(SelectableBuilding, BuildableSingle, CollectingProducerBuilding, B
 		"""Notifies the user via a message in case there is no main square in range"""
 		for building in self.get_buildings_in_range():
 			if building.id == BUILDINGS.MAIN_SQUARE_CLASS:
-				if StaticPather.get_path_on_roads(self.island, self, building) is not None:
-					# a main square is in range
+				if self.island.path_nodes.road_components.are_connected(self, building):
+					# a main square is in range and connected by roads
 					return
 		# no main square found
 		self.session.ingame_gui.message_widget.add(self.position.origin.x, self.position.origin.y, \
@@ -68,21 +68,22 @@ class GroundClass(type):
 	"""
 	log = logging.getLogger('world')
 
-	def __init__(self, db, id):
+	def __init__(self, db, id, data=None):
 		"""
 		@param id: id in db for this specific ground class
 		@param db: DbReader instance to get data from
+		@param data: return value of get_data, read from db if None
 		"""
+		if data is None:
+			data = GroundClass.get_data(db, id)
 		self.id = id
 		self._object = None
 		self.velocity = {}
 		#for unit, straight, diagonal in db("SELECT unit, time_move_straight, time_move_diagonal FROM unit_velocity WHERE ground = ?", self.id):
-		self.classes = ['ground[' + str(id) + ']']
-		for (name,) in db("SELECT class FROM ground_class WHERE ground = ?", id):
-			self.classes.append(name)
-		self._loadObject(db)
+		self.classes = ['ground[' + str(id) + ']'] + data['classes']
+		self._loadObject(db, data['animations'])
 
-	def __new__(self, db, id):
+	def __new__(self, db, id, data=None):
 		"""
 		@param id: ground id.
 		"""
@@ -91,8 +92,22 @@ class GroundClass(type):
 		else:
 			return type.__new__(self, 'Ground[' + str(id) + ']', (Ground,), {})
 
-	def _loadObject(self, db):
+	@staticmethod
+	def get_data(db, id):
+		"""Returns the data of a ground class in the db. It only consists of builtin types.
+		@return: dict"""
+		classes = [ name for (name,) in db("SELECT class FROM ground_class WHERE ground = ?", id) ]
+		animations = db("SELECT \
+		     (SELECT file FROM animation WHERE animation_id = animation_45 LIMIT 1), \
+		     (SELECT file FROM animation WHERE animation_id = animation_135 LIMIT 1), \
+		     (SELECT file FROM animation WHERE animation_id = animation_225 LIMIT 1), \
+		     (SELECT file FROM animation WHERE animation_id = animation_315 LIMIT 1) \
+		     FROM ground WHERE id = ?", id)[0]
+		return {'classes': classes, 'animations': list(animations)}
+
+	def _loadObject(self, db, animations):
 		""" Loads the ground object from the db (animations, etc)
+		@param animations: files of the animations for the rotations 45, 135, 225 and 315
 		"""
 		self.log.debug('Loading ground %s', self.id)
 		try:
@@ -116,23 +131,15 @@ class GroundClass(type):
 		#			action.get2dGfxVisual().addAnimation(int(rotation), anim_id)
 		#			action.setDuration(horizons.main.fife.animationpool.getAnimation(anim_id).getDuration())
 
-		animation_45, animation_135, animation_225, animation_315 = \
-			 db("SELECT \
-		     (SELECT file FROM animation WHERE animation_id = animation_45 LIMIT 1), \
-		     (SELECT file FROM animation WHERE animation_id = animation_135 LIMIT 1), \
-		     (SELECT file FROM animation WHERE animation_id = animation_225 LIMIT 1), \
-		     (SELECT file FROM animation WHERE animation_id = animation_315 LIMIT 1) \
-		     FROM ground WHERE id = ?", self.id)[0]
-		for rotation, file in [(45, animation_45), (135, animation_135), (225, animation_225), (315, animation_315)]:
+		for rotation, file in zip((45, 135, 225, 315), animations):
 			if not horizons.main.fife.use_atlases:
 				img = horizons.main.fife.imagemanager.load(file)
 			else:
 				if horizons.main.fife.imagemanager.exists(file):
 					img = horizons.main.fife.imagemanager.get(file)
 				else:
-					img = horizons.main.fife.imagemanager.create(file)
 					atlas_id, xpos, ypos, width, height = db("SELECT atlas_id, xpos, ypos, width, height FROM tile_sets_atlas where file = ?", file)[0]
 					region = fife.Rect(xpos, ypos, width, height)
-					img.useSharedImage(horizons.main.fife.animationloader.atlaslib[atlas_id], region)				
-				
+					img = horizons.main.fife.animationloader.get_image(file, atlas_id, region)
+
 			visual.addStaticImage(int(rotation), img.getHandle())
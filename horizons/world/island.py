@@ -32,6 +32,23 @@ from horizons.world.pathfinding.pathnodes import IslandPathNodes
 from horizons.constants import BUILDINGS, RES, UNITS
 from horizons.scenario import CONDITIONS
 from horizons.world.buildingowner import BuildingOwner
+from horizons.world.buildabilityindex import BuildabilityIndex
+
+def read_island_ground(filename):
+	"""Reads the ground tiles of an island. Doesn't depend on the session.
+	@param filename: String, filename of island db or random map id
+	@return: list of (x, y, ground_id) tuples, coordinates are relative to the island's origin
+	"""
+	# check if filename is a random map
+	if random_map.is_random_island_id_string(filename):
+		# it's a random map id, create this map (or get it from the cache)
+		return random_map.get_random_island_ground(filename)
+	db = DbReader(filename) # Create a new DbReader instance to load the maps file.
+	try:
+		return db("SELECT x, y, ground_id FROM ground").rows
+	finally:
+		db.close()
+
 
 class Island(BuildingOwner, WorldObject):
 	"""The Island class represents an Island by keeping a list of all instances on the map,
@@ -99,26 +116,28 @@ class Island(BuildingOwner, WorldObject):
 		self.file = filename
 		self.origin = origin
 
-		# check if filename is a random map
-		if random_map.is_random_island_id_string(filename):
-			# it's a random map id, create this map and load it
-			db = random_map.create_random_island(filename)
-		else:
-			db = DbReader(filename) # Create a new DbReader instance to load the maps file.
+		ground_rows = read_island_ground(filename)
 
-		p_x, p_y, width, height = db("SELECT (MIN(x) + ?), (MIN(y) + ?), (1 + MAX(x) - MIN(x)), (1 + MAX(y) - MIN(y)) FROM ground", self.origin.x, self.origin.y)[0]
+		xs = [ row[0] for row in ground_rows ]
+		ys = [ row[1] for row in ground_rows ]
+		min_x, min_y, max_x, max_y = min(xs), min(ys), max(xs), max(ys)
 
 		# rect for quick checking if a tile isn't on this island
 		# NOTE: it contains tiles, that are not on the island!
-		self.rect = Rect(Point(p_x, p_y), width, height)
+		self.rect = Rect(Point(self.origin.x + min_x, self.origin.y + min_y), 1 + max_x - min_x, 1 + max_y - min_y)
 
 		self.ground_map = {}
-		for (rel_x, rel_y, ground_id) in db("SELECT x, y, ground_id FROM ground"): # Load grounds
+		for (rel_x, rel_y, ground_id) in ground_rows: # Load grounds
 			ground = Entities.grounds[ground_id](self.session, self.origin.x + rel_x, self.origin.y + rel_y)
 			# These are important for pathfinding and building to check if the ground tile
 			# is blocked in any way.
 			self.ground_map[(ground.x, ground.y)] = ground
 
+		# define the rectangle with the smallest area that contains every island tile its position
+		self.position = Rect.init_from_borders(self.origin.x + min_x, self.origin.y + min_y, \
+		                                       self.origin.x + max_x, self.origin.y + max_y)
+
+		self.buildability_index = BuildabilityIndex(self.position, self.ground_map)
 		self._init_cache()
 
 		self.settlements = []
@@ -127,13 +146,6 @@ class Island(BuildingOwner, WorldObject):
 
 		self.path_nodes = IslandPathNodes(self)
 
-		# define the rectangle with the smallest area that contains every island tile its position
-		min_x = min(zip(*self.ground_map.keys())[0])
-		max_x = max(zip(*self.ground_map.keys())[0])
-		min_y = min(zip(*self.ground_map.keys())[1])
-		max_y = max(zip(*self.ground_map.keys())[1])
-		self.position = Rect.init_from_borders(min_x, min_y, max_x, max_y)
-
 		# repopulate wild animals every 2 mins if they die out.
 		Scheduler().add_new_object(self.check_wild_animal_population, self, Scheduler().get_ticks(120), -1)
 
@@ -240,6 +252,8 @@ class Island(BuildingOwner, WorldObject):
 		@param position: Rect"""
 		if settlement not in self.settlements:
 			self.settlements.append(settlement)
+			self.session.world.checkup_hash.track(('inventory', settlement.worldid), \
+			                                      settlement.inventory, settlement.get_inventory_checkup_hash_value)
 		self.assign_settlement(position, radius, settlement)
 		self.session.scenario_eventhandler.check_events(CONDITIONS.settlements_num_greater)
 		return settlement
@@ -259,6 +273,8 @@ class Island(BuildingOwner, WorldObject):
 				if tile.settlement is None:
 					tile.settlement = settlement
 					settlement.ground_map[coord] = tile
+					if 'constructible' in tile.classes:
+						settlement.usable_land += 1
 					self.session.ingame_gui.minimap.update(coord)
 					self._register_change(coord[0], coord[1])
 
@@ -283,6 +299,7 @@ class Island(BuildingOwner, WorldObject):
 		@param building: Building class instance of the building that is to be added.
 		@param player: int id of the player that owns the settlement"""
 		building = super(Island, self).add_building(building, player)
+		self.buildability_index.update(building.position)
 		for building.settlement in self.get_settlements(building.position, player):
 			self.assign_settlement(building.position, building.radius, building.settlement)
 			break
@@ -292,6 +309,7 @@ class Island(BuildingOwner, WorldObject):
 		building.init()
 		if building.id in self.building_indexers:
 			self.building_indexers[building.id].add(building)
+		self.session.world.building_index.add(building, building.position.center())
 
 		# Reset the tiles this building was covering
 		for point in building.position:
@@ -311,8 +329,10 @@ class Island(BuildingOwner, WorldObject):
 			assert(building not in building.settlement.buildings)
 
 		super(Island, self).remove_building(building)
+		self.buildability_index.update(building.position)
 		if building.id in self.building_indexers:
 			self.building_indexers[building.id].remove(building)
+		self.session.world.building_index.remove(building)
 
 		# Reset the tiles this building was covering (after building has been completely removed)
 		for point in building.position:
@@ -374,21 +394,9 @@ class Island(BuildingOwner, WorldObject):
 			self.building_sizes.add((size_y, size_x))
 
 		self.last_changed = {}
-		for size in self.building_sizes:
-			self.last_changed[size] = {}
-
-		for (x, y) in self.ground_map:
-			for size_x, size_y in self.building_sizes:
-				all_on_island = True
-				for dx in xrange(size_x):
-					for dy in xrange(size_y):
-						if (x + dx, y + dy) not in self.ground_map:
-							all_on_island = False
-							break
-					if not all_on_island:
-						break
-				if all_on_island:
-					self.last_changed[(size_x, size_y)][(x, y)] = self.last_change_id
+		for size_x, size_y in self.building_sizes:
+			origins = self.buildability_index.get_origins(BuildabilityIndex.LAND, size_x, size_y)
+			self.last_changed[(size_x, size_y)] = dict.fromkeys(origins, self.last_change_id)
 
 	def _register_change(self, x, y):
 		""" registers the possible buildability change of a rectangle on this island """
@@ -0,0 +1,127 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+
+from horizons.util import Point, Rect
+
+
+class PathCache(object):
+	"""LRU cache of paths found on a set of path nodes.
+
+	Every path node set that uses a cache (e.g. the roads of an island) has to call
+	invalidate() when it changes. This increases the version of the cache, which is part
+	of the keys, and drops all entries.
+
+	Paths that were found with blocked coords are valid on the unblocked nodes too, so
+	they are stored as well. On lookup, a cached path is only used if none of its coords is
+	blocked now. "No path" results are only stored if nothing was blocked.
+
+	NOTE: the cache state influences which path is chosen, so it must only be used for
+	      searches that are executed on all clients of a multiplayer game
+	      (i.e. not for searches triggered by the local gui).
+	"""
+	log = logging.getLogger("world.pathfinding")
+
+	DEFAULT_SIZE = 256
+
+	def __init__(self, size=DEFAULT_SIZE):
+		self.size = size
+		self.version = 0
+		self._cache = {} # { key : [last use, path] }
+		self._use_counter = 0 # source of the "last use" values
+		self.hits = 0
+		self.misses = 0
+		self.blocked_hits = 0 # cached path was found, but it is blocked now
+		self.invalidations = 0
+
+	@classmethod
+	def get_shape_key(cls, shape):
+		"""Returns a hashable key for a source or destination of a search,
+		or None if this kind of shape isn't supported by the cache."""
+		if hasattr(shape, 'position'): # building
+			shape = shape.position
+		if isinstance(shape, Rect):
+			return (shape.left, shape.top, shape.right, shape.bottom)
+		if isinstance(shape, Point):
+			return (shape.x, shape.y, shape.x, shape.y)
+		return None
+
+	def get_key(self, source, destination, diagonal, make_target_walkable):
+		"""Returns the cache key of a search or None if the search can't be cached."""
+		source_key = self.get_shape_key(source)
+		destination_key = self.get_shape_key(destination)
+		if source_key is None or destination_key is None:
+			return None
+		return (source_key, destination_key, self.version, diagonal, make_target_walkable)
+
+	def lookup(self, key, blocked_coords):
+		"""
+		@param key: return value of get_key
+		@param blocked_coords: currently blocked coords, as supported by FindPath
+		@return: tuple (found, path). path is a copy of the cached path, None means
+		         that there is no path.
+		"""
+		entry = self._cache.get(key)
+		if entry is None:
+			self.misses += 1
+			return (False, None)
+		path = entry[1]
+		if path is not None and blocked_coords:
+			for coords in path:
+				if coords in blocked_coords:
+					self.blocked_hits += 1
+					self.misses += 1
+					return (False, None)
+		self.hits += 1
+		self._use_counter += 1
+		entry[0] = self._use_counter
+		return (True, None if path is None else list(path))
+
+	def store(self, key, path, blocked_coords):
+		"""Saves the result of a search.
+		@param path: path found by FindPath, or None
+		"""
+		if path is None and blocked_coords:
+			return # the blocked coords might be the reason
+		if len(self._cache) >= self.size:
+			self._evict()
+		self._use_counter += 1
+		self._cache[key] = [self._use_counter, None if path is None else list(path)]
+
+	def invalidate(self):
+		"""Drops all entries, has to be called when the path nodes change."""
+		self.version += 1
+		self.invalidations += 1
+		self._cache.clear()
+
+	def _evict(self):
+		"""Removes the least recently used half of the entries."""
+		ordered = sorted(self._cache.iteritems(), key=lambda item: item[1][0])
+		for key, entry in ordered[:len(ordered) // 2 + 1]:
+			del self._cache[key]
+
+	def get_stats(self):
+		"""Returns a dict with the hit and miss counters."""
+		lookups = self.hits + self.misses
+		return {'hits': self.hits, 'misses': self.misses, 'blocked_hits': self.blocked_hits,
+		        'invalidations': self.invalidations, 'entries': len(self._cache),
+		        'hit_rate': float(self.hits) / lookups if lookups else 0.0}
@@ -26,7 +26,8 @@ import logging
 from horizons.util import Rect, Point, decorators
 
 from horizons.world.pathfinding import PathBlockedError
-from horizons.world.pathfinding.pathfinding import FindPath
+from horizons.world.pathfinding.pathfinding import FindPath, GridFindPath, HierarchicalFindPath
+from horizons.world.pathfinding.pathnodes import PathGrid
 
 """
 In this file, you will find an interface to the pathfinding algorithm.
@@ -71,6 +72,20 @@ class AbstractPather(object):
 		Return value type must be supported by FindPath"""
 		return []
 
+	def _get_find_path(self, path_nodes):
+		"""Returns the pathfinding algorithm for the return value of _get_path_nodes"""
+		return GridFindPath() if isinstance(path_nodes, PathGrid) else FindPath()
+
+	def _get_path_cache(self):
+		"""Returns the PathCache of the path nodes or None if paths aren't cached.
+		Only pathers that are used the same way on all clients may use a cache."""
+		return None
+
+	def _is_reachable(self, source, destination):
+		"""Returns False if it is known without searching that there is no path.
+		Blocked coords don't have to be considered."""
+		return True
+
 	def _check_for_obstacles(self, point):
 		"""Check if the path is unexpectedly blocked by e.g. a unit
 		@param point: tuple: (x, y)
@@ -103,11 +118,29 @@ class AbstractPather(object):
 		if source is None:
 			source = self._get_position()
 
-		# call algorithm
-		# to use a different pathfinding code, just change the following line
-		path = FindPath()(source, destination, self._get_path_nodes(),
-											self._get_blocked_coords(), self.move_diagonal, \
-											self.make_target_walkable)
+		if not self._is_reachable(source, destination):
+			return False
+
+		blocked_coords = self._get_blocked_coords()
+		path_cache = self._get_path_cache()
+		cache_key = None
+		if path_cache is not None:
+			cache_key = path_cache.get_key(source, destination, self.move_diagonal, \
+			                               self.make_target_walkable)
+		if cache_key is not None:
+			found, path = path_cache.lookup(cache_key, blocked_coords)
+		else:
+			found = False
+
+		if not found:
+			# call algorithm
+			# to use a different pathfinding code, just change the following lines
+			path_nodes = self._get_path_nodes()
+			find_path = self._get_find_path(path_nodes)
+			path = find_path(source, destination, path_nodes, blocked_coords, \
+			                 self.move_diagonal, self.make_target_walkable)
+			if cache_key is not None:
+				path_cache.store(cache_key, path, blocked_coords)
 
 		if path is None:
 			return False
@@ -217,7 +250,10 @@ class ShipPather(AbstractPather):
 		                                 *args, **kwargs)
 
 	def _get_path_nodes(self):
-		return self.session.world.water
+		return self.session.world.water_grid
+
+	def _get_find_path(self, path_nodes):
+		return HierarchicalFindPath(self.session.world.water_clusters)
 
 	def _get_blocked_coords(self):
 		return self.session.world.ship_map
@@ -226,7 +262,10 @@ class ShipPather(AbstractPather):
 class FisherShipPather(ShipPather):
 	"""Can also drive through shallow water"""
 	def _get_path_nodes(self):
-		return self.session.world.water_and_coastline
+		return self.session.world.water_and_coastline_grid
+
+	def _get_find_path(self, path_nodes):
+		return HierarchicalFindPath(self.session.world.water_and_coastline_clusters)
 
 	def _get_blocked_coords(self):
 		# don't let fisher be blocked by other ships (#1023)
@@ -242,6 +281,9 @@ class BuildingCollectorPather(AbstractPather):
 	def _get_path_nodes(self):
 			return self.unit.home_building.path_nodes.nodes
 
+	def _get_path_cache(self):
+		return self.unit.home_building.path_nodes.path_cache
+
 
 class RoadPather(AbstractPather):
 	"""Pather for collectors, that depend on roads (e.g. the one used for the branch office)"""
@@ -252,6 +294,12 @@ class RoadPather(AbstractPather):
 	def _get_path_nodes(self):
 		return self.island.path_nodes.road_nodes
 
+	def _get_path_cache(self):
+		return self.island.path_nodes.road_path_cache
+
+	def _is_reachable(self, source, destination):
+		return self.island.path_nodes.road_components.are_connected(source, destination)
+
 
 class SoldierPather(AbstractPather):
 	"""Pather for units, that move absolutely freely (such as soldiers)
@@ -301,7 +349,18 @@ class StaticPather(object):
 		@param island: island to search path on
 		@param source, destination: Point or anything supported by FindPath
 		@return: list of tuples or None in case no path is found"""
-		return FindPath()(source, destination, island.path_nodes.road_nodes)
+		if not island.path_nodes.road_components.are_connected(source, destination):
+			return None
+		path_cache = island.path_nodes.road_path_cache
+		key = path_cache.get_key(source, destination, False, True)
+		if key is not None:
+			found, path = path_cache.lookup(key, [])
+			if found:
+				return path
+		path = FindPath()(source, destination, island.path_nodes.road_nodes)
+		if key is not None:
+			path_cache.store(key, path, [])
+		return path
 
 
 decorators.bind_all(AbstractPather)
@@ -22,9 +22,13 @@
 import sys
 import logging
 
+from array import array
+from heapq import heappush, heappop
+
 from horizons.util import Rect, Point, decorators
 
 from horizons.world.pathfinding import PathBlockedError
+from horizons.world.pathfinding.pathnodes import PathGrid
 
 """
 This file contains only the pathfinding algorithm. It is implemented in a callable class
@@ -39,6 +43,9 @@ class FindPath(object):
 	"""
 	log = logging.getLogger("world.pathfinding")
 
+	# types of path_nodes this algorithm supports
+	path_nodes_types = (dict, list, set)
+
 	@decorators.make_constants()
 	def __call__(self, source, destination, path_nodes, blocked_coords = list(), \
 				       diagonal = False, make_target_walkable = True):
@@ -58,7 +65,7 @@ class FindPath(object):
 		# commented out checks since BasicBuilding can't be imported here
 		#assert(isinstance(source, (Rect, Point, BasicBuilding)))
 		#assert(isinstance(destination, (Rect, Point, BasicBuilding)))
-		assert(isinstance(path_nodes, (dict, list, set)))
+		assert(isinstance(path_nodes, self.path_nodes_types))
 		assert(isinstance(blocked_coords, (dict, list, set)))
 
 		# save args
@@ -91,7 +98,7 @@ class FindPath(object):
 		if hasattr(self.destination, 'position'):
 			self.destination = self.destination.position
 
-		if isinstance(self.path_nodes, list) or isinstance(self.path_nodes, set):
+		if isinstance(self.path_nodes, (list, set)):
 			self.path_nodes = dict.fromkeys(self.path_nodes, 1.0)
 
 		# check if target is blocked
@@ -153,7 +160,6 @@ class FindPath(object):
 			if not self.make_target_walkable:
 				dest_coords = dest_coords.intersection(self.path_nodes)
 
-		from heapq import heappush, heappop
 		heap = []
 		for coords, data in to_check.iteritems():
 			heappush(heap, (data[2], coords))
@@ -250,6 +256,268 @@ class FindPath(object):
 
 
 
+class GridFindPath(FindPath):
+	"""Same algorithm as FindPath, but on a PathGrid instead of a dict of path nodes.
+	It returns exactly the same paths as FindPath, but the nodes are addressed by
+	integer indices into flat arrays, which avoids hashing tuples and creating
+	generators for each neighbor. This pays off for big searches such as ships
+	crossing the whole map.
+	Searches where the source or the destination is outside of the grid are passed
+	to FindPath.execute.
+	"""
+
+	path_nodes_types = (PathGrid, )
+
+	def execute(self):
+		"""Executes algorithm"""
+		grid = self.path_nodes
+		destination = self.destination
+
+		source_coords = self.source.get_coordinates()
+		dest_coords = self.destination.get_coordinates()
+		if len(dest_coords) > 5 and not self.make_target_walkable:
+			dest_coords = [ c for c in dest_coords if c in grid ]
+
+		for c in source_coords:
+			if not grid.is_inside(c):
+				return self._execute_on_dict(source_coords, dest_coords)
+		for c in dest_coords:
+			if not grid.is_inside(c):
+				return self._execute_on_dict(source_coords, dest_coords)
+
+		height = grid.height
+		x0 = grid.x0
+		y0 = grid.y0
+		cost = grid.cost
+
+		# free[i] is 1 iff node i may still be added to the open list. Nodes are never
+		# reconsidered once they have been reached; FindPath behaves the same way
+		# (its update for better paths to open nodes doesn't have any effect).
+		free = bytearray(grid.walkable)
+		for c in dest_coords:
+			free[(c[0] - x0) * height + (c[1] - y0)] = 1
+		for c in source_coords:
+			free[(c[0] - x0) * height + (c[1] - y0)] = 1
+		for c in self.blocked_coords:
+			if grid.is_inside(c):
+				free[(c[0] - x0) * height + (c[1] - y0)] = 0
+
+		is_dest = bytearray(len(free))
+		for c in dest_coords:
+			is_dest[(c[0] - x0) * height + (c[1] - y0)] = 1
+
+		previous = array('i', [-1]) * len(free)
+		dist = {} # index : distance to here, for open and closed nodes
+
+		heap = []
+		for c in source_coords:
+			index = (c[0] - x0) * height + (c[1] - y0)
+			if index in dist:
+				continue
+			free[index] = 0
+			dist[index] = 0
+			heappush(heap, (Point(*c).distance(destination), index))
+
+		if self.diagonal:
+			offsets = (-height - 1, -height, -height + 1, -1, 1, height - 1, height, height + 1)
+		else:
+			offsets = (-height, height, -1, 1)
+
+		# the distance estimation is inlined for rects and points (a point is a rect
+		# with left == right and top == bottom, the result is exactly the same)
+		if isinstance(destination, Rect):
+			rect_dest = True
+			left, right, top, bottom = destination.left, destination.right, destination.top, destination.bottom
+		elif isinstance(destination, Point):
+			rect_dest = True
+			left = right = destination.x
+			top = bottom = destination.y
+		else:
+			rect_dest = False
+			distance_to_tuple = destination.distance_to_tuple
+
+		while heap:
+			cur_index = heappop(heap)[1]
+
+			if is_dest[cur_index]:
+				path = []
+				while cur_index != -1:
+					path.append((cur_index // height + x0, cur_index % height + y0))
+					cur_index = previous[cur_index]
+				path.reverse()
+				return path
+
+			dist_to_here = dist[cur_index] + cost[cur_index]
+			for offset in offsets:
+				neighbor_index = cur_index + offset
+				if free[neighbor_index]:
+					free[neighbor_index] = 0
+					previous[neighbor_index] = cur_index
+					dist[neighbor_index] = dist_to_here
+					other_x = neighbor_index // height + x0
+					other_y = neighbor_index % height + y0
+					if rect_dest:
+						estimation = ((max(left - other_x, 0, other_x - right) ** 2) + (max(top - other_y, 0, other_y - bottom) ** 2)) ** 0.5
+					else:
+						estimation = distance_to_tuple((other_x, other_y))
+					heappush(heap, (estimation + dist_to_here, neighbor_index))
+
+		return None
+
+	def _execute_on_dict(self, source_coords, dest_coords):
+		"""Runs FindPath.execute with the grid converted to a dict."""
+		self.log.debug("GridFindPath: %s or %s is outside of the grid", source_coords, dest_coords)
+		grid = self.path_nodes
+		self.path_nodes = dict( (coords, grid.cost[grid.index(coords)]) for coords in grid )
+		return super(GridFindPath, self).execute()
+
+
+class HierarchicalFindPath(GridFindPath):
+	"""Hierarchical pathfinding (HPA*) on a PathGrid, for long distances such as ship routes.
+	A path is first searched on the portals of a ClusterGraph and then refined inside of the
+	clusters on that path, which only touches a small part of the grid. The path is at most
+	slightly longer than the one GridFindPath would return.
+	Short searches and searches where the refinement fails (e.g. because of blocked coords)
+	are done by GridFindPath.
+	"""
+
+	SOURCE = -1
+	GOAL = -2
+
+	def __init__(self, cluster_graph):
+		"""
+		@param cluster_graph: ClusterGraph of the path nodes that will be searched
+		"""
+		super(HierarchicalFindPath, self).__init__()
+		self.cluster_graph = cluster_graph
+
+	def execute(self):
+		"""Executes algorithm"""
+		graph = self.cluster_graph
+		grid = self.path_nodes
+		if graph is None or graph.grid is not grid or graph.diagonal != self.diagonal:
+			return super(HierarchicalFindPath, self).execute()
+
+		source_coords = self.source.get_coordinates()
+		dest_coords = self.destination.get_coordinates()
+		if len(dest_coords) > 5 and not self.make_target_walkable:
+			dest_coords = [ c for c in dest_coords if c in grid ]
+		if len(source_coords) != 1 or not dest_coords or \
+		   not all(grid.is_inside(c) for c in source_coords) or \
+		   not all(grid.is_inside(c) for c in dest_coords):
+			return super(HierarchicalFindPath, self).execute()
+		source = grid.index(source_coords[0])
+		destinations = [ grid.index(c) for c in dest_coords ]
+
+		# only worth it if the destination isn't in a neighboring cluster
+		dest_clusters = {}
+		for index in destinations:
+			dest_clusters.setdefault(graph.get_cluster(index), []).append(index)
+		source_column, source_row = graph.get_cluster_position(graph.get_cluster(source))
+		for cluster in dest_clusters:
+			column, row = graph.get_cluster_position(cluster)
+			if abs(column - source_column) <= 1 and abs(row - source_row) <= 1:
+				return super(HierarchicalFindPath, self).execute()
+
+		dest_set = set(destinations)
+		passable = dest_set.union((source, ))
+		blocked = set( grid.index(c) for c in self.blocked_coords if grid.is_inside(c) )
+		path = self._find_abstract_path(source, destinations, dest_clusters, passable)
+		if path is not None:
+			path = self._refine(path, source, dest_set, passable, blocked)
+		if path is None:
+			self.log.debug("HierarchicalFindPath: falling back to GridFindPath")
+			return super(HierarchicalFindPath, self).execute()
+		return [ grid.coords(index) for index in path ]
+
+	def _find_abstract_path(self, source, destinations, dest_clusters, passable):
+		"""A* search on the portals, obstacles that aren't part of the grid are ignored.
+		@return: list of nodes (SOURCE, portals..., GOAL) or None"""
+		graph = self.cluster_graph
+		portals = graph.portals
+		height = graph.grid.height
+
+		# edges of the source and to the goal
+		source_edges = graph.get_portal_distances(graph.get_cluster(source), [source], passable)
+		goal_costs = {}
+		for cluster, indices in sorted(dest_clusters.iteritems()):
+			for portal, distance in graph.get_portal_distances(cluster, indices, passable):
+				if portal not in goal_costs or distance < goal_costs[portal]:
+					goal_costs[portal] = distance
+
+		# admissible estimation: distance to the bounding box of the destination
+		xs = [ index // height for index in destinations ]
+		ys = [ index % height for index in destinations ]
+		left, right, top, bottom = min(xs), max(xs), min(ys), max(ys)
+		diagonal = self.diagonal
+		def estimate(index):
+			x, y = divmod(index, height)
+			dx = max(left - x, 0, x - right)
+			dy = max(top - y, 0, y - bottom)
+			return max(dx, dy) if diagonal else dx + dy
+
+		SOURCE, GOAL = self.SOURCE, self.GOAL
+		dist = { SOURCE : 0 }
+		previous = { SOURCE : None }
+		closed = set()
+		heap = [ (estimate(source), SOURCE) ]
+		while heap:
+			node = heappop(heap)[1]
+			if node in closed:
+				continue
+			if node == GOAL:
+				path = []
+				while node is not None:
+					path.append(node)
+					node = previous[node]
+				path.reverse()
+				return path
+			closed.add(node)
+
+			if node == SOURCE:
+				edges = source_edges
+			else:
+				edges = graph.get_edges(node)
+				if node in goal_costs:
+					edges = edges + [ (GOAL, goal_costs[node]) ]
+			dist_to_here = dist[node]
+			for other, distance in edges:
+				other_dist = dist_to_here + distance
+				if other not in closed and (other not in dist or other_dist < dist[other]):
+					dist[other] = other_dist
+					previous[other] = node
+					heappush(heap, (other_dist + (0 if other == GOAL else estimate(portals[other])), other))
+		return None
+
+	def _refine(self, abstract_path, source, dest_set, passable, blocked):
+		"""Converts a path of portals to a path of tiles.
+		@return: list of tile indices or None, if blocked coords are in the way"""
+		graph = self.cluster_graph
+		path = [source]
+		cur = source
+		for node in abstract_path[1:]:
+			cluster = graph.get_cluster(cur)
+			if node == self.GOAL:
+				destinations = set( index for index in dest_set if graph.get_cluster(index) == cluster )
+				segment = graph.get_path(cluster, cur, destinations, passable, blocked)
+			else:
+				index = graph.portals[node]
+				if graph.get_cluster(index) != cluster:
+					# neighboring tile in another cluster
+					segment = None if index in blocked else [cur, index]
+				else:
+					segment = graph.get_path(cluster, cur, (index, ), passable, blocked)
+			if segment is None:
+				return None
+			path.extend(segment[1:])
+			cur = path[-1]
+
+		# the path ends where it reaches the destination for the first time
+		for i, index in enumerate(path):
+			if index in dest_set:
+				return path[:i+1]
+		return path
+
 """
 def check_path(path, blocked_coords):
 	"" debug function to check if a path is valid ""
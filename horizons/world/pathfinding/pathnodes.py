@@ -21,7 +21,11 @@
 
 import logging
 
+from array import array
+
 from horizons.util import Point
+from horizons.world.pathfinding.pathcache import PathCache
+from horizons.world.pathfinding.roadcomponents import RoadComponents
 
 class PathNodes(object):
 	"""
@@ -50,6 +54,8 @@ class ConsumerBuildingPathNodes(PathNodes):
 			tile = consumerbuilding.island.get_tile(Point(coordinate[0], coordinate[1]))
 			if tile is not None and not 'coastline' in tile.classes:
 				self.nodes[coordinate] = self.NODE_DEFAULT_SPEED
+		# the nodes never change, so cached paths stay valid
+		self.path_cache = PathCache()
 
 
 class IslandPathNodes(PathNodes):
@@ -57,6 +63,8 @@ class IslandPathNodes(PathNodes):
 	Interface:
 	self.nodes: List of nodes on island, where the terrain allows to be walked on
 	self.road_nodes: dictionary of nodes, where a road is built on
+	self.path_cache, self.road_path_cache: PathCache for nodes and road_nodes
+	self.road_components: RoadComponents of road_nodes
 
 	(un)register_road has to be called for each coord, where a road is built on (destroyed)
 	reset_tile_walkablity has to be called when the terrain changes the walkability
@@ -79,13 +87,30 @@ class IslandPathNodes(PathNodes):
 		# nodes where a real road is built on.
 		self.road_nodes = {}
 
+		self.path_cache = PathCache()
+		self.road_path_cache = PathCache()
+		self.road_components = RoadComponents()
+
 	def register_road(self, road):
 		for i in road.position:
 			self.road_nodes[ (i.x, i.y) ] = self.NODE_DEFAULT_SPEED
+		self.road_path_cache.invalidate()
+		self.road_components.add(road.position.tuple_iter())
 
 	def unregister_road(self, road):
 		for i in road.position:
 			del self.road_nodes[ (i.x, i.y) ]
+		self.road_path_cache.invalidate()
+		self.road_components.remove(road.position.tuple_iter())
+
+	def get_reachable_buildings(self, building, building_id):
+		"""Returns the buildings of a type on the island that can be reached from building on roads.
+		@param building: building to start from
+		@param building_id: id of the building type to look for
+		@return: list of buildings"""
+		return [ other for settlement in self.island.settlements \
+		         for other in settlement.get_buildings_by_id(building_id) \
+		         if other is not building and self.road_components.are_connected(building, other) ]
 
 	def is_road(self, x, y):
 		"""Return if there is a road on (x, y)"""
@@ -124,5 +149,340 @@ class IslandPathNodes(PathNodes):
 		in_list = (coord in self.nodes)
 		if not in_list and actually_walkable:
 			self.nodes[coord] = self.NODE_DEFAULT_SPEED
+			self.path_cache.invalidate()
 		if in_list and not actually_walkable:
 			del self.nodes[coord]
+			self.path_cache.invalidate()
+
+
+class PathGrid(object):
+	"""Dense representation of a dict of path nodes { (x, y) : speed }, used by GridFindPath.
+	The nodes are stored in flat arrays, indexed by (x - x0) * height + (y - y0), which keeps
+	the order of the (x, y) tuples. There is a border of one non-walkable tile around the
+	bounding box of the nodes, so that neighbors never have to be checked against the bounds.
+
+	Interface:
+	self.walkable: bytearray, 1 for path nodes
+	self.cost: array of floats, speed of the path nodes (0.0 for others)
+	set_node/remove_node have to be called to keep the grid in sync with the dict
+	"""
+	def __init__(self, path_nodes):
+		"""
+		@param path_nodes: dict { (x, y) : speed } or list/set of (x, y)
+		"""
+		if not isinstance(path_nodes, dict):
+			path_nodes = dict.fromkeys(path_nodes, PathNodes.NODE_DEFAULT_SPEED)
+		if path_nodes:
+			xs = [coords[0] for coords in path_nodes]
+			ys = [coords[1] for coords in path_nodes]
+			min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+		else:
+			min_x, max_x, min_y, max_y = 0, 0, 0, 0
+		self.x0 = min_x - 1
+		self.y0 = min_y - 1
+		self.width = max_x - min_x + 3
+		self.height = max_y - min_y + 3
+		self.walkable = bytearray(self.width * self.height)
+		self.cost = array('d', [0.0]) * (self.width * self.height)
+		for coords, speed in path_nodes.iteritems():
+			self.set_node(coords, speed)
+
+	def index(self, coords):
+		"""Returns the array index of coords (x, y). coords must be inside the grid."""
+		return (coords[0] - self.x0) * self.height + (coords[1] - self.y0)
+
+	def coords(self, index):
+		"""Returns the coords (x, y) of an array index."""
+		return (index // self.height + self.x0, index % self.height + self.y0)
+
+	def is_inside(self, coords):
+		"""Returns whether coords can be represented by the grid (the border excluded)."""
+		return self.x0 < coords[0] < self.x0 + self.width - 1 and \
+		       self.y0 < coords[1] < self.y0 + self.height - 1
+
+	def __contains__(self, coords):
+		return self.is_inside(coords) and self.walkable[self.index(coords)] == 1
+
+	def __iter__(self):
+		for index in xrange(len(self.walkable)):
+			if self.walkable[index]:
+				yield self.coords(index)
+
+	def set_node(self, coords, speed=PathNodes.NODE_DEFAULT_SPEED):
+		assert self.is_inside(coords), "%s is outside of the path grid" % (coords, )
+		index = self.index(coords)
+		self.walkable[index] = 1
+		self.cost[index] = speed
+
+	def remove_node(self, coords):
+		if self.is_inside(coords):
+			index = self.index(coords)
+			self.walkable[index] = 0
+			self.cost[index] = 0.0
+
+
+class ClusterGraph(object):
+	"""Abstraction of a PathGrid for hierarchical pathfinding (HPA*), used by HierarchicalFindPath.
+	The grid is divided into square clusters. Where two neighboring clusters can be crossed,
+	a pair of portal tiles (one in each cluster) is created, which are connected by an edge.
+	The portals of a cluster are connected by edges weighted with their distance inside the
+	cluster. A path search can then be done on the portals and refined cluster by cluster.
+
+	The grid must not change after the ClusterGraph has been created. All nodes are assumed to
+	have the same speed, distances are measured in steps. The edges inside a cluster are
+	calculated when the cluster is used for the first time.
+
+	Tiles are addressed by their index in the grid (see PathGrid.index).
+	Interface:
+	self.portals: list of tile indices, a portal is referenced by its position in this list
+	get_cluster(index): returns the cluster number of a tile
+	get_cluster_portals(cluster): returns the portals of a cluster
+	get_edges(portal): returns the edges of a portal as list of (other portal, distance)
+	get_portal_distances, get_distances, get_path: searches restricted to one cluster
+	"""
+	log = logging.getLogger("world.pathfinding")
+
+	CLUSTER_SIZE = 16
+
+	# border segments of at least this length get a portal at each end instead of one
+	# in the middle
+	LONG_SEGMENT = 6
+
+	def __init__(self, grid, diagonal=True, cluster_size=CLUSTER_SIZE):
+		"""
+		@param grid: PathGrid
+		@param diagonal: whether units, that use the graph, can move diagonally
+		@param cluster_size: width and height of a cluster in tiles
+		"""
+		self.grid = grid
+		self.diagonal = diagonal
+		self.cluster_size = cluster_size
+		self.columns = (grid.width + cluster_size - 1) // cluster_size
+		self.rows = (grid.height + cluster_size - 1) // cluster_size
+		height = grid.height
+		if diagonal:
+			self.offsets = (-height - 1, -height, -height + 1, -1, 1, height - 1, height, height + 1)
+		else:
+			self.offsets = (-height, height, -1, 1)
+
+		# cluster number of each tile, tiles outside of the grid get an invalid number
+		column_pattern = array('i', [ y // cluster_size for y in xrange(height) ])
+		self._clusters = array('i')
+		for x in xrange(grid.width):
+			offset = (x // cluster_size) * self.rows
+			self._clusters.extend( row + offset for row in column_pattern )
+		self._clusters.extend( [-1] * (height + 1) ) # neighbors of the last column
+
+		self.portals = []
+		self._portal_ids = {} # { index : portal }
+		self._inter_edges = [] # edges to portals in other clusters, indexed by portal
+		self._cluster_portals = [ [] for i in xrange(self.columns * self.rows) ]
+		self._intra_edges = {} # { cluster : { portal : [ (other portal, distance), ... ] } }
+		self._open_clusters = {} # { cluster : whether all tiles of the cluster are walkable }
+
+		self._init_portals()
+		self.log.debug("ClusterGraph: %s clusters, %s portals", len(self._cluster_portals), len(self.portals))
+
+	def _add_portal(self, index):
+		portal = self._portal_ids.get(index)
+		if portal is None:
+			portal = len(self.portals)
+			self.portals.append(index)
+			self._portal_ids[index] = portal
+			self._inter_edges.append([])
+			self._cluster_portals[self._clusters[index]].append(portal)
+		return portal
+
+	def _add_transition(self, index1, index2):
+		portal1 = self._add_portal(index1)
+		portal2 = self._add_portal(index2)
+		self._inter_edges[portal1].append( (portal2, 1) )
+		self._inter_edges[portal2].append( (portal1, 1) )
+
+	def _init_portals(self):
+		size, height, walkable = self.cluster_size, self.grid.height, self.grid.walkable
+		# borders between horizontally neighboring clusters
+		for column in xrange(1, self.columns):
+			first = column * size * height # index of the top tile of the second cluster
+			for row in xrange(self.rows):
+				ys = xrange(row * size, min((row + 1) * size, height))
+				self._init_border([ (first - height + y, first + y) for y in ys ])
+		# borders between vertically neighboring clusters
+		for row in xrange(1, self.rows):
+			y = row * size
+			for column in xrange(self.columns):
+				xs = xrange(column * size, min((column + 1) * size, self.grid.width))
+				self._init_border([ (x * height + y - 1, x * height + y) for x in xs ])
+		if not self.diagonal:
+			return
+		# corners, where diagonally neighboring clusters meet
+		for column in xrange(1, self.columns):
+			for row in xrange(1, self.rows):
+				index = column * size * height + row * size # top left tile of the bottom right cluster
+				for index1, index2, via1, via2 in ( (index - height - 1, index, index - 1, index - height),
+				                                    (index - 1, index - height, index - height - 1, index) ):
+					if walkable[index1] and walkable[index2] and not walkable[via1] and not walkable[via2]:
+						self._add_transition(index1, index2)
+
+	def _init_border(self, pairs):
+		"""Creates the transitions for the border between two clusters.
+		@param pairs: list of neighboring tiles (index in first cluster, index in second one)"""
+		walkable = self.grid.walkable
+		crossable = [ walkable[index1] and walkable[index2] for index1, index2 in pairs ]
+		start = None
+		for i in xrange(len(pairs) + 1):
+			if i < len(pairs) and crossable[i]:
+				if start is None:
+					start = i
+			elif start is not None:
+				# segment from start to i - 1
+				if i - start >= self.LONG_SEGMENT:
+					self._add_transition(*pairs[start])
+					self._add_transition(*pairs[i - 1])
+				else:
+					self._add_transition(*pairs[(start + i - 1) // 2])
+				start = None
+		if not self.diagonal:
+			return
+		# diagonal crossings, where no straight crossing is nearby
+		for i in xrange(len(pairs) - 1):
+			if crossable[i] or crossable[i + 1]:
+				continue
+			(a1, b1), (a2, b2) = pairs[i], pairs[i + 1]
+			if walkable[a1] and walkable[b2]:
+				self._add_transition(a1, b2)
+			if walkable[a2] and walkable[b1]:
+				self._add_transition(a2, b1)
+
+	def get_cluster(self, index):
+		"""Returns the number of the cluster that contains the tile"""
+		return self._clusters[index]
+
+	def get_cluster_position(self, cluster):
+		"""Returns (column, row) of a cluster"""
+		return divmod(cluster, self.rows)
+
+	def get_cluster_portals(self, cluster):
+		"""Returns list of the portals in a cluster"""
+		return self._cluster_portals[cluster]
+
+	def get_edges(self, portal):
+		"""Returns list of (other portal, distance) for all edges of portal"""
+		cluster = self._clusters[self.portals[portal]]
+		intra_edges = self._intra_edges.get(cluster)
+		if intra_edges is None:
+			intra_edges = self._init_intra_edges(cluster)
+		return self._inter_edges[portal] + intra_edges[portal]
+
+	def _is_open(self, cluster):
+		"""Returns whether all tiles of the cluster are walkable"""
+		is_open = self._open_clusters.get(cluster)
+		if is_open is None:
+			column, row = self.get_cluster_position(cluster)
+			size, height = self.cluster_size, self.grid.height
+			top = row * size
+			rows = min(size, height - top)
+			is_open = True
+			for x in xrange(column * size, min((column + 1) * size, self.grid.width)):
+				start = x * height + top
+				if self.grid.walkable[start:start + rows].count('\x01') != rows:
+					is_open = False
+					break
+			self._open_clusters[cluster] = is_open
+		return is_open
+
+	def get_distance(self, index1, index2):
+		"""Distance in steps without obstacles"""
+		height = self.grid.height
+		dx = abs(index1 // height - index2 // height)
+		dy = abs(index1 % height - index2 % height)
+		return max(dx, dy) if self.diagonal else dx + dy
+
+	def _init_intra_edges(self, cluster):
+		intra_edges = {}
+		for portal in self._cluster_portals[cluster]:
+			distances = self.get_portal_distances(cluster, [self.portals[portal]])
+			intra_edges[portal] = [ item for item in distances if item[0] != portal ]
+		self._intra_edges[cluster] = intra_edges
+		return intra_edges
+
+	def get_portal_distances(self, cluster, sources, passable=()):
+		"""Returns the distances from sources to the portals of a cluster.
+		@param sources, passable: see get_distances
+		@return: list of (portal, distance in steps from the nearest source) for reachable portals"""
+		portals = self._cluster_portals[cluster]
+		if self._is_open(cluster):
+			get_distance = self.get_distance
+			return [ (portal, min(get_distance(index, self.portals[portal]) for index in sources)) \
+			         for portal in portals ]
+		distances = self.get_distances(cluster, sources, passable)
+		return [ (portal, distances[self.portals[portal]]) for portal in portals \
+		         if self.portals[portal] in distances ]
+
+	def get_distances(self, cluster, sources, passable=(), blocked=()):
+		"""Breadth first search inside of a cluster.
+		@param sources: list of tiles to start from
+		@param passable: tiles that may be entered although they aren't walkable
+		@param blocked: tiles that must not be entered
+		@return: dict { tile : distance in steps from the nearest source }"""
+		clusters, walkable, offsets = self._clusters, self.grid.walkable, self.offsets
+		distances = dict.fromkeys(sources, 0)
+		queue = list(sources)
+		for index in queue: # queue grows while iterating
+			distance = distances[index] + 1
+			for offset in offsets:
+				other = index + offset
+				if clusters[other] == cluster and other not in distances and \
+				   (walkable[other] or other in passable) and other not in blocked:
+					distances[other] = distance
+					queue.append(other)
+		return distances
+
+	def get_path(self, cluster, source, destinations, passable=(), blocked=()):
+		"""Finds a shortest path inside of a cluster.
+		@param source: tile to start from
+		@param destinations: set of tiles, the path ends at the first one that is reached
+		@param passable, blocked: see get_distances
+		@return: list of tiles from source to a destination or None"""
+		if len(destinations) == 1:
+			# try a straight line first, it is as short as possible
+			path = self._get_direct_path(source, iter(destinations).next())
+			for index in path:
+				if not (self.grid.walkable[index] or index in passable) or index in blocked:
+					break
+			else:
+				return path
+		clusters, walkable, offsets = self._clusters, self.grid.walkable, self.offsets
+		previous = { source : None }
+		queue = [source]
+		for index in queue:
+			if index in destinations:
+				path = []
+				while index is not None:
+					path.append(index)
+					index = previous[index]
+				path.reverse()
+				return path
+			for offset in offsets:
+				other = index + offset
+				if clusters[other] == cluster and other not in previous and \
+				   (walkable[other] or other in passable) and other not in blocked:
+					previous[other] = index
+					queue.append(other)
+		return None
+
+	def _get_direct_path(self, source, destination):
+		"""Returns a shortest path from source to destination without considering obstacles"""
+		height = self.grid.height
+		x, y = divmod(source, height)
+		dest_x, dest_y = divmod(destination, height)
+		path = [source]
+		while x != dest_x or y != dest_y:
+			dx = cmp(dest_x, x)
+			dy = cmp(dest_y, y)
+			if not self.diagonal and dx != 0:
+				dy = 0
+			x += dx
+			y += dy
+			path.append(x * height + y)
+		return path
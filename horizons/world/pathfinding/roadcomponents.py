@@ -0,0 +1,142 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+
+
+class RoadComponents(object):
+	"""Connected components of the road network of an island.
+
+	Two buildings are connected by roads (i.e. StaticPather.get_path_on_roads finds a path
+	between them), iff they are adjacent or both are adjacent to roads of the same component.
+	Roads are connected horizontally and vertically, like the road pathfinding.
+
+	The components are kept up to date by IslandPathNodes, which calls add() and remove()
+	whenever a road is built or removed. Every road tile maps directly to the id of its
+	component. When two components are joined, the tiles of the smaller one are relabeled.
+	When roads are removed, only the components they were part of are labeled again, since
+	they might have been split.
+	"""
+	log = logging.getLogger("world.pathfinding")
+
+	def __init__(self, road_coords=()):
+		"""
+		@param road_coords: iterable of (x, y), the initial roads
+		"""
+		self._components = {} # { (x, y) : component id }
+		self._component_coords = {} # { component id : set of (x, y) }
+		self.add(road_coords)
+
+	def add(self, road_coords):
+		"""Adds roads and joins the components they connect. Known roads are ignored.
+		@param road_coords: iterable of (x, y)"""
+		components = self._components
+		for coords in road_coords:
+			if coords in components:
+				continue
+			components[coords] = coords
+			self._component_coords[coords] = set([coords])
+			x, y = coords
+			for neighbor in ((x-1, y), (x+1, y), (x, y-1), (x, y+1)):
+				if neighbor in components:
+					self._join(components[coords], components[neighbor])
+
+	def _join(self, component1, component2):
+		if component1 == component2:
+			return
+		coords1 = self._component_coords[component1]
+		coords2 = self._component_coords[component2]
+		if len(coords1) < len(coords2):
+			component1, component2 = component2, component1
+			coords1, coords2 = coords2, coords1
+		components = self._components
+		for coords in coords2:
+			components[coords] = component1
+		coords1.update(coords2)
+		del self._component_coords[component2]
+
+	def remove(self, road_coords):
+		"""Removes roads and splits their components if necessary.
+		@param road_coords: iterable of (x, y)"""
+		components = self._components
+		changed_components = set()
+		for coords in road_coords:
+			component = components.pop(coords)
+			self._component_coords[component].discard(coords)
+			changed_components.add(component)
+		for component in changed_components:
+			remaining = self._component_coords.pop(component)
+			while remaining:
+				# label everything that is still connected to some remaining road
+				start = remaining.pop()
+				component_coords = set([start])
+				to_check = [start]
+				while to_check:
+					x, y = to_check.pop()
+					for neighbor in ((x-1, y), (x+1, y), (x, y-1), (x, y+1)):
+						if neighbor in remaining:
+							remaining.remove(neighbor)
+							component_coords.add(neighbor)
+							to_check.append(neighbor)
+				for coords in component_coords:
+					components[coords] = start
+				self._component_coords[start] = component_coords
+
+	def get_component(self, coords):
+		"""Returns the id of the component of the road on coords or None if there is no road.
+		Ids are only valid until the roads change."""
+		return self._components.get(coords)
+
+	def same_component(self, coords1, coords2):
+		"""Returns whether there are roads on both coords that are connected."""
+		component = self._components.get(coords1)
+		return component is not None and component == self._components.get(coords2)
+
+	def get_adjacent_components(self, shape):
+		"""Returns the set of ids of the components of the roads on shape or next to it,
+		corners excluded.
+		@param shape: Rect, Point or building"""
+		components = self._components
+		adjacent = set()
+		for coords in self.get_coords_and_border(shape):
+			if coords in components:
+				adjacent.add(components[coords])
+		return adjacent
+
+	def are_connected(self, source, destination):
+		"""Returns whether there is a path on roads from source to destination, like
+		FindPath would find without blocked coords.
+		@param source, destination: Rect, Point or building"""
+		destination = getattr(destination, 'position', destination)
+		if not self.get_coords_and_border(source).isdisjoint(destination.get_coordinates()):
+			return True
+		return not self.get_adjacent_components(source).isdisjoint(self.get_adjacent_components(destination))
+
+	@classmethod
+	def get_coords_and_border(cls, shape):
+		"""Returns the set of coords of shape and the coords next to it horizontally or
+		vertically.
+		@param shape: Rect, Point or building"""
+		shape = getattr(shape, 'position', shape)
+		coords = set(shape.get_coordinates())
+		for x, y in list(coords):
+			coords.update(((x-1, y), (x+1, y), (x, y-1), (x, y+1)))
+		return coords
@@ -49,40 +49,46 @@ class PlayerStats(WorldObject):
 		settlements = 0
 
 		for settlement in self.player.settlements:
-			for building in settlement.buildings:
-				buildings[building.id] += 1
+			# the settlement keeps its buildings sorted by type, so the types only have to be
+			# checked once and only the buildings that hold resources are visited
+			for building_id, settlement_buildings in settlement.buildings_by_id.iteritems():
+				if not settlement_buildings:
+					continue
+				buildings[building_id] += len(settlement_buildings)
+				building_type = settlement_buildings[0]
 
 				# collect info about settlers
-				if building.id == BUILDINGS.RESIDENTIAL_CLASS:
-					settlers[building.level] += building.inhabitants
-					settler_buildings[building.level] += 1
-					for production in building._get_productions():
-						if production is building._get_upgrade_production():
-							continue
-						if production.get_state() is PRODUCTION.STATES.producing:
-							happiness = production.get_produced_res()[RES.HAPPINESS_ID]
-							for resource_id in production.get_consumed_resources():
-								settler_resources_provided[resource_id] += happiness / production.get_production_time()
+				if building_id == BUILDINGS.RESIDENTIAL_CLASS:
+					for building in settlement_buildings:
+						settlers[building.level] += building.inhabitants
+						settler_buildings[building.level] += 1
+						for production in building._get_productions():
+							if production is building._get_upgrade_production():
+								continue
+							if production.get_state() is PRODUCTION.STATES.producing:
+								happiness = production.get_produced_res()[RES.HAPPINESS_ID]
+								for resource_id in production.get_consumed_resources():
+									settler_resources_provided[resource_id] += happiness / production.get_production_time()
 
 				# resources held in buildings
-				if hasattr(building, 'inventory') and building.id not in [BUILDINGS.BRANCH_OFFICE_CLASS, BUILDINGS.STORAGE_CLASS, BUILDINGS.MAIN_SQUARE_CLASS]:
-					for resource_id, amount in building.inventory:
-						total_resources[resource_id] += amount
+				if hasattr(building_type, 'inventory') and building_id not in [BUILDINGS.BRANCH_OFFICE_CLASS, BUILDINGS.STORAGE_CLASS, BUILDINGS.MAIN_SQUARE_CLASS]:
+					for building in settlement_buildings:
+						for resource_id, amount in building.inventory:
+							total_resources[resource_id] += amount
 
 				# resource held by collectors
-				if hasattr(building, 'get_local_collectors'):
-					for collector in building.get_local_collectors():
-						for resource_id, amount in collector.inventory:
-							total_resources[resource_id] += amount
+				if hasattr(building_type, 'get_local_collectors'):
+					for building in settlement_buildings:
+						for collector in building.get_local_collectors():
+							for resource_id, amount in collector.inventory:
+								total_resources[resource_id] += amount
 
 			# resources in settlement inventories
 			for resource_id, amount in settlement.inventory:
 				available_resources[resource_id] += amount
 
 			# land that could be built on (the building on it may need to be destroyed first)
-			for tile in settlement.ground_map.itervalues():
-				if 'constructible' in tile.classes:
-					usable_land += 1
+			usable_land += settlement.usable_land
 
 			settlements += 1
 			running_costs += settlement.cumulative_running_costs
@@ -48,6 +48,14 @@ class ProductionLine(object):
 			cls._data[ident] = _ProductionLineData(ident)
 			return cls._data[ident]
 
+	@classmethod
+	def load_data(cls, data):
+		"""Creates the templates of many production lines at once.
+		@param data: { id : return value of _ProductionLineData.get_data }"""
+		for ident, line_data in data.iteritems():
+			if ident not in cls._data:
+				cls._data[ident] = _ProductionLineData(ident, line_data)
+
 	@classmethod
 	def reset(cls):
 		cls._data.clear()
@@ -106,11 +114,14 @@ class ProductionLine(object):
 
 class _ProductionLineData(object):
 	"""Actually saves the data under the hood. Internal Use Only!"""
-	def __init__(self, ident):
-		"""Inits self from db and registers itself as template"""
+	def __init__(self, ident, data=None):
+		"""Inits self from db and registers itself as template
+		@param data: return value of get_data, read from db if None"""
 		self._init_finished = False
 		self.id = ident
-		db_data = horizons.main.db("SELECT time, changes_animation, save_statistics FROM production_line WHERE id = ?", self.id)[0]
+		if data is None:
+			data = self.get_data(horizons.main.db, ident)
+		db_data, production, unit_production = data
 		self.time = float(db_data[0]) # time in seconds that production takes
 		self.changes_animation = bool(db_data[1]) # whether this prodline influences animation
 		self.save_statistics = bool(db_data[2]) # whether statistics about this production line should be kept
@@ -119,7 +130,7 @@ class _ProductionLineData(object):
 		self.production = {}
 		self.produced_res = {} # contains only produced
 		self.consumed_res = {} # contains only consumed
-		for res, amount in horizons.main.db("SELECT resource, amount FROM production WHERE production_line = ?", self.id):
+		for res, amount in production:
 			self.production[res] = amount
 			if amount > 0:
 				self.produced_res[res] = amount
@@ -129,11 +140,19 @@ class _ProductionLineData(object):
 				assert False
 		# Stores unit_id: amount entries, if units are to be produced by this production line
 		self.unit_production = {}
-		for unit, amount in horizons.main.db("SELECT unit, amount FROM unit_production WHERE production_line = ?", self.id):
+		for unit, amount in unit_production:
 			self.unit_production[int(unit)] = amount # Store the correct unit id =>  -1.000.000
 
 		self._init_finished = True
 
+	@staticmethod
+	def get_data(db, ident):
+		"""Returns the data of a production line in the db. It only consists of builtin types.
+		@return: tuple: ((time, changes_animation, save_statistics), production, unit_production)"""
+		return (db("SELECT time, changes_animation, save_statistics FROM production_line WHERE id = ?", ident)[0],
+		        db("SELECT resource, amount FROM production WHERE production_line = ?", ident).rows,
+		        db("SELECT unit, amount FROM unit_production WHERE production_line = ?", ident).rows)
+
 	def __setattr__(self, name, value):
 		if hasattr(self, "_init_finished") and self._init_finished:
 			raise TypeError, 'ProductionLineData is const, use ProductionLine'
@@ -26,6 +26,7 @@ from horizons.world.storageholder import StorageHolder
 from horizons.world.storage import PositiveSizedSlotStorage
 from horizons.util import WorldObject, WeakList, NamedObject
 from horizons.constants import BUILDINGS, SETTLER
+from horizons.scenario import CHANGES
 
 class Settlement(TradePost, StorageHolder, NamedObject):
 	"""The Settlement class describes a settlement and stores all the necessary information
@@ -42,6 +43,7 @@ class Settlement(TradePost, StorageHolder, NamedObject):
 		self.owner = owner
 		self.buildings = []
 		self.ground_map = {} # this is the same as in island.py. it uses hard references to the tiles too
+		self.usable_land = 0 # number of constructible tiles in ground_map, counted by the island
 		self.produced_res = {} # dictionary of all resources, produced at this settlement
 		self.buildings_by_id = {}
 		self.branch_office = None # this is set later in the same tick by the bo itself or load() here
@@ -90,8 +92,9 @@ class Settlement(TradePost, StorageHolder, NamedObject):
 	@property
 	def cumulative_taxes(self):
 		"""Return sum of all taxes payed in this settlement in 1 tax round"""
-		return sum([building.last_tax_payed for building in self.buildings if \
-								hasattr(building, 'last_tax_payed')])
+		# only settlers pay taxes
+		return sum([building.last_tax_payed for building in \
+		            self.get_buildings_by_id(BUILDINGS.RESIDENTIAL_CLASS)])
 
 	@property
 	def balance(self):
@@ -113,6 +116,10 @@ class Settlement(TradePost, StorageHolder, NamedObject):
 	def create_inventory(self):
 		self.inventory = PositiveSizedSlotStorage(0)
 
+	def get_inventory_checkup_hash_value(self):
+		"""Returns the inventory in the form that is compared between multiplayer clients"""
+		return tuple(sorted(self.inventory))
+
 	def save(self, db, islandid):
 		super(Settlement, self).save(db)
 
@@ -173,6 +180,7 @@ class Settlement(TradePost, StorageHolder, NamedObject):
 		@see Island.add_building
 		"""
 		self.buildings.append(building)
+		self.session.scenario_eventhandler.notify_change(CHANGES.buildings)
 		if building.id in self.buildings_by_id:
 			self.buildings_by_id[building.id].append(building)
 		else:
@@ -187,6 +195,7 @@ class Settlement(TradePost, StorageHolder, NamedObject):
 		"""Properly removes a building from the settlement"""
 		self.buildings.remove(building)
 		self.buildings_by_id[building.id].remove(building)
+		self.session.scenario_eventhandler.notify_change(CHANGES.buildings)
 		if hasattr(building, "remove_building_production_finished_listener"):
 			building.remove_building_production_finished_listener(self.settlement_building_production_finished)
 		if hasattr(self.owner, 'remove_building'):
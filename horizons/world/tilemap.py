@@ -0,0 +1,139 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from array import array
+
+
+class TileMap(object):
+	"""
+	Dense map of the tiles of a rectangular area, used by the world for the whole map.
+
+	The tiles are kept in a list indexed by position instead of a dict keyed by (x, y) tuples,
+	which saves the key tuples and the hash table. Additionally, the island each tile
+	belongs to is stored as index into the islands list in a typed array.
+
+	The read-only part of the dict interface with (x, y) tuples as keys is supported, so that
+	the map can be passed to code that expects a dict of tiles. Iteration is in x, y order.
+	"""
+
+	def __init__(self, left, top, width, height):
+		"""
+		@param left, top: coordinates of the top left tile of the area
+		@param width, height: size of the area
+		"""
+		self.left = left
+		self.top = top
+		self.width = width
+		self.height = height
+		self._tiles = [None] * (width * height)
+		self._island_ids = array('H', [0]) * (width * height) # index in self._islands + 1, 0 means no island
+		self._islands = []
+		self._island_ids_by_island = {} # { island : island id used in self._island_ids }
+		# everything a lookup needs in one tuple, so that the getters of the world can inline the
+		# lookup with a single attribute access. The sequences are only changed in place.
+		self.lookup_fields = (left, top, width, height, self._tiles, self._island_ids, self._islands)
+		self._len = 0
+
+	def _get_index(self, x, y):
+		"""Returns the list index of the coordinates or -1 if they are not in the area"""
+		x -= self.left
+		y -= self.top
+		if 0 <= x < self.width and 0 <= y < self.height:
+			return x * self.height + y
+		return -1
+
+	def get_tile(self, x, y):
+		"""Returns the tile at (x, y) or None if there is none"""
+		x -= self.left
+		y -= self.top
+		if 0 <= x < self.width and 0 <= y < self.height:
+			return self._tiles[x * self.height + y]
+		return None
+
+	def get_island(self, x, y):
+		"""Returns the island of the tile at (x, y) or None if there is none"""
+		x -= self.left
+		y -= self.top
+		if 0 <= x < self.width and 0 <= y < self.height:
+			island_id = self._island_ids[x * self.height + y]
+			if island_id:
+				return self._islands[island_id - 1]
+		return None
+
+	def set_tile(self, x, y, tile, island=None):
+		"""Puts a tile on the map
+		@param tile: tile instance or None to remove the tile
+		@param island: island the tile belongs to or None
+		"""
+		index = self._get_index(x, y)
+		if index == -1:
+			raise KeyError((x, y))
+		if self._tiles[index] is None:
+			self._len += tile is not None
+		elif tile is None:
+			self._len -= 1
+		self._tiles[index] = tile
+		if island is None or tile is None:
+			self._island_ids[index] = 0
+		else:
+			if island not in self._island_ids_by_island:
+				self._islands.append(island)
+				self._island_ids_by_island[island] = len(self._islands)
+			self._island_ids[index] = self._island_ids_by_island[island]
+
+	def __len__(self):
+		return self._len
+
+	def __contains__(self, coords):
+		return self.get_tile(*coords) is not None
+
+	def __getitem__(self, coords):
+		tile = self.get_tile(*coords)
+		if tile is None:
+			raise KeyError(coords)
+		return tile
+
+	def get(self, coords, default=None):
+		tile = self.get_tile(*coords)
+		return default if tile is None else tile
+
+	def iteritems(self):
+		tiles = self._tiles
+		for x in xrange(self.width):
+			offset = x * self.height
+			for y in xrange(self.height):
+				tile = tiles[offset + y]
+				if tile is not None:
+					yield (self.left + x, self.top + y), tile
+
+	def iterkeys(self):
+		for coords, tile in self.iteritems():
+			yield coords
+
+	def itervalues(self):
+		for tile in self._tiles:
+			if tile is not None:
+				yield tile
+
+	__iter__ = iterkeys
+
+	def keys(self):
+		return list(self.iterkeys())
@@ -29,9 +29,10 @@ import horizons.main
 from horizons.util import ActionSetLoader
 
 class UnitClass(type):
-	def __new__(self, db, id):
+	def __new__(self, db, id, data=None):
 		"""
 		@param id: unit id
+		@param data: return value of get_data, read from db if None
 		"""
 		log = logging.getLogger('world.units')
 
@@ -45,28 +46,48 @@ class UnitClass(type):
 		attributes = {'load': load}
 		#attributes.update(db("SELECT name, value FROM unit_property WHERE unit = ?", str(id)))
 
-		self.class_package,  self.class_name = db("SELECT class_package, class_type FROM unit WHERE id = ?", id)[0]
+		if data is None:
+			self.class_package,  self.class_name = db("SELECT class_package, class_type FROM unit WHERE id = ?", id)[0]
+		else:
+			self.class_package,  self.class_name = data['class_package'], data['class_name']
 		__import__('horizons.world.units.'+self.class_package)
 
 		return type.__new__(self, 'Unit[' + str(id) + ']',
 			(getattr(globals()[self.class_package], self.class_name),),
 			attributes)
 
-	def __init__(self, db, id, **kwargs):
+	def __init__(self, db, id, data=None, **kwargs):
 		"""
 		@param id: unit id.
+		@param data: return value of get_data, read from db if None
 		"""
 		super(UnitClass, self).__init__(self, **kwargs)
+		if data is None:
+			data = UnitClass.get_data(db, id)
 		self.id = id
 		self._object = None
-		self._loadObject(db)
-		self.radius = int(db("SELECT radius FROM unit WHERE id=?", id)[0][0])
+		self._loadObject(data['action_sets'])
+		self.radius = data['radius']
+		self.soundfiles = data['soundfiles']
+
+	@staticmethod
+	def get_data(db, id):
+		"""Returns the data of a unit class in the db. It only consists of builtin types.
+		@return: dict"""
+		data = {}
+		data['class_package'], data['class_name'], radius = \
+		    db("SELECT class_package, class_type, radius FROM unit WHERE id = ?", id)[0]
+		data['radius'] = int(radius)
 		soundfiles = db("SELECT file FROM sounds INNER JOIN object_sounds ON \
-			sounds.rowid = object_sounds.sound AND object_sounds.object = ?", self.id)
-		self.soundfiles = [ i[0] for i in soundfiles ]
+			sounds.rowid = object_sounds.sound AND object_sounds.object = ?", id)
+		data['soundfiles'] = [ i[0] for i in soundfiles ]
+		data['action_sets'] = [ action_set_id for (action_set_id,) in \
+		                        db("SELECT action_set_id FROM action_set WHERE object_id=?", id) ]
+		return data
 
-	def _loadObject(cls, db):
+	def _loadObject(cls, action_sets):
 		"""Loads the object with all animations.
+		@param action_sets: ids of the action sets of the unit
 		"""
 		cls.log.debug('Loading unit %s', cls.id)
 		try:
@@ -78,12 +99,12 @@ class UnitClass(type):
 		cls._object.setPather(horizons.main.fife.engine.getModel().getPather('RoutePather'))
 		cls._object.setBlocking(False)
 		cls._object.setStatic(False)
-		action_sets = ActionSetLoader.get_action_sets()
-		for (action_set_id,) in db("SELECT action_set_id FROM action_set WHERE object_id=?", cls.id):
-			for action_id in action_sets[action_set_id].iterkeys():
+		all_action_sets = ActionSetLoader.get_action_sets()
+		for action_set_id in action_sets:
+			for action_id in all_action_sets[action_set_id].iterkeys():
 				action = cls._object.createAction(action_id+"_"+str(action_set_id))
 				fife.ActionVisual.create(action)
-				for rotation in action_sets[action_set_id][action_id].iterkeys():
+				for rotation in all_action_sets[action_set_id][action_id].iterkeys():
 					anim = horizons.main.fife.animationloader.loadResource( \
 						str(action_set_id)+"-"+str(action_id)+"-"+ \
 						str(rotation) + ':shift:center+0,bottom+8')
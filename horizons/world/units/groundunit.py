@@ -46,6 +46,8 @@ class GroundUnit(Unit):
 	def __init__(self, x, y, **kwargs):
 		super(GroundUnit, self).__init__(x=x, y=y, **kwargs)
 		self.session.world.ground_units.append(self)
+		self.session.world.ground_unit_index.add(self, self.position)
+		self._spatial_index = self.session.world.ground_unit_index
 		self.session.world.ground_unit_map[self.position.to_tuple()] = weakref.ref(self)
 		self.add_component('health', HealthComponent)
 
@@ -55,6 +57,8 @@ class GroundUnit(Unit):
 			self.session.selected_instances.remove(self)
 		super(GroundUnit, self).remove()
 		self.session.world.ground_units.remove(self)
+		self.session.world.ground_unit_index.remove(self)
+		self._spatial_index = None
 		if self.session.view.has_change_listener(self.draw_health):
 			self.session.view.remove_change_listener(self.draw_health)
 		del self.session.world.ground_unit_map[self.position.to_tuple()]
@@ -120,6 +124,8 @@ class GroundUnit(Unit):
 
 		# register unit in world
 		self.session.world.ground_units.append(self)
+		self.session.world.ground_unit_index.add(self, self.position)
+		self._spatial_index = self.session.world.ground_unit_index
 		self.session.world.ground_unit_map[self.position.to_tuple()] = weakref.ref(self)
 
 class FightingGroundUnit(MovingWeaponHolder, GroundUnit):
@@ -66,6 +66,8 @@ class MovingObject(ConcretObject):
 		self.position = Point(x, y)
 		self.last_position = Point(x, y)
 		self._next_target = Point(x, y)
+		# SpatialIndex that has to know the position, set by subclasses
+		self._spatial_index = None
 
 		self.move_callbacks = WeakMethodList()
 		self.blocked_callbacks = WeakMethodList()
@@ -164,6 +166,8 @@ class MovingObject(ConcretObject):
 			#self.log.debug("%s move tick from %s to %s", self, self.last_position, self._next_target)
 			self.last_position = self.position
 			self.position = self._next_target
+			if self._spatial_index is not None:
+				self._spatial_index.move(self, self.position)
 			fife_location.setExactLayerCoordinates(fife.ExactModelCoordinate(self.position.x, self.position.y, 0))
 			# it's safe to use location here (thisown is 0, set by swig, and setLocation uses reference)
 			self._instance.setLocation(fife_location)
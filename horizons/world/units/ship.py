@@ -39,6 +39,7 @@ from horizons.command.uioptions import TransferResource
 from horizons.constants import LAYERS, STORAGE, GAME_SPEED
 from horizons.scheduler import Scheduler
 from horizons.world.component.healthcomponent import HealthComponent
+from horizons.scenario import CHANGES
 
 class ShipRoute(object):
 	"""
@@ -312,12 +313,19 @@ class Ship(NamedObject, StorageHolder, Unit):
 		if self.__class__.has_health:
 			self.add_component('health', HealthComponent)
 		self.session.world.ships.append(self)
+		self.session.scenario_eventhandler.notify_change(CHANGES.ships)
+		self.session.world.ship_index.add(self, self.position)
+		self._spatial_index = self.session.world.ship_index
+		self.session.world.checkup_hash.track(('ship', self.worldid), self, self.get_checkup_hash_value)
 		if self.in_ship_map:
 			self.session.world.ship_map[self.position.to_tuple()] = weakref.ref(self)
 
 	def remove(self):
 		super(Ship, self).remove()
 		self.session.world.ships.remove(self)
+		self.session.scenario_eventhandler.notify_change(CHANGES.ships)
+		self.session.world.ship_index.remove(self)
+		self._spatial_index = None
 		if self.session.view.has_change_listener(self.draw_health):
 			self.session.view.remove_change_listener(self.draw_health)
 		if self.in_ship_map:
@@ -330,6 +338,10 @@ class Ship(NamedObject, StorageHolder, Unit):
 			if self in self.session.selected_instances:
 				self.session.selected_instances.remove(self)
 
+	def get_checkup_hash_value(self):
+		"""Returns the data of the ship that is compared between multiplayer clients"""
+		return (self.owner.worldid, self.position.to_tuple())
+
 	def create_inventory(self):
 		self.inventory = PositiveTotalNumSlotsStorage(STORAGE.SHIP_TOTAL_STORAGE, STORAGE.SHIP_TOTAL_SLOTS_NUMBER)
 
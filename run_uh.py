@@ -131,8 +131,12 @@ def get_option_parser():
 				               default=False, help=_("For internal use only."))
 	dev_group.add_option("--profile", dest="profile", action="store_true", \
 				               default=False, help=_("Enable profiling (for developing only)."))
+	dev_group.add_option("--profile-ticks", dest="profile_ticks", action="store_true", \
+				               default=False, help=_("Measure the time spent in scheduled calls, the data is written to the log directory when the game ends (for developing only)."))
 	dev_group.add_option("--max-ticks", dest="max_ticks", metavar="<max_ticks>", type="int", \
 				               help=_("Run the game for <max_ticks> ticks."))
+	dev_group.add_option("--headless", dest="headless", action="store_true", \
+				               default=False, help=_("Run the game given by --load-map or --start-map without gui and as fast as possible for --max-ticks ticks (for balancing and AI tests)."))
 	dev_group.add_option("--string-previewer", dest="stringpreview", action="store_true", \
 				               default=False, help=_("Enable the string previewer tool for scenario writers"))
 	dev_group.add_option("--no-preload", dest="nopreload", action="store_true", \
@@ -219,7 +223,10 @@ def main():
 	#start UH
 	import horizons.main
 	ret = True
-	if not options.profile:
+	if options.headless:
+		# no gui, no tick pacing
+		ret = horizons.main.start_headless(options)
+	elif not options.profile:
 		# start normal
 		ret = horizons.main.start(options)
 	else:
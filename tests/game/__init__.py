@@ -41,14 +41,9 @@ from horizons.ai.aiplayer import AIPlayer
 from horizons.ai.trader import Trader
 from horizons.command.building import Build
 from horizons.command.unit import CreateUnit
-from horizons.constants import PATHS, GROUND, UNITS, BUILDINGS, GAME_SPEED, RES
-from horizons.entities import Entities
-from horizons.ext.dummy import Dummy
-from horizons.extscheduler import ExtScheduler
-from horizons.scheduler import Scheduler
-from horizons.spsession import SPSession
-from horizons.util import (Color, DbReader, Rect, WorldObject, NamedObject, LivingObject,
-						   SavegameAccessor, Point, DifficultySettings)
+from horizons.constants import PATHS, GROUND, UNITS, BUILDINGS, RES
+from horizons.headless import HeadlessSession
+from horizons.util import Color, DbReader, Rect, SavegameAccessor, Point, DifficultySettings
 from horizons.world import World
 
 
@@ -103,42 +98,7 @@ def create_map():
 	return savegame
 
 
-class SPTestSession(SPSession):
-
-	def __init__(self, db, rng_seed=None):
-		"""
-		Unfortunately, right now there is no other way to setup Dummy versions of the GUI,
-		View etc., unless we want to patch the references in the session module.
-		"""
-		super(LivingObject, self).__init__()
-		self.gui = Dummy()
-		self.db = db
-		self.savecounter = 0	# this is a new game.
-		self.is_alive = True
-
-		WorldObject.reset()
-		NamedObject.reset()
-		AIPlayer.clear_caches()
-
-		# Game
-		self.current_tick = 0
-		self.random = self.create_rng(rng_seed)
-		self.timer = self.create_timer()
-		Scheduler.create_instance(self.timer)
-		ExtScheduler.create_instance(Dummy)
-		self.manager = self.create_manager()
-		self.view = Dummy()
-		self.view.renderer = Dummy()
-		Entities.load(self.db)
-		self.scenario_eventhandler = Dummy()
-		self.campaign = {}
-		self.selected_instances = []
-
-		# GUI
-		self.gui.session = self
-		self.ingame_gui = Dummy()
-
-		GAME_SPEED.TICKS_PER_SECOND = 16
+class SPTestSession(HeadlessSession):
 
 	def load(self, savegame, players):
 		"""
@@ -158,32 +118,22 @@ class SPTestSession(SPSession):
 		"""
 		Clean up temporary files.
 		"""
-		super(SPTestSession, self).end()
 		# Find all islands in the map first
 		random_map = False
+		island_files = []
 		for (island_file, ) in self.savegame_db('SELECT file FROM island'):
 			if island_file[:7] != 'random:': # random islands don't exist as files
-				os.remove(island_file)
+				island_files.append(island_file)
 			else:
 				random_map = True
 				break
+		super(SPTestSession, self).end()
+		for island_file in island_files:
+			os.remove(island_file)
 		# Finally remove savegame
-		self.savegame_db.close()
 		if not random_map:
 			os.remove(self.savegame)
 
-	def run(self, ticks=1, seconds=None):
-		"""
-		Run the scheduler the given count of ticks or (in-game) seconds. Default is 1 tick,
-		if seconds are passed, they will overwrite the tick count.
-		"""
-		if seconds:
-			ticks = self.timer.get_ticks(seconds)
-
-		for i in range(ticks):
-			Scheduler().tick(self.current_tick)
-			self.current_tick += 1
-
 
 def new_session(mapgen=create_map, rng_seed=RANDOM_SEED, human_player = True, ai_players = 0):
 	"""
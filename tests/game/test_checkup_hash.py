@@ -0,0 +1,66 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.command.building import Build
+from horizons.command.unit import CreateUnit
+from horizons.constants import BUILDINGS, UNITS
+from horizons.util import IncrementalHash, Point
+
+from tests.game import game_test, settle
+
+
+def recalculate(session):
+	"""Calculates the checkup hash from scratch, returns (digest, values)"""
+	world = session.world
+	expected = IncrementalHash()
+	values = world.get_checkup_hash_details()
+	expected.update('rngvalue', values['rngvalue'])
+	for settlement in world.settlements:
+		expected.update(('settlement', settlement.worldid), values[('settlement', settlement.worldid)])
+		expected.update(('inventory', settlement.worldid), settlement.get_inventory_checkup_hash_value())
+	for ship in world.ships:
+		expected.update(('ship', ship.worldid), ship.get_checkup_hash_value())
+	return expected.get_digest(), expected.get_values()
+
+
+@game_test(timeout=15)
+def test_incremental_checkup_hash(s, p):
+	"""
+	The incrementally updated checkup hash matches the one calculated from scratch.
+	"""
+	settlement, island = settle(s)
+	ship = CreateUnit(p.worldid, UNITS.PLAYER_SHIP_CLASS, 20, 20)(p)
+	ship.move(Point(5, 5))
+
+	digest = s.world.get_checkup_hash()
+	assert len(digest) == 16
+	assert (digest, s.world.get_checkup_hash_details()) == recalculate(s)
+
+	Build(BUILDINGS.LUMBERJACK_CLASS, 30, 25, island, settlement=settlement)(p)
+	s.run(seconds=5)
+	digest = s.world.get_checkup_hash()
+	assert (digest, s.world.get_checkup_hash_details()) == recalculate(s)
+
+	ship.remove()
+	s.run(ticks=1)
+	new_digest = s.world.get_checkup_hash()
+	assert new_digest != digest
+	assert (new_digest, s.world.get_checkup_hash_details()) == recalculate(s)
@@ -0,0 +1,53 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.command.building import Build
+from horizons.constants import RES, BUILDINGS
+
+from tests.game import game_test, settle
+
+
+@game_test
+def test_run_ticks(s, p):
+	"""
+	The session runs exactly the given number of ticks.
+	"""
+	assert s.run(ticks=10) == 10
+	assert s.current_tick == 10
+	assert s.run(seconds=2) == s.timer.get_ticks(2)
+
+
+@game_test(timeout=15)
+def test_run_until(s, p):
+	"""
+	Run until the pasture has produced wool, the predicate is checked before every tick.
+	"""
+	settlement, island = settle(s)
+	pasture = Build(BUILDINGS.PASTURE_CLASS, 30, 30, island, settlement=settlement)(p)
+	assert pasture
+
+	ticks = s.run(ticks=None, until=lambda: pasture.inventory[RES.LAMB_WOOL_ID] > 0)
+	assert pasture.inventory[RES.LAMB_WOOL_ID]
+	assert 0 < ticks <= s.timer.get_ticks(31)
+
+	# predicate holds already, nothing to do
+	assert s.run(ticks=None, until=lambda: True) == 0
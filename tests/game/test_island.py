@@ -0,0 +1,72 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.command.building import Build
+from horizons.constants import BUILDINGS
+from horizons.util import random_map
+from horizons.world.pathfinding.pather import StaticPather
+
+from tests.game import game_test, settle
+
+
+def create_random_map():
+	return random_map.generate_map(5, 120, 50, 50, 40, 10)
+
+@game_test(mapgen=create_random_map, human_player=False)
+def test_building_areas(s, p):
+	"""
+	The buildability cache contains exactly the positions where a building of the size fits
+	on the island.
+	"""
+	for island in s.world.islands:
+		for (size_x, size_y), building_areas in island.last_changed.iteritems():
+			expected = set()
+			for x, y in island.ground_map:
+				if all((x + dx, y + dy) in island.ground_map for dx in xrange(size_x) for dy in xrange(size_y)):
+					expected.add((x, y))
+			assert set(building_areas) == expected
+
+
+@game_test
+def test_reachable_buildings(s, p):
+	"""
+	The buildings that are reachable on roads are updated when roads are built and torn down.
+	"""
+	settlement, island = settle(s)
+	branch_office = settlement.branch_office
+	path_nodes = island.path_nodes
+
+	jack = Build(BUILDINGS.LUMBERJACK_CLASS, 30, 28, island, settlement=settlement)(p)
+	assert jack
+	assert not path_nodes.get_reachable_buildings(branch_office, BUILDINGS.LUMBERJACK_CLASS)
+
+	path = StaticPather.get_direct_path(island, jack, branch_office)
+	assert path
+	roads = [Build(BUILDINGS.TRAIL_CLASS, x, y, island, settlement=settlement)(p) for (x, y) in path \
+	         if not jack.position.contains_tuple((x, y)) and not branch_office.position.contains_tuple((x, y))]
+	assert all(roads)
+	assert path_nodes.get_reachable_buildings(branch_office, BUILDINGS.LUMBERJACK_CLASS) == [jack]
+	assert path_nodes.get_reachable_buildings(jack, BUILDINGS.BRANCH_OFFICE_CLASS) == [branch_office]
+
+	# Tear is a no-op without fife instances
+	roads[len(roads) // 2].remove()
+	assert not path_nodes.get_reachable_buildings(branch_office, BUILDINGS.LUMBERJACK_CLASS)
+	assert StaticPather.get_path_on_roads(island, jack, branch_office) is None
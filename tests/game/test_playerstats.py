@@ -0,0 +1,148 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from collections import defaultdict
+from itertools import product
+
+from horizons.command.building import Build
+from horizons.constants import BUILDINGS, PRODUCTION, RES
+from horizons.world.playerstats import PlayerStats
+
+from tests.game import game_test, settle
+
+
+class FullPlayerStats(PlayerStats):
+	"""PlayerStats that walks every building and tile of the settlements like it used to"""
+
+	def _collect_info(self):
+		settlers = defaultdict(lambda: 0)
+		settler_buildings = defaultdict(lambda: 0)
+		settler_resources_provided = defaultdict(lambda: 0)
+		buildings = defaultdict(lambda: 0)
+		available_resources = defaultdict(lambda: 0)
+		total_resources = defaultdict(lambda: 0)
+		ships = defaultdict(lambda: 0)
+		running_costs = 0
+		taxes = 0
+		usable_land = 0
+		settlements = 0
+
+		for settlement in self.player.settlements:
+			for building in settlement.buildings:
+				buildings[building.id] += 1
+				running_costs += building.running_costs
+				if building.id == BUILDINGS.RESIDENTIAL_CLASS:
+					taxes += building.last_tax_payed
+					settlers[building.level] += building.inhabitants
+					settler_buildings[building.level] += 1
+					for production in building._get_productions():
+						if production is building._get_upgrade_production():
+							continue
+						if production.get_state() is PRODUCTION.STATES.producing:
+							happiness = production.get_produced_res()[RES.HAPPINESS_ID]
+							for resource_id in production.get_consumed_resources():
+								settler_resources_provided[resource_id] += happiness / production.get_production_time()
+				if hasattr(building, 'inventory') and building.id not in [BUILDINGS.BRANCH_OFFICE_CLASS, BUILDINGS.STORAGE_CLASS, BUILDINGS.MAIN_SQUARE_CLASS]:
+					for resource_id, amount in building.inventory:
+						total_resources[resource_id] += amount
+				if hasattr(building, 'get_local_collectors'):
+					for collector in building.get_local_collectors():
+						for resource_id, amount in collector.inventory:
+							total_resources[resource_id] += amount
+			for resource_id, amount in settlement.inventory:
+				available_resources[resource_id] += amount
+			for tile in settlement.ground_map.itervalues():
+				if 'constructible' in tile.classes:
+					usable_land += 1
+			settlements += 1
+
+		for ship in self.player.session.world.ships:
+			if ship.owner is self.player:
+				ships[ship.id] += 1
+				if ship.is_selectable:
+					for resource_id, amount in ship.inventory:
+						available_resources[resource_id] += amount
+
+		for resource_id, amount in available_resources.iteritems():
+			total_resources[resource_id] += amount
+
+		self._calculate_settler_score(settlers, settler_buildings, settler_resources_provided)
+		self._calculate_building_score(buildings)
+		self._calculate_resource_score(available_resources, total_resources)
+		self._calculate_unit_score(ships)
+		self._calculate_land_score(usable_land, settlements)
+		self._calculate_money_score(running_costs, taxes, self.player.inventory[RES.GOLD_ID])
+		self._calculate_total_score()
+
+
+def assert_stats_equal(player):
+	stats = PlayerStats(player)
+	full_stats = FullPlayerStats(player)
+	for score in ('settler_score', 'building_score', 'resource_score', 'unit_score', \
+	              'land_score', 'money_score', 'total_score'):
+		assert getattr(stats, score) == getattr(full_stats, score), score
+
+
+@game_test(timeout=20)
+def test_incremental_stats(s, p):
+	"""
+	The stats that are collected from the counters of the settlements are the same as the ones
+	collected by walking every building and tile.
+	"""
+	settlement, island = settle(s)
+	assert_stats_equal(p)
+
+	for (x, y) in product(range(23, 38), repeat=2):
+		if s.random.randint(0, 1) == 1:
+			tree = Build(BUILDINGS.TREE_CLASS, x, y, island, settlement=settlement)(p)
+			if tree:
+				tree.finish_production_now()
+	jack = Build(BUILDINGS.LUMBERJACK_CLASS, 25, 30, island, settlement=settlement)(p)
+	assert jack
+	for (x, y) in ((30, 26), (32, 26), (30, 28), (32, 28)):
+		Build(BUILDINGS.RESIDENTIAL_CLASS, x, y, island, settlement=settlement)(p)
+	assert settlement.get_buildings_by_id(BUILDINGS.RESIDENTIAL_CLASS)
+	assert settlement.usable_land == \
+	       len([tile for tile in settlement.ground_map.itervalues() if 'constructible' in tile.classes])
+
+	s.run(seconds=60)
+	assert_stats_equal(p)
+
+	# Tear is a no-op without fife instances
+	jack.remove()
+	assert_stats_equal(p)
+
+
+@game_test
+def test_inactive_running_costs(s, p):
+	"""
+	Inactive buildings pay their inactive running costs, which the stats have to respect.
+	"""
+	settlement, island = settle(s)
+	jacks = [Build(BUILDINGS.LUMBERJACK_CLASS, x, 30, island, settlement=settlement)(p) for x in (25, 30)]
+	assert all(jacks)
+	jacks[1].set_active(active=False)
+	assert jacks[0].running_costs != jacks[1].running_costs
+
+	assert settlement.cumulative_running_costs == \
+	       sum([building.running_costs for building in settlement.buildings])
+	assert_stats_equal(p)
@@ -0,0 +1,82 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.command.building import Build
+from horizons.constants import BUILDINGS
+from horizons.scenario import CONDITIONS, ScenarioEventHandler
+from horizons.scenario.conditions import _building_connected_to_any_of
+from horizons.world.pathfinding.pather import StaticPather
+
+from tests.game import game_test, settle
+
+
+def count_connected_by_path(settlement, building_class, *classes):
+	"""Counts the connected buildings with path searches, like the conditions used to"""
+	targets = [b for b in settlement.buildings if b.id in classes]
+	return len([b for b in settlement.get_buildings_by_id(building_class) if \
+	            any(StaticPather.get_path_on_roads(b.island, b, target) for target in targets)])
+
+
+@game_test
+def test_buildings_connected(s, p):
+	"""
+	The road components find the same connections as path searches on the roads.
+	"""
+	settlement, island = settle(s)
+	branch_office = settlement.branch_office
+
+	jacks = [Build(BUILDINGS.LUMBERJACK_CLASS, x, 26, island, settlement=settlement)(p) for x in (25, 30, 35)]
+	assert all(jacks)
+	path = StaticPather.get_direct_path(island, jacks[0], branch_office)
+	assert path
+	roads = [Build(BUILDINGS.TRAIL_CLASS, x, y, island, settlement=settlement)(p) for (x, y) in path \
+	         if not jacks[0].position.contains_tuple((x, y)) and not branch_office.position.contains_tuple((x, y))]
+	assert all(roads)
+
+	classes = (BUILDINGS.LUMBERJACK_CLASS, BUILDINGS.BRANCH_OFFICE_CLASS, BUILDINGS.STORAGE_CLASS)
+	count = _building_connected_to_any_of(s, *classes)
+	assert count >= 1
+	assert count == count_connected_by_path(settlement, *classes)
+
+	# Tear is a no-op without fife instances
+	roads[len(roads) // 2].remove()
+	assert _building_connected_to_any_of(s, *classes) == count_connected_by_path(settlement, *classes)
+
+
+@game_test
+def test_changed_conditions(s, p):
+	"""
+	Conditions that depend on changes are only checked again after a change was notified.
+	"""
+	# the headless session has no scenario event handler
+	handler = s.scenario_eventhandler = ScenarioEventHandler(s)
+	handler._scheduled_check()
+	assert not handler._changed_conditions
+
+	settlement, island = settle(s)
+	assert CONDITIONS.building_num_of_type_greater in handler._changed_conditions
+	assert CONDITIONS.buildings_connected_to_branch_gt in handler._changed_conditions
+	handler._scheduled_check()
+	assert not handler._changed_conditions
+
+	Build(BUILDINGS.TRAIL_CLASS, 30, 30, island, settlement=settlement)(p)
+	assert CONDITIONS.buildings_connected_to_building_lt in handler._changed_conditions
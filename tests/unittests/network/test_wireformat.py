@@ -0,0 +1,125 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import cPickle
+import unittest
+
+import horizons.world # needs to be imported before the commands
+from horizons.command.building import Build
+from horizons.command.uioptions import SetTaxSetting
+from horizons.manager import CommandPacket, CheckupHashPacket
+from horizons.network import packets
+from horizons.network.packets import wireformat
+from horizons.network.packets.wireformat import WireFormatError
+
+
+class Dummy(object):
+	def __init__(self, worldid):
+		self.worldid = worldid
+
+
+class NotWhitelisted(object):
+	pass
+
+
+class TestWireFormat(unittest.TestCase):
+
+	def setUp(self):
+		packets.SafeUnpickler.set_mode(client = True)
+
+	def tearDown(self):
+		packets.SafeUnpickler.set_mode(client = True)
+
+	def roundtrip(self, value):
+		return wireformat.decode(wireformat.encode(value))
+
+	def test_values(self):
+		values = [None, True, False, 0, 1, -1, 63, -64, 223, 224, 300, 2**40, -2**70, 1.5, '', 'abc',
+		          u'\xe4\u20ac', (), (1, 'a'), [1, [2, None]], {'a': 1, 2: (3, )},
+		          set([1, 2]), frozenset(['x'])]
+		for value in values:
+			decoded = self.roundtrip(value)
+			self.assertEqual(value, decoded)
+			self.assertEqual(type(value), type(decoded))
+
+	def test_command_packet(self):
+		build = Build(3, 4, 5, Dummy(7), 1, settlement=Dummy(8), tearset=set([1, 2]), data={'a': 1})
+		tax = SetTaxSetting(Dummy(9), 1, 0.5)
+		packet = packets.client.game_data(CommandPacket(1234, 3, [build, tax]))
+		packet.sid = 'abc'
+
+		data = packet.serialize(packets.PROTOCOL_BINARY)
+		self.assertTrue(len(data) < len(packet.serialize(packets.PROTOCOL_PICKLE)))
+
+		decoded = packets.unserialize(data, packets.PROTOCOL_BINARY)
+		self.assertEqual('abc', decoded.sid)
+		self.assertEqual((1234, 3), (decoded.data.tick, decoded.data.player_id))
+		self.assertEqual(build.__dict__, decoded.data.commandlist[0].__dict__)
+		self.assertEqual(tax.__dict__, decoded.data.commandlist[1].__dict__)
+		self.assertEqual(Build, decoded.data.commandlist[0].__class__)
+
+	def test_checkup_hash_packet(self):
+		packet = CheckupHashPacket(10, 2, '0123456789abcdef')
+		decoded = self.roundtrip(packet)
+		self.assertEqual(packet.__dict__, decoded.__dict__)
+
+	def test_lobby_packets(self):
+		session = packets.server.cmd_session('sid', packets.PROTOCOL_BINARY)
+		self.assertEqual(session.__dict__, self.roundtrip(session).__dict__)
+
+		packets.SafeUnpickler.set_mode(client = False)
+		create = packets.client.cmd_creategame(1, 'map', 4, u'name')
+		create.sid = 'sid'
+		self.assertEqual(create.__dict__, self.roundtrip(create).__dict__)
+
+	def test_not_whitelisted(self):
+		data = wireformat.encode(NotWhitelisted())
+		self.assertRaises(WireFormatError, wireformat.decode, data)
+		# client packets may only be decoded by the server
+		data = wireformat.encode(packets.client.cmd_leavegame())
+		self.assertRaises(WireFormatError, wireformat.decode, data)
+
+	def test_schema_mismatch(self):
+		packet = CheckupHashPacket(10, 2, 'abc')
+		packet.unexpected = 1
+		self.assertRaises(WireFormatError, wireformat.encode, packet)
+
+	def test_malformed(self):
+		data = wireformat.encode(CheckupHashPacket(10, 2, 'abc'))
+		for i in xrange(len(data)):
+			self.assertRaises(WireFormatError, wireformat.decode, data[:i])
+		self.assertRaises(WireFormatError, wireformat.decode, data + '\x00')
+		nested = []
+		for i in xrange(wireformat.MAX_DEPTH + 1):
+			nested = [nested]
+		self.assertRaises(WireFormatError, wireformat.decode, wireformat.encode(nested))
+		# huge length without the data
+		self.assertRaises(WireFormatError, wireformat.decode, data[:2] + chr(wireformat.T_LIST) + '\xff\xff\xff\x7f')
+
+	def test_protocol_enforced(self):
+		packet = CheckupHashPacket(10, 2, 'abc')
+		pickled = cPickle.dumps(packet, packets.PICKLE_PROTOCOL)
+		binary = wireformat.encode(packet)
+		self.assertRaises(WireFormatError, packets.unserialize, pickled, packets.PROTOCOL_BINARY)
+		self.assertRaises(WireFormatError, packets.unserialize, binary, packets.PROTOCOL_PICKLE)
+		# unknown protocol while connecting: both are accepted
+		self.assertEqual(packet.__dict__, packets.unserialize(pickled).__dict__)
+		self.assertEqual(packet.__dict__, packets.unserialize(binary).__dict__)
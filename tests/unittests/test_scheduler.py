@@ -0,0 +1,112 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+
+from horizons.scheduler import Scheduler
+from horizons.timer import Timer
+from horizons.util import Callback
+
+
+class TestScheduler(unittest.TestCase):
+
+	def setUp(self):
+		self.timer = Timer()
+		Scheduler.create_instance(self.timer)
+		self.scheduler = Scheduler()
+		self.calls = []
+
+	def tearDown(self):
+		self.scheduler.end()
+		Scheduler.destroy_instance()
+
+	def run_ticks(self, ticks):
+		for i in xrange(ticks):
+			self.scheduler.tick(self.scheduler.cur_tick + 1)
+
+	def record(self, name):
+		return lambda: self.calls.append((self.scheduler.cur_tick, name))
+
+	def test_fifo_per_tick(self):
+		for name in 'abcde':
+			self.scheduler.add_new_object(self.record(name), self, run_in=2)
+		self.scheduler.add_new_object(self.record('x'), self, run_in=1)
+		self.run_ticks(3)
+		self.assertEqual(self.calls, [(1, 'x'), (2, 'a'), (2, 'b'), (2, 'c'), (2, 'd'), (2, 'e')])
+
+	def test_loops(self):
+		self.scheduler.add_new_object(self.record('a'), self, run_in=1, loops=3, loop_interval=2)
+		self.run_ticks(10)
+		self.assertEqual(self.calls, [(1, 'a'), (3, 'a'), (5, 'a')])
+
+	def test_rem_call(self):
+		a, b = self.record('a'), self.record('b')
+		self.scheduler.add_new_object(a, self, run_in=2)
+		self.scheduler.add_new_object(b, self, run_in=2)
+		self.scheduler.add_new_object(a, self, run_in=3)
+		self.assertEqual(self.scheduler.rem_call(self, a), 2)
+		self.assertEqual(self.scheduler.rem_call(self, a), 0)
+		self.run_ticks(5)
+		self.assertEqual(self.calls, [(2, 'b')])
+
+	def test_rem_during_tick(self):
+		other = object()
+		self.scheduler.add_new_object(lambda: self.scheduler.rem_all_classinst_calls(other), self)
+		self.scheduler.add_new_object(self.record('other'), other)
+		self.scheduler.add_new_object(self.record('self'), self)
+		self.run_ticks(2)
+		self.assertEqual(self.calls, [(1, 'self')])
+
+	def test_rem_and_readd_object(self):
+		self.scheduler.add_new_object(self.record('a'), self, run_in=2)
+		callback_obj = self.scheduler.get_classinst_calls(self).keys()[0]
+		self.assertEqual(self.scheduler.rem_object(callback_obj), 1)
+		self.scheduler.add_object(callback_obj)
+		self.run_ticks(5)
+		self.assertEqual(self.calls, [(2, 'a')])
+
+	def test_get_classinst_calls(self):
+		a, b = self.record('a'), self.record('b')
+		self.scheduler.add_new_object(a, self, run_in=4)
+		self.scheduler.add_new_object(b, self, run_in=7)
+		self.scheduler.add_new_object(a, object(), run_in=1)
+		self.run_ticks(1)
+		self.assertEqual(sorted(self.scheduler.get_classinst_calls(self).values()), [3, 6])
+		self.assertEqual(self.scheduler.get_remaining_ticks(self, b), 6)
+		self.scheduler.rem_all_classinst_calls(self)
+		self.assertEqual(self.scheduler.get_classinst_calls(self), {})
+		self.assertEqual(self.scheduler.get_remaining_ticks(self, b, assert_present=False), None)
+
+	def test_profiling(self):
+		profiler = self.scheduler.enable_profiling()
+		self.scheduler.add_new_object(self.record('a'), self, run_in=1, loops=3)
+		self.scheduler.add_new_object(Callback(self.record, 'b'), self, run_in=2)
+		self.run_ticks(4)
+		self.assertEqual(len(self.calls), 3)
+
+		stats = dict( ((data['class'], data['callback']), data) for data in profiler.get_stats() )
+		self.assertEqual(stats[('TestScheduler', '<lambda>')]['calls'], 3)
+		self.assertEqual(stats[('TestScheduler', 'record')]['calls'], 1)
+		self.assertEqual(profiler.get_tick_stats()['calls'], 4)
+
+		self.assertTrue(self.scheduler.disable_profiling() is profiler)
+		self.run_ticks(1)
+		self.assertEqual(profiler.get_tick_stats()['calls'], 4)
@@ -0,0 +1,77 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from horizons.savegamemanager import YamlCache
+
+
+class TestYamlCache(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.filename = os.path.join(self.directory, 'scenario.yaml')
+		self.write_file("author: someone\nevents:\n- actions: []\n  conditions: []\n")
+		self.old_cache_dir = YamlCache.cache_dir
+		YamlCache.cache_dir = os.path.join(self.directory, 'cache')
+		YamlCache.cache.clear()
+
+	def tearDown(self):
+		YamlCache.cache_dir = self.old_cache_dir
+		YamlCache.cache.clear()
+		shutil.rmtree(self.directory)
+
+	def write_file(self, content, mtime=0):
+		with open(self.filename, 'w') as f:
+			f.write(content)
+		os.utime(self.filename, (mtime, mtime))
+
+	def test_get(self):
+		data = {'author': 'someone', 'events': [{'actions': [], 'conditions': []}]}
+		self.assertEqual(data, YamlCache.get_file(self.filename))
+		self.assertEqual({'author': 'someone'}, YamlCache.get_header(self.filename))
+
+	def test_cache_files(self):
+		YamlCache.get_file(self.filename)
+		YamlCache.cache.clear()
+		# the cache files are used instead of the yaml file while its size and mtime are unchanged
+		self.write_file("author: anyone!\nevents:\n- actions: []\n  conditions: []\n")
+		self.assertEqual({'author': 'someone'}, YamlCache.get_header(self.filename))
+		self.assertEqual('someone', YamlCache.get_file(self.filename)['author'])
+
+	def test_changed_file(self):
+		self.assertEqual('someone', YamlCache.get_header(self.filename)['author'])
+		self.write_file("author: someone else\nevents: []\n", mtime=1)
+		self.assertEqual('someone else', YamlCache.get_header(self.filename)['author'])
+		YamlCache.cache.clear()
+		self.assertEqual('someone else', YamlCache.get_file(self.filename)['author'])
+
+	def test_invalid_cache_file(self):
+		YamlCache.get_file(self.filename)
+		for name in os.listdir(YamlCache.cache_dir):
+			with open(os.path.join(YamlCache.cache_dir, name), 'wb') as f:
+				f.write('invalid')
+		YamlCache.cache.clear()
+		self.assertEqual('someone', YamlCache.get_file(self.filename)['author'])
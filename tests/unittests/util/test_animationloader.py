@@ -0,0 +1,192 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+
+import horizons.main
+from horizons.util import ActionSetLoader
+from horizons.util import sqliteatlasloader
+from horizons.util.sqliteanimationloader import CachingAnimationLoader
+from horizons.util.sqliteatlasloader import SQLiteAtlasLoader
+from tests.unittests import TestCase
+
+
+class CountingAnimationLoader(CachingAnimationLoader):
+	def _load_animation(self, location):
+		return object()
+
+
+class TestCachingAnimationLoader(unittest.TestCase):
+
+	def test_memoized(self):
+		loader = CountingAnimationLoader()
+		animation = loader.loadResource('as_buoy0-idle-45')
+		self.assertTrue(animation is loader.loadResource('as_buoy0-idle-45'))
+		self.assertFalse(animation is loader.loadResource('as_buoy0-idle-45:shift:left-32,bottom+16'))
+		self.assertEqual(1, loader.hits)
+		self.assertEqual(2, loader.misses)
+
+
+class FakeImage(object):
+	def __init__(self, name, size):
+		self.name = name
+		self.size = size
+		self.loaded = False
+		self.shared = None
+
+	def getState(self):
+		return FakeFifeModule.IResource.RES_LOADED if self.loaded else FakeFifeModule.IResource.RES_NOT_LOADED
+
+	def load(self):
+		self.loaded = True
+
+	def free(self):
+		self.loaded = False
+
+	def getSize(self):
+		return self.size
+
+	def useSharedImage(self, image, region):
+		self.shared = image
+
+
+class FakeImageManager(object):
+	def __init__(self):
+		self.images = {}
+
+	def exists(self, name):
+		return name in self.images
+
+	def get(self, name):
+		return self.images[name]
+
+	def create(self, name):
+		self.images[name] = FakeImage(name, 10)
+		return self.images[name]
+
+	def load(self, name):
+		self.images[name] = FakeImage(name, 100)
+		return self.images[name]
+
+
+class FakeFife(object):
+	def __init__(self):
+		self.imagemanager = FakeImageManager()
+
+
+class FakeAnimation(object):
+	def __init__(self):
+		self.frames = []
+
+	def addFrame(self, image, duration):
+		self.frames.append(image)
+
+	def setActionFrame(self, frame):
+		pass
+
+
+class FakeFifeModule(object):
+	"""Replaces the fife module, the dummy one can't tell loaded and unloaded images apart"""
+	class IResource(object):
+		RES_NOT_LOADED = 0
+		RES_LOADED = 1
+
+	class Animation(object):
+		createAnimation = staticmethod(FakeAnimation)
+
+	@staticmethod
+	def Rect(x, y, width, height):
+		return (x, y, width, height)
+
+
+class TestSQLiteAtlasLoader(TestCase):
+
+	def setUp(self):
+		super(TestSQLiteAtlasLoader, self).setUp()
+		self.db("CREATE TABLE atlas(atlas_id INTEGER NOT NULL, atlas_path TEXT NOT NULL)")
+		for atlas_id in xrange(3):
+			self.db("INSERT INTO atlas VALUES(?, ?)", atlas_id, 'atlas%s.png' % atlas_id)
+		self.old_fife = horizons.main.fife
+		horizons.main.fife = FakeFife()
+		self.old_fife_module = sqliteatlasloader.fife
+		sqliteatlasloader.fife = FakeFifeModule
+		# action set as<page>, each with one frame on its atlas page
+		self.old_action_sets = ActionSetLoader.action_sets, ActionSetLoader._loaded
+		ActionSetLoader.action_sets = dict( ('as%d' % atlas_id, {'idle': {45: {'as%d.png' % atlas_id: \
+		                                    [0.1, atlas_id, 0, 0, 8, 8]}}}) for atlas_id in xrange(3) )
+		ActionSetLoader._loaded = True
+
+	def tearDown(self):
+		horizons.main.fife = self.old_fife
+		sqliteatlasloader.fife = self.old_fife_module
+		ActionSetLoader.action_sets, ActionSetLoader._loaded = self.old_action_sets
+		super(TestSQLiteAtlasLoader, self).tearDown()
+
+	def get_page(self, atlas_id):
+		return horizons.main.fife.imagemanager.get('atlas%d.png' % atlas_id)
+
+	def test_lazy_loading(self):
+		loader = SQLiteAtlasLoader()
+		self.assertEqual({}, horizons.main.fife.imagemanager.images)
+		img = loader.get_image('a.png', 1, None)
+		self.assertTrue(img.shared is self.get_page(1))
+		self.assertTrue(img.shared.loaded)
+		self.assertEqual(['a.png', 'atlas1.png'], sorted(horizons.main.fife.imagemanager.images))
+
+	def test_eviction(self):
+		loader = SQLiteAtlasLoader(memory_budget=250)
+		loader.loadResource('as0-idle-45')
+		loader.loadResource('as1-idle-45')
+		# the memoized animation still uses page 0, page 1 is the least recently used one now
+		loader.loadResource('as0-idle-45')
+		loader.loadResource('as2-idle-45')
+		self.assertEqual(100, loader.evicted_bytes)
+		self.assertFalse(self.get_page(1).loaded)
+		self.assertFalse(horizons.main.fife.imagemanager.get('as1.png').loaded)
+		self.assertTrue(self.get_page(0).loaded)
+		self.assertTrue(self.get_page(2).loaded)
+		# the page is loaded again when it is used
+		loader.loadResource('as1-idle-45')
+		self.assertTrue(self.get_page(1).loaded)
+		self.assertEqual(200, loader.evicted_bytes)
+		self.assertFalse(self.get_page(0).loaded)
+
+	def test_image_use(self):
+		loader = SQLiteAtlasLoader(memory_budget=250)
+		loader.get_image('a.png', 0, None)
+		loader.get_image('b.png', 1, None)
+		loader.get_image('a.png', 0, None)
+		loader.get_image('c.png', 2, None)
+		self.assertFalse(self.get_page(1).loaded)
+		self.assertTrue(self.get_page(0).loaded)
+
+	def test_reloaded_by_fife(self):
+		loader = SQLiteAtlasLoader(memory_budget=250)
+		for atlas_id in xrange(3):
+			loader.loadResource('as%d-idle-45' % atlas_id)
+		self.assertFalse(self.get_page(0).loaded)
+		# fife loads the page again when drawing an image on it, which has to be counted
+		self.get_page(0).load()
+		loader.loadResource('as2-idle-45')
+		self.assertEqual(200, loader.evicted_bytes)
+		self.assertEqual(2, len([atlas_id for atlas_id in xrange(3) if self.get_page(atlas_id).loaded]))
+		self.assertTrue(self.get_page(0).loaded)
+		self.assertFalse(self.get_page(1).loaded)
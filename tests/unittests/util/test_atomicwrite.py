@@ -0,0 +1,60 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from horizons.util.atomicwrite import atomic_create, atomic_write
+
+
+class TestAtomicWrite(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.filename = os.path.join(self.directory, 'cache', 'file')
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def read(self):
+		with open(self.filename, 'rb') as f:
+			return f.read()
+
+	def test_write(self):
+		atomic_write(self.filename, 'data')
+		self.assertEqual('data', self.read())
+		atomic_write(self.filename, 'new data')
+		self.assertEqual('new data', self.read())
+		self.assertEqual(['file'], os.listdir(os.path.dirname(self.filename)))
+
+	def test_failure(self):
+		atomic_write(self.filename, 'data')
+		def create(tmp_filename):
+			with open(tmp_filename, 'wb') as f:
+				f.write('partial')
+			raise IOError('disk full')
+		self.assertRaises(IOError, atomic_create, self.filename, create)
+		# the old file is kept and the temporary file is removed
+		self.assertEqual('data', self.read())
+		self.assertEqual(['file'], os.listdir(os.path.dirname(self.filename)))
@@ -0,0 +1,83 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+
+from horizons.util import DbReader
+
+
+class TestDbReaderBatch(unittest.TestCase):
+
+	def setUp(self):
+		self.db = DbReader(':memory:')
+		self.db("CREATE TABLE a(value INTEGER)")
+		self.db("CREATE TABLE b(value INTEGER, owner INTEGER)")
+
+	def tearDown(self):
+		self.db.close()
+
+	def write(self, db):
+		for i in xrange(10):
+			db("INSERT INTO a(value) VALUES(?)", i)
+			db("INSERT INTO b(value) VALUES(?)", -i)
+			db("UPDATE b SET owner = ? WHERE value = ?", i, -i)
+			if i % 3 == 0:
+				db("INSERT INTO `a` (value) VALUES(?)", 100 + i)
+		db("DELETE FROM a WHERE value = ?", 5)
+
+	def get_contents(self, db):
+		return db("SELECT rowid, value FROM a ORDER BY rowid").rows, \
+		       db("SELECT rowid, value, owner FROM b ORDER BY rowid").rows
+
+	def test_same_result(self):
+		self.write(self.db)
+		expected = self.get_contents(self.db)
+
+		db = DbReader(':memory:')
+		db("CREATE TABLE a(value INTEGER)")
+		db("CREATE TABLE b(value INTEGER, owner INTEGER)")
+		db("BEGIN")
+		db.start_batch()
+		self.write(db)
+		self.assertEqual([], db("SELECT * FROM a WHERE 0").rows) # flushes the batch
+		db.end_batch()
+		db("COMMIT")
+		self.assertEqual(expected, self.get_contents(db))
+		db.close()
+
+	def test_flush_on_read(self):
+		self.db.start_batch()
+		self.db("INSERT INTO a(value) VALUES(?)", 1)
+		self.db("INSERT INTO a(value) VALUES(?)", 2)
+		self.assertEqual([(2, )], self.db("SELECT count(*) FROM a").rows)
+		self.db("INSERT INTO a(value) VALUES(?)", 3)
+		self.db.flush_batch()
+		self.db.end_batch()
+		self.assertEqual([(1, ), (2, ), (3, )], self.db("SELECT value FROM a ORDER BY rowid").rows)
+
+	def test_select_inside_write(self):
+		# reads other tables, so it must not be collected
+		self.db("INSERT INTO a(value) VALUES(?)", 1)
+		self.db.start_batch()
+		self.db("INSERT INTO a(value) VALUES(?)", 2)
+		self.db("INSERT INTO b(value) SELECT value FROM a")
+		self.db.end_batch()
+		self.assertEqual([(1, ), (2, )], self.db("SELECT value FROM b ORDER BY rowid").rows)
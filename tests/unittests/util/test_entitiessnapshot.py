@@ -0,0 +1,57 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from horizons.util.entitiessnapshot import EntitiesSnapshot
+
+
+class TestEntitiesSnapshot(unittest.TestCase):
+
+	CHECKSUM = 'a' * 40
+	DATA = {'grounds': [(1, {'classes': ['constructible'], 'animations': ['a.png', None, None, None]})],
+	        'production_lines': [(2, ((1.5, 0, 1), [(3, -1), (4, 2)], []))]}
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.snapshot = EntitiesSnapshot(os.path.join(self.directory, 'cache', 'entities.snapshot'))
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def test_roundtrip(self):
+		self.assertEqual(None, self.snapshot.get(self.CHECKSUM))
+		self.snapshot.put(self.CHECKSUM, self.DATA)
+		self.assertEqual(self.DATA, self.snapshot.get(self.CHECKSUM))
+		# snapshots of other game data are not used
+		self.assertEqual(None, self.snapshot.get('b' * 40))
+
+	def test_invalid_file(self):
+		self.snapshot.put(self.CHECKSUM, self.DATA)
+		with open(self.snapshot.filename, 'r+b') as f:
+			f.truncate(os.path.getsize(self.snapshot.filename) - 2)
+		self.assertEqual(None, self.snapshot.get(self.CHECKSUM))
+		with open(self.snapshot.filename, 'wb') as f:
+			f.write('UH')
+		self.assertEqual(None, self.snapshot.get(self.CHECKSUM))
@@ -0,0 +1,83 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from horizons.util import DbReader
+from horizons.util.gamedbcache import GameDbCache
+
+
+class TestGameDbCache(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.sql_files = []
+		for i, sql in enumerate((
+		    "CREATE TABLE unit(id INTEGER PRIMARY KEY, name TEXT NOT NULL);" + \
+		    "INSERT INTO unit VALUES(1, 'ship'); INSERT INTO unit VALUES(2, 'soldier');",
+		    "CREATE INDEX unit_name ON unit(name);" + \
+		    "CREATE VIEW ships AS SELECT id FROM unit WHERE name = 'ship';")):
+			filename = os.path.join(self.directory, '%s.sql' % i)
+			with open(filename, 'w') as f:
+				f.write(sql)
+			self.sql_files.append(filename)
+		self.cache = GameDbCache(os.path.join(self.directory, 'cache', 'game.sqlite'), self.sql_files)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def dump(self, db):
+		return list(db.connection.iterdump())
+
+	def test_roundtrip(self):
+		expected = DbReader(':memory:')
+		self.cache.execute_sql_files(expected)
+
+		db = DbReader(':memory:')
+		self.assertFalse(self.cache.load(db))
+		self.assertTrue(self.cache.build())
+		self.assertTrue(self.cache.load(db))
+		self.assertEqual(self.dump(expected), self.dump(db))
+		self.assertEqual([(1, )], db("SELECT id FROM ships").rows)
+
+	def test_changed_sql(self):
+		self.cache.build()
+		with open(self.sql_files[1], 'a') as f:
+			f.write("INSERT INTO unit VALUES(3, 'ship');")
+		# the checksum is computed once per instance, like on a new start of the game
+		cache = GameDbCache(self.cache.filename, self.sql_files)
+		db = DbReader(':memory:')
+		self.assertFalse(cache.load(db))
+		self.assertEqual([], db("SELECT name FROM sqlite_master").rows)
+
+	def test_invalid_file(self):
+		os.mkdir(os.path.dirname(self.cache.filename))
+		with open(self.cache.filename, 'w') as f:
+			f.write('no database')
+		db = DbReader(':memory:')
+		self.assertFalse(self.cache.load(db))
+		self.assertEqual([], db("SELECT name FROM sqlite_master").rows)
+		# the next build replaces the file
+		self.assertTrue(self.cache.build())
+		self.assertTrue(self.cache.load(db))
@@ -0,0 +1,65 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+
+from horizons.util import ChangeListener, IncrementalHash
+
+
+class TestIncrementalHash(unittest.TestCase):
+
+	def test_order_independent(self):
+		hash1, hash2 = IncrementalHash(), IncrementalHash()
+		hash1.update('a', 1)
+		hash1.update('b', (2, 3))
+		hash2.update('b', (2, 3))
+		hash2.update('a', 1)
+		self.assertEqual(hash1.get_digest(), hash2.get_digest())
+		self.assertEqual(16, len(hash1.get_digest()))
+
+	def test_update_and_remove(self):
+		h = IncrementalHash()
+		empty = h.get_digest()
+		h.update('a', 1)
+		digest = h.get_digest()
+		self.assertNotEqual(empty, digest)
+		h.update('a', 2)
+		self.assertNotEqual(digest, h.get_digest())
+		h.update('a', 1)
+		self.assertEqual(digest, h.get_digest())
+		h.remove('a')
+		self.assertEqual(empty, h.get_digest())
+		self.assertEqual({}, h.get_values())
+
+	def test_track(self):
+		obj = ChangeListener()
+		obj.value = 1
+		h = IncrementalHash()
+		h.track('obj', obj, lambda : obj.value)
+		h.get_digest()
+		self.assertEqual({'obj' : 1}, h.get_values())
+		obj.value = 2
+		self.assertEqual({'obj' : 1}, h.get_values()) # not changed yet
+		obj._changed()
+		h.get_digest()
+		self.assertEqual({'obj' : 2}, h.get_values())
+		obj.remove()
+		self.assertEqual(IncrementalHash().get_digest(), h.get_digest())
@@ -0,0 +1,78 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from horizons.util.loaders.indexcache import LoaderIndexCache
+
+
+class TestLoaderIndexCache(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.gfx_dir = os.path.join(self.directory, 'gfx')
+		self.rotation_dir = os.path.join(self.gfx_dir, 'as_tree', 'idle', '45')
+		os.makedirs(self.rotation_dir)
+		self.add_file('0.png')
+		# make sure that later changes get a different mtime
+		for dirpath, dirnames, filenames in os.walk(self.gfx_dir):
+			os.utime(dirpath, (0, 0))
+		self.index = LoaderIndexCache(os.path.join(self.directory, 'cache', 'actionsets.index'), self.gfx_dir)
+		self.searches = 0
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def add_file(self, name):
+		open(os.path.join(self.rotation_dir, name), 'w').close()
+
+	def find_sets(self):
+		self.searches += 1
+		return {'as_tree': {'idle': {45: dict((name, 0.5) for name in os.listdir(self.rotation_dir))}}}
+
+	def test_load(self):
+		sets = self.index.load(self.find_sets)
+		self.assertEqual({'as_tree': {'idle': {45: {'0.png': 0.5}}}}, sets)
+		self.assertEqual(sets, self.index.load(self.find_sets))
+		self.assertEqual(1, self.searches)
+
+	def test_changed_directory(self):
+		self.index.load(self.find_sets)
+		self.add_file('1.png')
+		self.assertEqual(None, self.index.get())
+		sets = self.index.load(self.find_sets)
+		self.assertEqual({'0.png': 0.5, '1.png': 0.5}, sets['as_tree']['idle'][45])
+		self.assertEqual(2, self.searches)
+
+	def test_removed_directory(self):
+		self.index.load(self.find_sets)
+		os.remove(os.path.join(self.rotation_dir, '0.png'))
+		os.rmdir(self.rotation_dir)
+		self.assertEqual(None, self.index.get())
+
+	def test_invalid_file(self):
+		self.index.load(self.find_sets)
+		with open(self.index.filename, 'wb') as f:
+			f.write('invalid')
+		self.assertEqual(None, self.index.get())
@@ -0,0 +1,71 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import hashlib
+import random
+import unittest
+
+from horizons.util import random_map
+
+
+class TestRandomIslandGenerator(unittest.TestCase):
+
+	# number of tiles and sha1 of the tile list generated by the original generator
+	expected_islands = (
+		('random:2:20:20:-8186', 347, '1532f4bec994b92bdb61a78b2c2dd6b209f311d2'),
+		('random:2:20:20:-1510', 230, '6204c175bbf4031a4faae539ec8dff39b7a31180'),
+		('random:0:30:30:4242', 711, '5b6210a9bf8aa9bea8224e2a2dddae1c1a36dd3d'),
+		('random:1:40:40:-77', 1430, '546f96968f5f4295e91827e74a7fd62e2026c9c3'),
+		('random:2:60:25:2011', 1229, '3d69320d796d58e1b583adacc7c4178f132fb1dd'),
+		('random:2:100:90:-3', 7615, '4cedb8e4aa8be4b072c768306d83227a7d2013d5'),
+	)
+
+	def assert_expected_islands(self, use_numpy):
+		for id_string, count, digest in self.expected_islands:
+			ground = [ (int(x), int(y), int(tile)) for x, y, tile in \
+			           random_map._generate_random_island_ground(id_string, use_numpy=use_numpy) ]
+			self.assertEqual(count, len(ground), id_string)
+			self.assertEqual(digest, hashlib.sha1(repr(ground)).hexdigest(), id_string)
+
+	def test_expected_islands(self):
+		"""Cached islands have to stay valid, so the tiles and their order must not change
+		unless RANDOM_ISLAND_GENERATOR_VERSION is incremented"""
+		self.assert_expected_islands(use_numpy=False)
+
+	@unittest.skipIf(random_map.numpy is None, 'NumPy is not available')
+	def test_expected_islands_numpy(self):
+		self.assert_expected_islands(use_numpy=True)
+
+	@unittest.skipIf(random_map.numpy is None, 'NumPy is not available')
+	def test_numpy_identical(self):
+		"""The NumPy implementation has to generate the same tiles in the same order"""
+		rand = random.Random(13)
+		for creation_method, width, height in ((0, 30, 30), (1, 40, 40), (2, 20, 20), (2, 60, 25), (2, 100, 90)):
+			for i in xrange(4):
+				id_string = 'random:%d:%d:%d:%d' % (creation_method, width, height, rand.randint(-10000, 10000))
+				self.assertEqual(random_map._generate_random_island_ground(id_string, use_numpy=False),
+				                 random_map._generate_random_island_ground(id_string, use_numpy=True),
+				                 id_string)
+
+	def test_unique_tiles(self):
+		"""Every coordinate gets exactly one tile"""
+		ground = random_map._generate_random_island_ground('random:2:50:50:3', use_numpy=False)
+		self.assertEqual(len(ground), len(set((x, y) for x, y, tile in ground)))
@@ -0,0 +1,84 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from horizons.util import random_map
+from horizons.util.randomislandcache import RandomIslandCache
+
+
+class TestRandomIslandCache(unittest.TestCase):
+
+	ID_STRING = 'random:2:50:40:7'
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.cache = RandomIslandCache(self.directory, 1)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def get_files(self):
+		return [ name for name in os.listdir(self.directory) if name.endswith(RandomIslandCache.FILE_EXTENSION) ]
+
+	def test_roundtrip(self):
+		ground = random_map._generate_random_island_ground(self.ID_STRING)
+		self.assertEqual(None, self.cache.get(self.ID_STRING))
+		self.cache.put(self.ID_STRING, ground)
+		self.assertEqual(ground, self.cache.get(self.ID_STRING))
+		self.assertEqual(None, self.cache.get('random:2:50:40:8'))
+		# islands of other generator versions are not used
+		self.assertEqual(None, RandomIslandCache(self.directory, 2).get(self.ID_STRING))
+
+	def test_same_as_generated(self):
+		generated = random_map._generate_random_island_ground(self.ID_STRING)
+		self.assertEqual(generated, random_map.get_random_island_ground(self.ID_STRING))
+		self.assertEqual(generated, random_map.get_random_island_ground(self.ID_STRING))
+		db = random_map.create_random_island(self.ID_STRING)
+		self.assertEqual(generated, db("SELECT x, y, ground_id FROM ground ORDER BY rowid").rows)
+
+	def test_invalid_file(self):
+		self.cache.put(self.ID_STRING, [(0, 0, 1), (1, 0, 2)])
+		filename = os.path.join(self.directory, self.get_files()[0])
+		with open(filename, 'r+b') as f:
+			f.truncate(os.path.getsize(filename) - 2)
+		self.assertEqual(None, self.cache.get(self.ID_STRING))
+		self.assertEqual([], self.get_files())
+
+	def test_values_out_of_range(self):
+		self.cache.put(self.ID_STRING, [(0, 0, 1), (100000, 0, 2)])
+		self.assertEqual(None, self.cache.get(self.ID_STRING))
+
+	def test_eviction(self):
+		ground = [ (x, y, (x * y) % 100) for x in xrange(30) for y in xrange(30) ]
+		self.cache.put('random:2:30:30:1', ground)
+		size = os.path.getsize(os.path.join(self.directory, self.get_files()[0]))
+		self.cache.max_size = 2 * size + size // 2
+		# make sure that the first island is the least recently used one
+		os.utime(os.path.join(self.directory, self.get_files()[0]), (0, 0))
+		self.cache.put('random:2:30:30:2', ground)
+		self.cache.put('random:2:30:30:3', ground)
+		self.assertEqual(2, len(self.get_files()))
+		self.assertEqual(None, self.cache.get('random:2:30:30:1'))
+		self.assertEqual(ground, self.cache.get('random:2:30:30:3'))
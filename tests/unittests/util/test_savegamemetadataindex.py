@@ -0,0 +1,83 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from horizons.util.savegamemetadataindex import SavegameMetadataIndex
+
+
+class TestSavegameMetadataIndex(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.savegame = os.path.join(self.directory, 'autosave-1.sqlite')
+		self.write_savegame('savegame')
+		self.filename = os.path.join(self.directory, 'cache', 'savegames.index')
+		self.index = SavegameMetadataIndex(self.filename)
+		self.metadata = {'timestamp': 1.5, 'savecounter': 3, 'savegamerev': 42}
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def write_savegame(self, content, mtime=0):
+		with open(self.savegame, 'w') as f:
+			f.write(content)
+		os.utime(self.savegame, (mtime, mtime))
+
+	def test_get(self):
+		self.assertEqual(None, self.index.get(self.savegame))
+		self.index.put(self.savegame, self.metadata, SavegameMetadataIndex.get_stat(self.savegame))
+		self.assertEqual(self.metadata, self.index.get(self.savegame))
+
+	def test_saved(self):
+		self.index.put(self.savegame, self.metadata, SavegameMetadataIndex.get_stat(self.savegame))
+		self.index.save()
+		self.assertEqual(self.metadata, SavegameMetadataIndex(self.filename).get(self.savegame))
+
+	def test_changed_savegame(self):
+		self.index.put(self.savegame, self.metadata, SavegameMetadataIndex.get_stat(self.savegame))
+		self.index.save()
+		self.write_savegame('changed savegame', mtime=1)
+		self.assertEqual(None, SavegameMetadataIndex(self.filename).get(self.savegame))
+
+	def test_written_savegame(self):
+		# the size and mtime of savegames that are being written are taken when saving
+		self.index.put(self.savegame, self.metadata)
+		self.write_savegame('written savegame', mtime=1)
+		self.index.save()
+		self.assertEqual(self.metadata, SavegameMetadataIndex(self.filename).get(self.savegame))
+
+	def test_removed_savegame(self):
+		self.index.put(self.savegame, self.metadata, SavegameMetadataIndex.get_stat(self.savegame))
+		os.remove(self.savegame)
+		self.assertEqual(None, self.index.get(self.savegame))
+		self.index.save()
+		self.assertEqual({}, SavegameMetadataIndex(self.filename)._get_entries())
+
+	def test_invalid_file(self):
+		os.makedirs(os.path.dirname(self.filename))
+		with open(self.filename, 'wb') as f:
+			f.write('invalid')
+		self.assertEqual(None, self.index.get(self.savegame))
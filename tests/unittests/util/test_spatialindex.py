@@ -0,0 +1,73 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+import unittest
+
+from horizons.util import Circle, Point, SpatialIndex
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+	def setUp(self):
+		self.index = SpatialIndex(cell_size=4)
+		self.objects = [] # (object, position) in the order of insertion
+
+	def add(self, obj, position):
+		self.index.add(obj, position)
+		self.objects.append( [obj, position] )
+
+	def get_expected(self, center, radius):
+		circle = Circle(center, radius)
+		return [ obj for obj, position in self.objects if circle.contains(position) ]
+
+	def test_random(self):
+		rng = random.Random(2)
+		for i in xrange(200):
+			self.add(object(), Point(rng.randint(-20, 60), rng.randint(-20, 60)))
+		for i in xrange(300):
+			action = rng.random()
+			if action < 0.4:
+				entry = rng.choice(self.objects)
+				entry[1] = Point(entry[1].x + rng.randint(-1, 1), entry[1].y + rng.randint(-1, 1))
+				self.index.move(entry[0], entry[1])
+			elif action < 0.5:
+				obj = self.objects.pop(rng.randrange(len(self.objects)))[0]
+				self.index.remove(obj)
+			elif action < 0.6:
+				self.add(object(), Point(rng.randint(-20, 60), rng.randint(-20, 60)))
+			else:
+				center = Point(rng.randint(-30, 70), rng.randint(-30, 70))
+				radius = rng.choice((0, 1, 2.5, 5, 12, 100))
+				self.assertEqual(self.get_expected(center, radius), self.index.get_in_radius(center, radius))
+		self.assertEqual(len(self.objects), len(self.index))
+
+	def test_order(self):
+		"""Results are in insertion order, also after moving"""
+		a, b, c = object(), object(), object()
+		self.add(c, Point(0, 0))
+		self.add(a, Point(10, 10))
+		self.add(b, Point(5, 5))
+		self.index.move(c, Point(9, 9))
+		self.assertEqual([c, a, b], self.index.get_in_radius(Point(8, 8), 5))
+		self.index.remove(a)
+		self.assertFalse(a in self.index)
+		self.assertEqual([c, b], self.index.get_in_radius(Point(8, 8), 5))
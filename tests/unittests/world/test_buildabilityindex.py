@@ -0,0 +1,104 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+
+from horizons.util import Point, Rect
+from horizons.world.buildabilityindex import BuildabilityIndex, numpy
+
+
+class FakeObject(object):
+	def __init__(self, buildable_upon):
+		self.buildable_upon = buildable_upon
+
+
+class FakeTile(object):
+	def __init__(self, classes):
+		self.classes = classes
+		self.object = None
+
+
+class TestBuildabilityIndex(unittest.TestCase):
+	use_numpy = False
+
+	def setUp(self):
+		# a 4x3 island at (2, 1) with coastline at the left and a missing tile at the bottom right
+		self.ground_map = {}
+		for x in xrange(2, 6):
+			for y in xrange(1, 4):
+				if (x, y) == (5, 3):
+					continue
+				classes = ['coastline'] if x == 2 else ['constructible']
+				self.ground_map[(x, y)] = FakeTile(classes)
+		self.index = BuildabilityIndex(Rect.init_from_topleft_and_size(2, 1, 4, 3), self.ground_map,
+		                               use_numpy=self.use_numpy)
+
+	def test_count(self):
+		index = self.index
+		self.assertEqual(11, index.count(BuildabilityIndex.LAND, Rect.init_from_topleft_and_size(0, 0, 10, 10)))
+		self.assertEqual(8, index.count(BuildabilityIndex.CONSTRUCTIBLE, Rect.init_from_topleft_and_size(2, 1, 4, 3)))
+		self.assertEqual(3, index.count(BuildabilityIndex.COASTLINE, Rect.init_from_topleft_and_size(1, 1, 2, 3)))
+		self.assertEqual(1, index.count(BuildabilityIndex.LAND, Point(5, 2)))
+		self.assertEqual(0, index.count(BuildabilityIndex.LAND, Point(5, 3)))
+		self.assertEqual(0, index.count(BuildabilityIndex.LAND, Rect.init_from_topleft_and_size(6, 1, 2, 2)))
+
+	def test_all_any_set(self):
+		index = self.index
+		self.assertTrue(index.all_set(BuildabilityIndex.CONSTRUCTIBLE, Rect.init_from_topleft_and_size(3, 1, 2, 2)))
+		self.assertFalse(index.all_set(BuildabilityIndex.CONSTRUCTIBLE, Rect.init_from_topleft_and_size(4, 2, 2, 2)))
+		self.assertFalse(index.all_set(BuildabilityIndex.CONSTRUCTIBLE, Rect.init_from_topleft_and_size(2, 1, 1, 1)))
+		coast_or_constructible = BuildabilityIndex.COASTLINE | BuildabilityIndex.CONSTRUCTIBLE
+		self.assertTrue(index.all_set(coast_or_constructible, Rect.init_from_topleft_and_size(2, 1, 2, 2)))
+		self.assertTrue(index.any_set(BuildabilityIndex.COASTLINE, Rect.init_from_topleft_and_size(1, 1, 2, 2)))
+		self.assertFalse(index.any_set(BuildabilityIndex.COASTLINE, Rect.init_from_topleft_and_size(3, 1, 1, 1)))
+
+	def test_update(self):
+		index = self.index
+		area = Rect.init_from_topleft_and_size(3, 1, 2, 2)
+		self.assertFalse(index.any_set(BuildabilityIndex.OCCUPIED, area))
+		for coords in area.tuple_iter():
+			self.ground_map[coords].object = FakeObject(buildable_upon=True)
+		self.ground_map[(4, 2)].object = FakeObject(buildable_upon=False)
+		index.update(area)
+		self.assertEqual(4, index.count(BuildabilityIndex.OCCUPIED, area))
+		self.assertEqual(1, index.count(BuildabilityIndex.BLOCKED, area))
+		self.assertEqual(4, index.count(BuildabilityIndex.OCCUPIED | BuildabilityIndex.COASTLINE, area))
+		# the ground flags are kept
+		self.assertTrue(index.all_set(BuildabilityIndex.CONSTRUCTIBLE, area))
+
+		self.ground_map[(4, 2)].object = None
+		index.update(Point(4, 2))
+		self.assertEqual(3, index.count(BuildabilityIndex.OCCUPIED, area))
+		self.assertFalse(index.any_set(BuildabilityIndex.BLOCKED, area))
+		# only the tables of the ground flags are kept
+		self.assertFalse([flag for flag in index._tables if flag & BuildabilityIndex.BUILDING_FLAGS])
+
+	def test_get_origins(self):
+		index = self.index
+		self.assertEqual([(3, 1), (4, 1), (3, 2)], index.get_origins(BuildabilityIndex.CONSTRUCTIBLE, 2, 2))
+		self.assertEqual([(2, 1)], index.get_origins(BuildabilityIndex.LAND, 4, 2))
+		self.assertEqual([], index.get_origins(BuildabilityIndex.LAND, 4, 3))
+		self.assertEqual([], index.get_origins(BuildabilityIndex.LAND, 5, 1))
+
+
+@unittest.skipIf(numpy is None, "NumPy is not available")
+class TestBuildabilityIndexNumpy(TestBuildabilityIndex):
+	use_numpy = True
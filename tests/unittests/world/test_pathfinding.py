@@ -0,0 +1,283 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+import unittest
+
+from horizons.util import Point, Rect
+from horizons.world.pathfinding.pathfinding import FindPath, GridFindPath, HierarchicalFindPath
+from horizons.world.pathfinding.pathcache import PathCache
+from horizons.world.pathfinding.pathnodes import PathGrid, ClusterGraph
+from horizons.world.pathfinding.roadcomponents import RoadComponents
+
+
+class TestGridFindPath(unittest.TestCase):
+	"""GridFindPath has to return exactly the same paths as FindPath."""
+
+	def create_nodes(self, rng, width, height, obstacle_ratio):
+		return dict( ((x, y), 1.0) for x in xrange(width) for y in xrange(height) \
+		             if rng.random() >= obstacle_ratio )
+
+	def random_shape(self, rng, width, height):
+		x, y = rng.randint(-1, width), rng.randint(-1, height)
+		if rng.random() < 0.5:
+			return Point(x, y)
+		return Rect.init_from_topleft_and_size(x, y, rng.randint(0, 3), rng.randint(0, 3))
+
+	def compare(self, nodes, source, destination, blocked, diagonal, make_target_walkable):
+		expected = FindPath()(source, destination, nodes, blocked, diagonal, make_target_walkable)
+		result = GridFindPath()(source, destination, PathGrid(nodes), blocked, diagonal, make_target_walkable)
+		self.assertEqual(expected, result, '%s -> %s (diagonal: %s): %s != %s' % \
+		                 (source, destination, diagonal, expected, result))
+		return result
+
+	def test_random_maps(self):
+		rng = random.Random(42)
+		found = 0
+		for i in xrange(300):
+			width, height = rng.randint(5, 30), rng.randint(5, 30)
+			nodes = self.create_nodes(rng, width, height, rng.choice((0.0, 0.2, 0.4)))
+			blocked = dict.fromkeys(rng.sample(nodes.keys(), min(len(nodes), 5)))
+			source = self.random_shape(rng, width, height)
+			destination = self.random_shape(rng, width, height)
+			path = self.compare(nodes, source, destination, blocked, rng.random() < 0.5, rng.random() < 0.5)
+			if path is not None:
+				found += 1
+		self.assertTrue(found > 50)
+
+	def test_outside_of_grid(self):
+		nodes = dict.fromkeys([(x, 0) for x in xrange(10)], 1.0)
+		self.assertEqual(self.compare(nodes, Point(-3, 0), Point(5, 0), [], False, True), None)
+		path = self.compare(nodes, Point(0, 0), Rect.init_from_topleft_and_size(9, 0, 3, 3), [], False, True)
+		self.assertEqual(path, [(x, 0) for x in xrange(10)])
+
+	def test_grid(self):
+		nodes = {(2, 3): 1.0, (4, 7): 2.0}
+		grid = PathGrid(nodes)
+		self.assertTrue((2, 3) in grid)
+		self.assertFalse((3, 3) in grid)
+		self.assertFalse((100, 100) in grid)
+		self.assertEqual(sorted(grid), sorted(nodes))
+		grid.remove_node((2, 3))
+		grid.set_node((3, 3))
+		self.assertEqual(sorted(grid), [(3, 3), (4, 7)])
+		self.assertEqual(grid.cost[grid.index((4, 7))], 2.0)
+
+
+
+class TestHierarchicalFindPath(unittest.TestCase):
+	"""HierarchicalFindPath has to return valid paths, which are only slightly longer than
+	the shortest ones."""
+
+	def create_nodes(self, rng, width, height):
+		"""Open area with some round islands"""
+		nodes = dict( ((x, y), 1.0) for x in xrange(width) for y in xrange(height) )
+		for i in xrange(rng.randint(3, 12)):
+			center_x, center_y, radius = rng.randint(0, width), rng.randint(0, height), rng.randint(2, 10)
+			for x in xrange(center_x - radius, center_x + radius + 1):
+				for y in xrange(center_y - radius, center_y + radius + 1):
+					if (x - center_x) ** 2 + (y - center_y) ** 2 <= radius ** 2 + rng.randint(-radius, radius):
+						nodes.pop((x, y), None)
+		return nodes
+
+	def get_distances(self, nodes, source, diagonal):
+		"""Breadth first search, returns { coords : shortest distance in steps }"""
+		offsets = [ (dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if \
+		            (dx, dy) != (0, 0) and (diagonal or dx == 0 or dy == 0) ]
+		distances = { source : 0 }
+		queue = [source]
+		for coords in queue:
+			for dx, dy in offsets:
+				other = (coords[0] + dx, coords[1] + dy)
+				if other in nodes and other not in distances:
+					distances[other] = distances[coords] + 1
+					queue.append(other)
+		return distances
+
+	def check_path(self, path, nodes, source, destination, blocked, diagonal):
+		self.assertEqual(source, path[0])
+		self.assertEqual(destination, path[-1])
+		for prev, cur in zip(path, path[1:]):
+			self.assertTrue(cur in nodes and cur not in blocked)
+			dx, dy = abs(cur[0] - prev[0]), abs(cur[1] - prev[1])
+			self.assertTrue(max(dx, dy) == 1 and (diagonal or dx + dy == 1), '%s -> %s' % (prev, cur))
+
+	def test_random_maps(self):
+		rng = random.Random(3)
+		found = 0
+		for i in xrange(10):
+			nodes = self.create_nodes(rng, 80, 80)
+			coords_list = sorted(nodes)
+			for diagonal in (True, False):
+				grid = PathGrid(nodes)
+				clusters = ClusterGraph(grid, diagonal)
+				for j in xrange(10):
+					source, destination = rng.choice(coords_list), rng.choice(coords_list)
+					optimal = self.get_distances(nodes, source, diagonal).get(destination)
+					path = HierarchicalFindPath(clusters)(Point(*source), Point(*destination), grid, [], diagonal, False)
+					if optimal is None:
+						self.assertEqual(None, path)
+						continue
+					found += 1
+					self.check_path(path, nodes, source, destination, [], diagonal)
+					self.assertTrue(len(path) - 1 <= optimal * 1.3 + 4, \
+					                '%s -> %s: %s steps instead of %s' % (source, destination, len(path) - 1, optimal))
+		self.assertTrue(found > 150)
+
+	def test_blocked(self):
+		nodes = dict( ((x, y), 1.0) for x in xrange(100) for y in xrange(20) )
+		grid = PathGrid(nodes)
+		clusters = ClusterGraph(grid)
+		source, destination = (0, 10), (99, 10)
+		path = HierarchicalFindPath(clusters)(Point(*source), Point(*destination), grid, [], True, False)
+		self.assertEqual(100, len(path))
+		# block some tiles of the straight path, including a portal
+		blocked = dict.fromkeys( [(40, y) for y in xrange(5, 15)] + [ grid.coords(clusters.portals[0]) ] )
+		path = HierarchicalFindPath(clusters)(Point(*source), Point(*destination), grid, blocked, True, False)
+		self.check_path(path, nodes, source, destination, blocked, True)
+		# completely blocked
+		blocked = dict.fromkeys( (50, y) for y in xrange(20) )
+		path = HierarchicalFindPath(clusters)(Point(*source), Point(*destination), grid, blocked, True, False)
+		self.assertEqual(None, path)
+
+	def test_short_path(self):
+		"""Paths to neighboring clusters are found by GridFindPath"""
+		rng = random.Random(5)
+		nodes = self.create_nodes(rng, 40, 40)
+		grid = PathGrid(nodes)
+		clusters = ClusterGraph(grid)
+		coords_list = sorted(nodes)
+		for i in xrange(20):
+			source = Point(*rng.choice(coords_list))
+			destination = Point(*rng.choice([ c for c in coords_list if \
+			                                  abs(source.x - c[0]) <= 10 and abs(source.y - c[1]) <= 10 ]))
+			self.assertEqual(GridFindPath()(source, destination, grid, [], True, False),
+			                 HierarchicalFindPath(clusters)(source, destination, grid, [], True, False))
+
+class TestPathCache(unittest.TestCase):
+
+	def setUp(self):
+		self.cache = PathCache(size=4)
+		self.path = [(0, 0), (1, 0), (2, 0)]
+
+	def test_hit_and_miss(self):
+		key = self.cache.get_key(Point(0, 0), Rect.init_from_topleft_and_size(2, 0, 0, 0), False, True)
+		self.assertEqual((False, None), self.cache.lookup(key, []))
+		self.cache.store(key, self.path, [])
+		found, path = self.cache.lookup(key, [])
+		self.assertTrue(found)
+		self.assertEqual(self.path, path)
+		# callers may modify the returned path
+		path.pop()
+		self.assertEqual(self.path, self.cache.lookup(key, [])[1])
+		self.assertEqual(2, self.cache.hits)
+		self.assertEqual(1, self.cache.misses)
+
+	def test_unsupported_shape(self):
+		self.assertEqual(None, self.cache.get_key(Point(0, 0), object(), False, True))
+
+	def test_invalidate(self):
+		key = self.cache.get_key(Point(0, 0), Point(2, 0), False, True)
+		self.cache.store(key, self.path, [])
+		self.cache.invalidate()
+		self.assertFalse(self.cache.lookup(key, [])[0])
+		# keys of old versions never match again
+		self.assertNotEqual(key, self.cache.get_key(Point(0, 0), Point(2, 0), False, True))
+
+	def test_blocked(self):
+		key = self.cache.get_key(Point(0, 0), Point(2, 0), False, True)
+		self.cache.store(key, self.path, [])
+		self.assertFalse(self.cache.lookup(key, {(1, 0): None})[0])
+		self.assertTrue(self.cache.lookup(key, {(5, 5): None})[0])
+		self.assertEqual(1, self.cache.blocked_hits)
+
+	def test_no_path(self):
+		key = self.cache.get_key(Point(0, 0), Point(2, 0), False, True)
+		# no path because of blocked coords isn't stored
+		self.cache.store(key, None, [(1, 0)])
+		self.assertFalse(self.cache.lookup(key, [])[0])
+		self.cache.store(key, None, [])
+		self.assertEqual((True, None), self.cache.lookup(key, [(1, 0)]))
+
+	def test_eviction(self):
+		keys = [ self.cache.get_key(Point(0, 0), Point(i, 0), False, True) for i in xrange(4) ]
+		for key in keys:
+			self.cache.store(key, self.path, [])
+		self.cache.lookup(keys[0], []) # keys[1] is now the least recently used one
+		self.cache.store(self.cache.get_key(Point(0, 0), Point(9, 9), False, True), self.path, [])
+		self.assertTrue(self.cache.lookup(keys[0], [])[0])
+		self.assertFalse(self.cache.lookup(keys[1], [])[0])
+		self.assertTrue(self.cache.get_stats()['entries'] <= 4)
+
+
+class TestRoadComponents(unittest.TestCase):
+	"""RoadComponents.are_connected has to agree with FindPath on roads."""
+
+	def test_random_roads(self):
+		rng = random.Random(42)
+		connected = 0
+		for i in xrange(300):
+			width, height = rng.randint(5, 20), rng.randint(5, 20)
+			rect1 = Rect.init_from_topleft_and_size(rng.randint(0, width), rng.randint(0, height), \
+			                                        rng.randint(1, 3), rng.randint(1, 3))
+			rect2 = Rect.init_from_topleft_and_size(rng.randint(0, width), rng.randint(0, height), \
+			                                        rng.randint(1, 3), rng.randint(1, 3))
+			if rect1.intersects(rect2):
+				continue
+			# buildings are never on roads
+			nodes = dict( ((x, y), 1.0) for x in xrange(width) for y in xrange(height) \
+			              if rng.random() < 0.6 and not rect1.contains_tuple((x, y)) and \
+			              not rect2.contains_tuple((x, y)) )
+			expected = FindPath()(rect1, rect2, nodes) is not None
+			self.assertEqual(expected, RoadComponents(nodes).are_connected(rect1, rect2))
+			if expected:
+				connected += 1
+		self.assertTrue(connected > 50)
+
+	def test_split(self):
+		components = RoadComponents([(0, 0), (2, 0)])
+		self.assertFalse(components.same_component((0, 0), (2, 0)))
+		self.assertEqual(components.get_component((1, 0)), None)
+		components.add([(1, 0)])
+		self.assertTrue(components.same_component((0, 0), (2, 0)))
+		components.remove([(1, 0)])
+		self.assertFalse(components.same_component((0, 0), (2, 0)))
+		self.assertFalse(components.same_component((1, 0), (1, 0)))
+
+	def test_add_remove(self):
+		"""Incremental updates have to result in the same components as a recalculation."""
+		rng = random.Random(23)
+		components = RoadComponents()
+		roads = set()
+		for i in xrange(2000):
+			coords = (rng.randint(0, 12), rng.randint(0, 12))
+			if coords in roads:
+				roads.remove(coords)
+				components.remove([coords])
+			else:
+				roads.add(coords)
+				components.add([coords])
+			if i % 50 == 0:
+				fresh = RoadComponents(roads)
+				first = rng.choice(list(roads))
+				for other in roads:
+					self.assertEqual(fresh.same_component(first, other), \
+					                 components.same_component(first, other))
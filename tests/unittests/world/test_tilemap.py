@@ -0,0 +1,85 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+
+from horizons.world.tilemap import TileMap
+
+
+class TestTileMap(unittest.TestCase):
+
+	def setUp(self):
+		self.map = TileMap(-2, 3, 4, 5)
+
+	def test_tiles(self):
+		self.map.set_tile(-2, 3, 'a')
+		self.map.set_tile(1, 7, 'b', island='island')
+		self.assertEqual('a', self.map.get_tile(-2, 3))
+		self.assertEqual('b', self.map[(1, 7)])
+		self.assertEqual(None, self.map.get_tile(0, 5))
+		self.assertEqual(None, self.map.get_tile(2, 7))
+		self.assertEqual(None, self.map.get_tile(-3, 3))
+		self.assertRaises(KeyError, lambda: self.map[(0, 5)])
+		self.assertRaises(KeyError, self.map.set_tile, 1, 8, 'c')
+		self.assertTrue((1, 7) in self.map)
+		self.assertFalse((1, 8) in self.map)
+		self.assertEqual(2, len(self.map))
+
+		self.map.set_tile(1, 7, None)
+		self.assertEqual(None, self.map.get((1, 7)))
+		self.assertEqual(1, len(self.map))
+
+	def test_islands(self):
+		self.map.set_tile(0, 4, 'a', island='island1')
+		self.map.set_tile(0, 5, 'b', island='island2')
+		self.map.set_tile(0, 6, 'c', island='island1')
+		self.map.set_tile(0, 7, 'd')
+		self.assertEqual('island1', self.map.get_island(0, 4))
+		self.assertEqual('island2', self.map.get_island(0, 5))
+		self.assertEqual('island1', self.map.get_island(0, 6))
+		self.assertEqual(None, self.map.get_island(0, 7))
+		self.assertEqual(None, self.map.get_island(0, 20))
+
+		# removing the tile removes it from the island too
+		self.map.set_tile(0, 4, None)
+		self.assertEqual(None, self.map.get_island(0, 4))
+
+	def test_iteration(self):
+		self.map.set_tile(1, 3, 'a')
+		self.map.set_tile(-1, 7, 'b')
+		self.map.set_tile(-1, 4, 'c')
+		self.assertEqual([((-1, 4), 'c'), ((-1, 7), 'b'), ((1, 3), 'a')], list(self.map.iteritems()))
+		self.assertEqual([(-1, 4), (-1, 7), (1, 3)], list(self.map))
+		self.assertEqual(['c', 'b', 'a'], list(self.map.itervalues()))
+		self.assertEqual({(-1, 4): 'c', (-1, 7): 'b', (1, 3): 'a'}, dict(self.map.iteritems()))
+
+	def test_lookup_fields(self):
+		self.map.set_tile(0, 5, 'a', island='island')
+		left, top, width, height, tiles, island_ids, islands = self.map.lookup_fields
+		self.assertEqual((-2, 3, 4, 5), (left, top, width, height))
+		index = (0 - left) * height + 5 - top
+		self.assertEqual('a', tiles[index])
+		self.assertEqual('island', islands[island_ids[index] - 1])
+
+		# the fields stay valid when tiles change
+		self.map.set_tile(0, 5, 'b')
+		self.assertEqual('b', tiles[index])
+		self.assertEqual(0, island_ids[index])